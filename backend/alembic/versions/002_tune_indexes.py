@@ -0,0 +1,75 @@
+"""Tune indexes to actual query paths
+
+Drops indexes that duplicate a unique constraint or carry no selectivity,
+and adds a partial index for the processing queue plus a covering index
+for per-user date-range aggregates.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+# Enum labels as stored by SQLAlchemy (member names, not values)
+PENDING_STATUSES = "status IN ('PROCESSING', 'PARSED', 'CLASSIFIED')"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # Redundant with the unique constraint on users.email
+        op.drop_index('idx_user_email', table_name='users', postgresql_concurrently=True)
+        # Six-value enum; the planner never picks it over a seq scan
+        op.drop_index('idx_transaction_status', table_name='transactions', postgresql_concurrently=True)
+        # Leading column of unique_vendor_per_user (user_id, vendor_name)
+        op.drop_index('idx_vendor_mapping_user', table_name='vendor_mappings', postgresql_concurrently=True)
+
+        op.create_index(
+            'idx_transaction_pending',
+            'transactions',
+            ['created_at'],
+            unique=False,
+            postgresql_where=sa.text(PENDING_STATUSES),
+            postgresql_concurrently=True,
+        )
+
+        # Replace (user_id, date) with a covering version of itself
+        op.create_index(
+            'idx_transaction_user_date_covering',
+            'transactions',
+            ['user_id', 'date'],
+            unique=False,
+            postgresql_include=['amount', 'category_id'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('idx_transaction_user_date', table_name='transactions', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_transaction_user_date_covering RENAME TO idx_transaction_user_date')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_transaction_user_date_plain',
+            'transactions',
+            ['user_id', 'date'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('idx_transaction_user_date', table_name='transactions', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_transaction_user_date_plain RENAME TO idx_transaction_user_date')
+
+        op.drop_index('idx_transaction_pending', table_name='transactions', postgresql_concurrently=True)
+
+        op.create_index('idx_vendor_mapping_user', 'vendor_mappings', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_transaction_status', 'transactions', ['status'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_user_email', 'users', ['email'], unique=False, postgresql_concurrently=True)
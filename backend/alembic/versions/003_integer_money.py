@@ -0,0 +1,73 @@
+"""Store money as integer cents and confidence as REAL
+
+Money columns move from NUMERIC(10, 2) to BIGINT cents so SUM and range
+comparisons run on native integers; the ORM exposes them as Decimal.
+transactions.confidence_score moves from INTEGER percentage to a REAL
+fraction in [0, 1].
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+# (table, column, nullable)
+MONEY_COLUMNS = [
+    ('categories', 'monthly_budget', True),
+    ('transactions', 'amount', False),
+    ('budgets_history', 'budget_amount', False),
+    ('audit_corrections', 'old_amount', True),
+    ('audit_corrections', 'new_amount', True),
+]
+
+
+def upgrade() -> None:
+    for table, column, nullable in MONEY_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.BigInteger(),
+            existing_type=sa.Numeric(precision=10, scale=2),
+            existing_nullable=nullable,
+            postgresql_using=f'round({column} * 100)::bigint',
+        )
+
+    op.alter_column(
+        'transactions',
+        'confidence_score',
+        type_=sa.REAL(),
+        existing_type=sa.Integer(),
+        existing_nullable=True,
+        postgresql_using='(confidence_score::real / 100)',
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'transactions',
+        'confidence_score',
+        type_=sa.Integer(),
+        existing_type=sa.REAL(),
+        existing_nullable=True,
+        postgresql_using='round(confidence_score * 100)::integer',
+    )
+
+    for table, column, nullable in MONEY_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Numeric(precision=10, scale=2),
+            existing_type=sa.BigInteger(),
+            existing_nullable=nullable,
+            postgresql_using=f'({column}::numeric / 100)',
+        )
@@ -0,0 +1,29 @@
+"""Add processing queue columns to transactions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('transactions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('transactions', sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'last_error')
+    op.drop_column('transactions', 'lease_expires_at')
+    op.drop_column('transactions', 'attempts')
@@ -0,0 +1,45 @@
+"""Add monthly spending counters
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    op.create_table('monthly_spending',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('spent', sa.BigInteger(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'month', 'category_id')
+    )
+
+    # Backfill from transactions already confirmed by their owners
+    op.execute("""
+        INSERT INTO monthly_spending (user_id, month, category_id, spent, transaction_count)
+        SELECT user_id, to_char(date, 'YYYY-MM'), category_id, sum(amount), count(*)
+        FROM transactions
+        WHERE status IN ('CONFIRMED', 'CORRECTED')
+        GROUP BY user_id, to_char(date, 'YYYY-MM'), category_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_spending')
@@ -0,0 +1,37 @@
+"""Add spending forecasts
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    op.create_table('spending_forecasts',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('category_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('fitted_through', sa.String(length=7), nullable=False),
+        sa.Column('level', sa.Float(), nullable=False),
+        sa.Column('trend', sa.Float(), nullable=False),
+        sa.Column('residual_std', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'category_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('spending_forecasts')
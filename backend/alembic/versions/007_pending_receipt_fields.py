@@ -0,0 +1,54 @@
+"""Allow receipt fields to be empty until parsing
+
+A receipt uploaded straight to object storage becomes a PROCESSING
+transaction before anything is known about it, so category, amount, date
+and vendor are filled in by the pipeline. A check constraint keeps them
+mandatory once a transaction is confirmed or corrected.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+# Enum labels as stored by SQLAlchemy (member names, not values)
+COMPLETE_WHEN_COUNTED = (
+    "status NOT IN ('CONFIRMED', 'CORRECTED') OR ("
+    "category_id IS NOT NULL AND amount IS NOT NULL "
+    "AND date IS NOT NULL AND vendor IS NOT NULL)"
+)
+
+
+def upgrade() -> None:
+    op.alter_column('transactions', 'category_id', existing_type=postgresql.UUID(as_uuid=True), nullable=True)
+    op.alter_column('transactions', 'amount', existing_type=sa.BigInteger(), nullable=True)
+    op.alter_column('transactions', 'date', existing_type=sa.Date(), nullable=True)
+    op.alter_column('transactions', 'vendor', existing_type=sa.String(length=255), nullable=True)
+
+    # Add without a full-table lock, then validate under SHARE UPDATE EXCLUSIVE
+    op.execute(
+        'ALTER TABLE transactions ADD CONSTRAINT ck_transaction_complete_when_counted '
+        f'CHECK ({COMPLETE_WHEN_COUNTED}) NOT VALID'
+    )
+    op.execute('ALTER TABLE transactions VALIDATE CONSTRAINT ck_transaction_complete_when_counted')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_transaction_complete_when_counted', 'transactions', type_='check')
+    # Receipts that never finished parsing cannot satisfy NOT NULL
+    op.execute("DELETE FROM transactions WHERE category_id IS NULL OR amount IS NULL OR date IS NULL OR vendor IS NULL")
+    op.alter_column('transactions', 'vendor', existing_type=sa.String(length=255), nullable=False)
+    op.alter_column('transactions', 'date', existing_type=sa.Date(), nullable=False)
+    op.alter_column('transactions', 'amount', existing_type=sa.BigInteger(), nullable=False)
+    op.alter_column('transactions', 'category_id', existing_type=postgresql.UUID(as_uuid=True), nullable=False)
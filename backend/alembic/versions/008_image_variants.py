@@ -0,0 +1,25 @@
+"""Add receipt image renditions to transactions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-05-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    op.add_column('transactions', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'image_variants')
@@ -0,0 +1,37 @@
+"""Index audit corrections by creation order
+
+The active-learning job reads corrections past a (created_at, id)
+watermark across all users; idx_audit_user only serves per-user lookups.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-05-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_audit_created',
+            'audit_corrections',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_audit_created', table_name='audit_corrections', postgresql_concurrently=True)
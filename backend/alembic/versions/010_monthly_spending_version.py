@@ -0,0 +1,32 @@
+"""Version monthly spending counters
+
+Every change to a counter increments its version. The Redis copy of a
+month records the version it holds per category, so a write-through that
+races a cache fill is applied exactly once.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-05-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, None] = None
+depends_on: Union[str, None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'monthly_spending',
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('monthly_spending', 'version')
@@ -1,13 +1,40 @@
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 
+import structlog
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.redis import Script
+from app.core.revocation import is_revoked
+from app.core.security import decode_token
 from app.models.database import User
 
+logger = structlog.get_logger()
+
+# Column values of recently authenticated users, so that a request answered
+# from cache needs no database connection at all
+user_cache = LRUCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_SECONDS)
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def _cached_user(user_id: str) -> Optional[User]:
+    values = user_cache.get(user_id)
+    if values is None:
+        return None
+    # A fresh instance per request, attachable to the request's session
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login",
@@ -15,22 +42,29 @@ oauth2_scheme = OAuth2PasswordBearer(
 )
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get current authenticated user."""
-    # Verify token
-    user_id = verify_token(token, token_type="access")
-    if not user_id:
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """Claims of a valid, unrevoked access token."""
+    claims = decode_token(token, token_type="access")
+    if not claims or await is_revoked(claims):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return claims
 
-    # Get user from database
-    user = await User.get_by_id(db, user_id=user_id)
+
+async def get_current_user(
+    claims: Dict[str, Any] = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Get current authenticated user."""
+    await db.route_for_user(claims["sub"])
+    user = _cached_user(claims["sub"])
+    if user is None:
+        user = await User.get_by_id(db, user_id=claims["sub"])
+        if user:
+            user_cache.set(claims["sub"], {key: getattr(user, key) for key in _USER_COLUMNS})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,16 +104,47 @@ async def get_current_verified_user(
     return current_user
 
 
+async def _hit_local(redis, keys, args):
+    count = await redis.incr(keys[0])
+    if count == 1:
+        await redis.expire(keys[0], int(args[0]))
+    return count
+
+
+# Fixed window: count the hit, starting the window's expiry on the first one
+_hit = Script(
+    """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
+""",
+    local=_hit_local,
+)
+
+
 class RateLimiter:
-    """Simple rate limiter dependency."""
+    """Per-user fixed-window rate limit, counted in Redis."""
 
     def __init__(self, requests: int, window: int):
         self.requests = requests
         self.window = window
-        self.clients = {}
 
     async def __call__(self, current_user: User = Depends(get_current_user)):
         """Check rate limit for current user."""
-        # TODO: Implement Redis-based rate limiting
-        # For now, just return the user
-        return current_user
\ No newline at end of file
+        window_start = int(time.time()) // self.window * self.window
+        key = f"ratelimit:{current_user.id}:{self.window}:{window_start}"
+        try:
+            count = await _hit(keys=[key], args=[self.window])
+        except RedisError as e:
+            # Fail open: Redis trouble should not lock users out
+            logger.warning("Rate limit check failed", exception=str(e))
+            return current_user
+        if count > self.requests:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(window_start + self.window - int(time.time()))},
+            )
+        return current_user
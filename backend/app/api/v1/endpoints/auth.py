@@ -1,24 +1,26 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import DBRoute, get_db
+from app.core import revocation
 from app.core.security import (
     create_access_token,
     create_refresh_token,
+    decode_token,
     get_password_hash,
+    new_token_id,
     verify_password,
-    verify_token,
 )
 from app.models.database import User
 from app.models.schemas import Token, TokenRefresh, UserCreate, UserResponse
-from app.api.v1.dependencies import get_current_user
+from app.api.v1.dependencies import get_token_claims
 
-router = APIRouter()
+router = APIRouter(route_class=DBRoute)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -70,17 +72,25 @@ async def login(
             detail="Inactive user"
         )
 
+    # Every login starts a session that logout or refresh reuse can revoke
+    session_id = new_token_id()
+    refresh_token_id = new_token_id()
+
     # Create access token
     access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id, expires_delta=access_token_expires, session_id=session_id
     )
 
     # Create refresh token
     refresh_token_expires = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
     refresh_token = create_refresh_token(
-        subject=user.id, expires_delta=refresh_token_expires
+        subject=user.id,
+        expires_delta=refresh_token_expires,
+        session_id=session_id,
+        token_id=refresh_token_id,
     )
+    await revocation.start_session(session_id, refresh_token_id, refresh_token_expires)
 
     return {
         "access_token": access_token,
@@ -96,33 +106,47 @@ async def refresh_token(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Refresh access token using refresh token."""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
     # Verify refresh token
-    user_id = verify_token(token_data.refresh_token, token_type="refresh")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    claims = decode_token(token_data.refresh_token, token_type="refresh")
+    if not claims or await revocation.is_revoked(claims):
+        raise invalid
 
     # Find user
-    user = await User.get_by_id(db, user_id=user_id)
+    user = await User.get_by_id(db, user_id=claims["sub"])
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user",
         )
 
+    # Rotate: the presented token stops working; presenting it again
+    # revokes the session
+    session_id = claims["sid"]
+    refresh_token_id = new_token_id()
+    refresh_token_expires = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    if not await revocation.rotate_refresh_token(
+        session_id, claims["jti"], refresh_token_id, refresh_token_expires
+    ):
+        raise invalid
+
     # Create new access token
     access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+        subject=user.id, expires_delta=access_token_expires, session_id=session_id
     )
 
     # Create new refresh token
-    refresh_token_expires = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
     new_refresh_token = create_refresh_token(
-        subject=user.id, expires_delta=refresh_token_expires
+        subject=user.id,
+        expires_delta=refresh_token_expires,
+        session_id=session_id,
+        token_id=refresh_token_id,
     )
 
     return {
@@ -135,11 +159,10 @@ async def refresh_token(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
+    claims: Dict[str, Any] = Depends(get_token_claims),
 ) -> Any:
-    """Logout user (invalidate tokens)."""
-    # In a real implementation, you would add the token to a blacklist
-    # or maintain a list of active tokens per user
+    """Logout user (revoke every token of this login session)."""
+    await revocation.end_session(claims["sid"])
     return {"message": "Successfully logged out"}
 
 
@@ -1,19 +1,26 @@
-from typing import Any, List
+from decimal import Decimal
+from typing import Any, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.database import User
+from app.core.cache import bump_data_version
+from app.core.database import ReplicaRoute, get_db
+from app.models.database import BudgetsHistory, Category, MonthlySpending, User
 from app.models.schemas import (
     BudgetResponse,
     BudgetCreate,
     BudgetHistory,
+    BudgetSummary,
 )
 from app.api.v1.dependencies import get_current_active_user
+from app.services import budgets as budget_engine
 
-router = APIRouter()
+router = APIRouter(route_class=ReplicaRoute)
+
+MONTH_PATTERN = r"^\d{4}-\d{2}$"
 
 
 @router.post("/{category_id}", response_model=BudgetResponse)
@@ -24,41 +31,90 @@ async def set_budget(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Set or update budget for a category."""
-    # TODO: Implement budget creation/update
-    # 1. Validate category ownership
-    # 2. Create or update budget record
-    pass
+    category = await Category.get_for_user(db, category_id, current_user.id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+
+    month = budget_data.month or budget_engine.current_month()
+    await budget_engine.set_category_budget(
+        db, current_user.id, category_id, month, budget_data.amount
+    )
+    await db.commit()
+    await bump_data_version(current_user.id)
+
+    return await budget_engine.get_category_budget(db, current_user.id, category_id, month)
 
 
 @router.get("/{category_id}/current", response_model=BudgetResponse)
 async def get_current_budget(
     category_id: UUID,
-    month: str = None,  # YYYY-MM format
+    month: Optional[str] = Query(None, pattern=MONTH_PATTERN),  # YYYY-MM format
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get current budget for category."""
-    # TODO: Implement current budget retrieval with spending calculation
-    pass
+    budget = await budget_engine.get_category_budget(
+        db, current_user.id, category_id, month or budget_engine.current_month()
+    )
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No budget set for this category",
+        )
+    return budget
 
 
 @router.get("/history", response_model=List[BudgetHistory])
 async def get_budget_history(
-    months_count: int = 12,
+    months_count: int = Query(12, ge=1, le=36),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get budget history for all categories."""
-    # TODO: Implement budget history retrieval
-    return []
+    months = [budget_engine.current_month()]
+    for _ in range(months_count - 1):
+        months.append(budget_engine.previous_month(months[-1]))
+
+    result = await db.execute(
+        select(
+            BudgetsHistory.month,
+            BudgetsHistory.category_id,
+            Category.name,
+            BudgetsHistory.budget_amount,
+            MonthlySpending.spent,
+        )
+        .join(Category, Category.id == BudgetsHistory.category_id)
+        .outerjoin(
+            MonthlySpending,
+            (MonthlySpending.user_id == BudgetsHistory.user_id)
+            & (MonthlySpending.month == BudgetsHistory.month)
+            & (MonthlySpending.category_id == BudgetsHistory.category_id),
+        )
+        .where(
+            BudgetsHistory.user_id == current_user.id,
+            BudgetsHistory.month.in_(months),
+        )
+        .order_by(BudgetsHistory.month.desc(), Category.name)
+    )
+
+    history = {}
+    for month, category_id, name, amount, spent in result.all():
+        history.setdefault(month, []).append(
+            budget_engine.budget_response(category_id, name, amount, month, spent or Decimal("0.00"))
+        )
+    return [BudgetHistory(month=month, categories=items) for month, items in history.items()]
 
 
-@router.get("/summary")
+@router.get("/summary", response_model=BudgetSummary)
 async def get_budgets_summary(
-    month: str = None,  # YYYY-MM format
+    month: Optional[str] = Query(None, pattern=MONTH_PATTERN),  # YYYY-MM format
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get budget summary for all categories."""
-    # TODO: Implement budget summary with total vs spent
-    pass
\ No newline at end of file
+    return await budget_engine.get_budget_summary(
+        db, current_user.id, month or budget_engine.current_month()
+    )
@@ -2,18 +2,21 @@ from typing import Any, List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.database import User
+from app.core.cache import bump_data_version
+from app.core.database import ReplicaRoute, get_db
+from app.models.database import Category, User
 from app.models.schemas import (
     CategoryResponse,
     CategoryCreate,
     CategoryUpdate,
 )
 from app.api.v1.dependencies import get_current_active_user
+from app.services import categories as category_service
 
-router = APIRouter()
+router = APIRouter(route_class=ReplicaRoute)
 
 
 @router.get("/", response_model=List[CategoryResponse])
@@ -23,11 +26,7 @@ async def get_categories(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get user's categories including global categories."""
-    # TODO: Implement category listing
-    # 1. Get user-specific categories
-    # 2. Include global categories if requested
-    # 3. Add transaction counts
-    return []
+    return await category_service.list_categories(db, current_user.id, include_global)
 
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -37,10 +36,15 @@ async def create_category(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Create new category."""
-    # TODO: Implement category creation
-    # 1. Validate name uniqueness for user
-    # 2. Create category with user_id
-    pass
+    await _check_name_available(db, category_data.name, current_user)
+
+    category = Category(user_id=current_user.id, **category_data.model_dump())
+    db.add(category)
+    await db.commit()
+    await db.refresh(category)
+    await bump_data_version(current_user.id)
+
+    return category
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -50,8 +54,18 @@ async def get_category(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get specific category."""
-    # TODO: Implement category retrieval with ownership check
-    pass
+    category = await Category.get_for_user(db, category_id, current_user.id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+
+    response = CategoryResponse.model_validate(category)
+    response.transaction_count = await category_service.category_usage(
+        db, current_user.id, category_id
+    )
+    return response
 
 
 @router.patch("/{category_id}", response_model=CategoryResponse)
@@ -62,8 +76,22 @@ async def update_category(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Update category."""
-    # TODO: Implement category update with ownership check
-    pass
+    category = await _get_owned_category(db, category_id, current_user)
+    changes = category_data.model_dump(exclude_unset=True)
+    for field in ("name", "color", "icon"):
+        # Required columns; an explicit null means "leave unchanged"
+        if changes.get(field, "") is None:
+            del changes[field]
+    if changes.get("name", category.name) != category.name:
+        await _check_name_available(db, changes["name"], current_user)
+
+    for field, value in changes.items():
+        setattr(category, field, value)
+    await db.commit()
+    await db.refresh(category)
+    await bump_data_version(current_user.id)
+
+    return category
 
 
 @router.delete("/{category_id}")
@@ -73,7 +101,46 @@ async def delete_category(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Delete category."""
-    # TODO: Implement category deletion with ownership check
-    # 1. Check if category has transactions
-    # 2. Prevent deletion if in use or reassign transactions
-    pass
\ No newline at end of file
+    category = await _get_owned_category(db, category_id, current_user)
+    if await category_service.category_in_use(db, current_user.id, category_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Category is in use; reassign its transactions first",
+        )
+
+    await category_service.delete_category(db, category)
+    await db.commit()
+    await bump_data_version(current_user.id)
+
+    return {"message": "Category deleted"}
+
+
+async def _get_owned_category(db: AsyncSession, category_id: UUID, user: User) -> Category:
+    """Load a category the user may modify, or raise 404/403."""
+    category = await Category.get_for_user(db, category_id, user.id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+    if category.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Global categories cannot be modified",
+        )
+    return category
+
+
+async def _check_name_available(db: AsyncSession, name: str, user: User) -> None:
+    """Reject names already used by the user's or a global category."""
+    result = await db.execute(
+        select(Category.id).where(
+            Category.name == name,
+            or_(Category.user_id == user.id, Category.is_global.is_(True)),
+        )
+    )
+    if result.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category name already exists",
+        )
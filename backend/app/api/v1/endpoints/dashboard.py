@@ -1,76 +1,81 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import cached_response
+from app.core.database import ReplicaRoute, get_db
 from app.models.database import User
 from app.models.schemas import (
     DashboardSummary,
     CategoryChartResponse,
 )
 from app.api.v1.dependencies import get_current_active_user
+from app.services import dashboard
+from app.services.insights import get_insights
 
-router = APIRouter()
+router = APIRouter(route_class=ReplicaRoute)
+
+MONTH_PATTERN = r"^\d{4}-\d{2}$"
 
 
 @router.get("/summary", response_model=DashboardSummary)
 async def get_dashboard_summary(
-    month: str = Query(..., description="Month in YYYY-MM format"),
+    request: Request,
+    month: str = Query(..., pattern=MONTH_PATTERN, description="Month in YYYY-MM format"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get dashboard summary for specified month."""
-    # TODO: Implement dashboard summary calculation
-    # 1. Calculate total expenses for month
-    # 2. Get income (if provided by user)
-    # 3. Calculate savings
-    # 4. Calculate budget remaining
-    # 5. Get category spending breakdown
-    # 6. Get top vendors
-    # 7. Count transactions
-    pass
+    return await cached_response(
+        request,
+        current_user.id,
+        "dashboard.summary",
+        lambda: dashboard.get_summary(db, current_user.id, month),
+        model=DashboardSummary,
+    )
 
 
 @router.get("/charts/category-spending", response_model=CategoryChartResponse)
 async def get_category_spending_chart(
-    month: str = Query(..., description="Starting month in YYYY-MM format"),
+    request: Request,
+    month: str = Query(..., pattern=MONTH_PATTERN, description="Starting month in YYYY-MM format"),
     months_count: int = Query(6, ge=1, le=24, description="Number of months to include"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get category spending data for charts."""
-    # TODO: Implement category chart data
-    # 1. Get monthly spending by category
-    # 2. Calculate totals for the period
-    # 3. Format data for chart library
-    pass
+    return await cached_response(
+        request,
+        current_user.id,
+        "dashboard.category-spending",
+        lambda: dashboard.get_category_chart(db, current_user.id, month, months_count),
+        model=CategoryChartResponse,
+    )
 
 
 @router.get("/insights")
 async def get_spending_insights(
-    month: str = Query(..., description="Month in YYYY-MM format"),
+    month: str = Query(..., pattern=MONTH_PATTERN, description="Month in YYYY-MM format"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get spending insights and anomalies."""
-    # TODO: Implement spending insights
-    # 1. Detect unusual spending patterns
-    # 2. Identify top spending categories
-    # 3. Show spending trends
-    # 4. Suggest budget optimizations
-    pass
+    # Category z-scores, vendor spikes, recurring charges and top categories
+    return await get_insights(db, current_user.id, month)
 
 
 @router.get("/monthly-trends")
 async def get_monthly_trends(
+    request: Request,
     months_count: int = Query(12, ge=1, le=24, description="Number of months to analyze"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get monthly spending trends."""
-    # TODO: Implement monthly trends analysis
-    # 1. Calculate month-over-month changes
-    # 2. Identify spending patterns
-    # 3. Predict future spending
-    pass
\ No newline at end of file
+    return await cached_response(
+        request,
+        current_user.id,
+        "dashboard.monthly-trends",
+        lambda: dashboard.get_trends(db, current_user.id, months_count),
+    )
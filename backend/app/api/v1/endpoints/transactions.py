@@ -1,21 +1,107 @@
-from typing import Any, List
-from uuid import UUID
+from datetime import date
+from typing import Any, Optional, Tuple
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.database import User
+from app.core.cache import bump_data_version
+from app.core.config import settings
+from app.core.database import ReplicaRoute, get_db
+from app.core.responses import FastJSONResponse, compile_model, dumps
+from app.core.storage import get_storage
+from app.models.database import (
+    AuditCorrection,
+    Category,
+    CorrectionType,
+    Transaction,
+    TransactionStatus,
+    User,
+    VendorMapping,
+)
 from app.models.schemas import (
+    PresignedUpload,
+    ReceiptUploadRequest,
     TransactionResponse,
     TransactionUploadResponse,
     TransactionStatusResponse,
     TransactionConfirm,
     TransactionList,
+    TransactionUpdate,
 )
 from app.api.v1.dependencies import get_current_active_user
+from app.services import budgets as budget_engine
+from app.services import category_prior, images, receipts
+from app.services.dashboard import month_bounds
+
+router = APIRouter(route_class=ReplicaRoute)
+
+MONTH_PATTERN = r"^\d{4}-\d{2}$"
+
+# OCR payload, kilobytes per row; only sent on request
+HEAVY_FIELDS = ("raw_text", "parsed_json")
+LIST_FIELDS = tuple(f for f in TransactionResponse.model_fields if f not in HEAVY_FIELDS)
+EXPORT_BATCH_SIZE = 500
+IMAGE_URL_EXPIRES_SECONDS = 3600
+
+
+@router.post("/uploads", response_model=PresignedUpload, status_code=status.HTTP_201_CREATED)
+async def create_receipt_upload(
+    upload: ReceiptUploadRequest,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """Get a presigned POST for uploading a receipt straight to storage.
+
+    Send the file with the returned form fields to ``url``, then call
+    ``/uploads/{upload_id}/complete`` to start processing.
+    """
+    extension = _check_receipt_file(upload.filename, upload.size)
+    return receipts.create_presigned_upload(current_user.id, uuid4(), extension)
+
+
+@router.post(
+    "/uploads/{upload_id}/complete",
+    response_model=TransactionUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def complete_receipt_upload(
+    upload_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """Queue a receipt uploaded through a presigned POST for processing."""
+    # Retried completions return the transaction already created
+    existing = await Transaction.get_for_user(db, upload_id, current_user.id)
+    if existing:
+        return TransactionUploadResponse(transaction_id=existing.id, status=existing.status.value)
+
+    uploaded = await receipts.find_upload(current_user.id, upload_id)
+    if not uploaded:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found",
+        )
+
+    key, _ = uploaded
+    transaction = await receipts.create_receipt_transaction(db, current_user.id, upload_id, key)
+    if transaction is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found",
+        )
+    await db.commit()
 
-router = APIRouter()
+    return TransactionUploadResponse(transaction_id=transaction.id, status=transaction.status.value)
 
 
 @router.post("/upload", response_model=TransactionUploadResponse, status_code=status.HTTP_202_ACCEPTED)
@@ -24,18 +110,64 @@ async def upload_receipt(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
-    """Upload receipt image for OCR processing."""
-    # TODO: Implement file upload logic
-    # 1. Validate file type and size
-    # 2. Store file in S3/MinIO
-    # 3. Create transaction record with status='processing'
-    # 4. Queue background job for OCR processing
-    # 5. Return immediate response
-
-    return TransactionUploadResponse(
-        transaction_id=UUID("12345678-1234-5678-9abc-123456789012"),
-        status="processing",
-        message="Receipt uploaded successfully. Processing started."
+    """Upload receipt image for OCR processing.
+
+    Proxies the file through the API; prefer ``/uploads`` for direct uploads.
+    """
+    # Rejects early when the size is known; store_receipt enforces it either way
+    extension = _check_receipt_file(file.filename or "", file.size or 0)
+
+    upload_id = uuid4()
+    try:
+        key = await receipts.store_receipt(current_user.id, upload_id, extension, file.file)
+    except receipts.UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_FILE_SIZE_MB} MB",
+        )
+    transaction = await receipts.create_receipt_transaction(db, current_user.id, upload_id, key)
+    await db.commit()
+
+    return TransactionUploadResponse(transaction_id=transaction.id, status=transaction.status.value)
+
+
+@router.get("/{transaction_id}/image", status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+async def get_receipt_image(
+    transaction_id: UUID,
+    width: Optional[int] = Query(
+        None, description=f"One of {images.ALLOWED_WIDTHS}; omit for the original"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """Redirect to the receipt image, or a WebP rendition of it.
+
+    Renditions recorded by the pipeline are served without touching
+    storage. Others are rendered on first request and kept in storage for
+    every later one.
+    """
+    transaction = await _get_owned_transaction(db, transaction_id, current_user)
+    if not transaction.image_url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction has no receipt image",
+        )
+
+    key = transaction.image_url
+    if width is not None:
+        if width not in images.ALLOWED_WIDTHS or not images.is_renderable(key):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unsupported image width",
+            )
+        key = (
+            images.recorded_variant(transaction.image_variants, width)
+            or await images.get_variant_key(key, width)
+        )
+
+    return RedirectResponse(
+        get_storage().presign_get(key, expires_in=IMAGE_URL_EXPIRES_SECONDS),
+        headers={"Cache-Control": f"private, max-age={IMAGE_URL_EXPIRES_SECONDS // 2}"},
     )
 
 
@@ -63,30 +195,152 @@ async def confirm_transaction(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Confirm and update parsed transaction data."""
-    # TODO: Implement confirmation logic
-    # 1. Validate transaction ownership
-    # 2. Update transaction with confirmed data
-    # 3. Create vendor mapping if remember_vendor=True
-    # 4. Set status='confirmed'
-    pass
+    transaction = await _get_owned_transaction(db, transaction_id, current_user, for_update=True)
+    await _check_category(db, confirm_data.category_id, current_user)
+    before = budget_engine.SpendingEntry.from_transaction(transaction)
+
+    # Record what the user changed for active learning
+    corrections = []
+    if transaction.category_id != confirm_data.category_id:
+        corrections.append(CorrectionType.CATEGORY)
+    if transaction.vendor != confirm_data.vendor:
+        corrections.append(CorrectionType.VENDOR)
+    if transaction.amount != confirm_data.amount:
+        corrections.append(CorrectionType.AMOUNT)
+
+    if corrections:
+        db.add(AuditCorrection(
+            transaction_id=transaction.id,
+            user_id=current_user.id,
+            old_category_id=transaction.category_id,
+            new_category_id=confirm_data.category_id,
+            old_vendor=transaction.vendor,
+            new_vendor=confirm_data.vendor,
+            old_amount=transaction.amount,
+            new_amount=confirm_data.amount,
+            correction_type=corrections[0] if len(corrections) == 1 else CorrectionType.ALL,
+        ))
+
+    transaction.category_id = confirm_data.category_id
+    transaction.vendor = confirm_data.vendor
+    transaction.amount = confirm_data.amount
+    transaction.date = confirm_data.date
+    transaction.status = (
+        TransactionStatus.CORRECTED if corrections else TransactionStatus.CONFIRMED
+    )
+
+    if confirm_data.remember_vendor:
+        await VendorMapping.remember(
+            db, current_user.id, confirm_data.vendor, confirm_data.category_id
+        )
+    await category_prior.notify_confirmed(
+        db,
+        current_user.id,
+        confirm_data.vendor,
+        confirm_data.category_id,
+        remembered=confirm_data.remember_vendor,
+    )
+
+    deltas = await budget_engine.apply_spending_change(
+        db, before, budget_engine.SpendingEntry.from_transaction(transaction)
+    )
+    await db.commit()
+    await db.refresh(transaction)
+    await budget_engine.write_through(deltas)
+    await bump_data_version(current_user.id)
+
+    return transaction
 
 
 @router.get("/", response_model=TransactionList)
 async def get_transactions(
-    month: str = "2024-01",
-    category_id: UUID = None,
-    limit: int = 50,
-    offset: int = 0,
+    month: Optional[str] = Query(None, pattern=MONTH_PATTERN),  # YYYY-MM, defaults to current
+    category_id: Optional[UUID] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    expand: Optional[str] = Query(None, description="Heavy fields to add: raw_text,parsed_json"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """Get user's transactions with filtering and pagination.
+
+    The OCR payload (raw_text, parsed_json) is left out of list pages
+    unless requested through ``expand`` or ``fields``.
+    """
+    selected = _list_fields(fields, expand)
+    start, end = month_bounds(month or budget_engine.current_month())
+    filters = [
+        Transaction.user_id == current_user.id,
+        or_(
+            and_(Transaction.date >= start, Transaction.date < end),
+            # Receipts still being processed have no date yet
+            and_(
+                Transaction.date.is_(None),
+                Transaction.status.not_in(budget_engine.COUNTED_STATUSES),
+                Transaction.created_at >= start,
+                Transaction.created_at < end,
+            ),
+        ),
+    ]
+    if category_id:
+        filters.append(Transaction.category_id == category_id)
+
+    total = await db.scalar(select(func.count()).select_from(Transaction).where(*filters))
+    # Project only the requested columns; rows go straight to orjson
+    result = await db.execute(
+        select(*(getattr(Transaction, name) for name in selected))
+        .where(*filters)
+        .order_by(Transaction.date.desc(), Transaction.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return FastJSONResponse({
+        "transactions": compile_model(TransactionResponse, selected).many(result),
+        "total": total,
+        "has_more": offset + limit < total,
+    })
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_transactions(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    category_id: Optional[UUID] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    expand: Optional[str] = Query(None, description="Heavy fields to add: raw_text,parsed_json"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
-    """Get user's transactions with filtering and pagination."""
-    # TODO: Implement transaction listing with filtering
-    return TransactionList(
-        transactions=[],
-        total=0,
-        has_more=False
+    """Stream transactions as NDJSON, one object per line.
+
+    Rows come off a server-side cursor EXPORT_BATCH_SIZE at a time and are
+    written as they arrive, so memory stays flat for exports of any size.
+    """
+    selected = _list_fields(fields, expand)
+    filters = [Transaction.user_id == current_user.id]
+    if since:
+        filters.append(Transaction.date >= since)
+    if until:
+        filters.append(Transaction.date <= until)
+    if category_id:
+        filters.append(Transaction.category_id == category_id)
+
+    query = (
+        select(*(getattr(Transaction, name) for name in selected))
+        .where(*filters)
+        .order_by(Transaction.date, Transaction.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
     )
+    encoder = compile_model(TransactionResponse, selected)
+
+    async def lines():
+        result = await db.stream(query)
+        async for batch in result.partitions():
+            yield b"".join(dumps(encoder(row)) + b"\n" for row in batch)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
@@ -96,20 +350,48 @@ async def get_transaction(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Get specific transaction details."""
-    # TODO: Implement transaction retrieval
-    pass
+    return await _get_owned_transaction(db, transaction_id, current_user)
 
 
 @router.patch("/{transaction_id}", response_model=TransactionResponse)
 async def update_transaction(
     transaction_id: UUID,
-    transaction_data: dict,
+    transaction_data: TransactionUpdate,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Update transaction details."""
-    # TODO: Implement transaction update
-    pass
+    transaction = await _get_owned_transaction(db, transaction_id, current_user, for_update=True)
+    changes = transaction_data.model_dump(exclude_unset=True, exclude_none=True)
+    if "category_id" in changes:
+        await _check_category(db, changes["category_id"], current_user)
+
+    before = budget_engine.SpendingEntry.from_transaction(transaction)
+    previous_category_id = transaction.category_id
+    for field, value in changes.items():
+        setattr(transaction, field, value)
+
+    # Recategorizing a confirmed transaction is a correction too; a vendor
+    # rename alone is not another vote for the same category
+    if (
+        transaction.status in (TransactionStatus.CONFIRMED, TransactionStatus.CORRECTED)
+        and transaction.vendor
+        and transaction.category_id is not None
+        and transaction.category_id != previous_category_id
+    ):
+        await category_prior.notify_confirmed(
+            db, current_user.id, transaction.vendor, transaction.category_id
+        )
+
+    deltas = await budget_engine.apply_spending_change(
+        db, before, budget_engine.SpendingEntry.from_transaction(transaction)
+    )
+    await db.commit()
+    await db.refresh(transaction)
+    await budget_engine.write_through(deltas)
+    await bump_data_version(current_user.id)
+
+    return transaction
 
 
 @router.delete("/{transaction_id}")
@@ -119,5 +401,79 @@ async def delete_transaction(
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """Delete transaction."""
-    # TODO: Implement transaction deletion
-    pass
\ No newline at end of file
+    transaction = await _get_owned_transaction(db, transaction_id, current_user, for_update=True)
+
+    deltas = await budget_engine.apply_spending_change(
+        db, budget_engine.SpendingEntry.from_transaction(transaction), None
+    )
+    receipt = transaction.image_url
+    await db.delete(transaction)
+    await db.commit()
+    await budget_engine.write_through(deltas)
+    await bump_data_version(current_user.id)
+    if receipt:
+        await receipts.delete_receipts([receipt])
+
+    return {"message": "Transaction deleted"}
+
+
+async def _get_owned_transaction(
+    db: AsyncSession, transaction_id: UUID, user: User, for_update: bool = False
+) -> Transaction:
+    """Load a transaction owned by the user or raise 404.
+
+    Write paths pass ``for_update`` so the row cannot change between
+    reading its "before" spending entry and committing the delta.
+    """
+    transaction = await Transaction.get_for_user(db, transaction_id, user.id, for_update)
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found",
+        )
+    return transaction
+
+
+async def _check_category(db: AsyncSession, category_id: UUID, user: User) -> None:
+    """Ensure the category is visible to the user."""
+    if not await Category.get_for_user(db, category_id, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category",
+        )
+
+
+def _list_fields(fields: Optional[str], expand: Optional[str]) -> Tuple[str, ...]:
+    """Resolve the list view's ``fields``/``expand`` parameters to columns."""
+    def parse(value: str, allowed) -> set:
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = names - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        return names
+
+    wanted = parse(fields, TransactionResponse.model_fields) if fields else set(LIST_FIELDS)
+    if expand:
+        wanted |= parse(expand, HEAVY_FIELDS)
+    # Always project the id so rows stay addressable
+    wanted.add("id")
+    return tuple(f for f in TransactionResponse.model_fields if f in wanted)
+
+
+def _check_receipt_file(filename: str, size: int) -> str:
+    """Validate a receipt's type and size; returns its extension."""
+    extension = receipts.receipt_extension(filename)
+    if not extension:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed; use one of: {', '.join(settings.ALLOWED_EXTENSIONS)}",
+        )
+    if size > receipts.max_upload_bytes():
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds {settings.MAX_FILE_SIZE_MB} MB",
+        )
+    return extension
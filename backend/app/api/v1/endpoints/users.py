@@ -3,12 +3,12 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import DBRoute, get_db
 from app.models.database import User
 from app.models.schemas import UserResponse, UserUpdate
 from app.api.v1.dependencies import get_current_active_user
 
-router = APIRouter()
+router = APIRouter(route_class=DBRoute)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -0,0 +1,160 @@
+"""
+Response caching for read-heavy per-user endpoints.
+
+Every user has a data version in Redis that is bumped on any write to their
+transactions, categories or budgets. Cache keys and ETags are derived from
+(user, endpoint, query params, day, data version), so a write invalidates
+everything for that user without deleting keys, and a client presenting the
+current ETag gets a 304 before any aggregation runs.
+
+Bodies are cached as serialized JSON in a small in-process LRU in front of
+Redis.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type
+from uuid import UUID
+
+import structlog
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.database import use_primary
+from app.core.redis import get_redis
+
+logger = structlog.get_logger()
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value``; ``ttl`` overrides the cache-wide expiry if shorter."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+local_cache = LRUCache(
+    maxsize=settings.RESPONSE_CACHE_LOCAL_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+def _version_key(user_id: UUID) -> str:
+    return f"data:version:{user_id}"
+
+
+async def get_data_version(user_id: UUID) -> Optional[int]:
+    """Current data version for a user, or None if Redis is unavailable."""
+    try:
+        return int(await get_redis().get(_version_key(user_id)) or 0)
+    except RedisError as e:
+        logger.warning("Data version read failed", exception=str(e))
+        return None
+
+
+async def bump_data_version(user_id: UUID) -> None:
+    """Invalidate every cached response for a user. Call after commit."""
+    try:
+        await get_redis().incr(_version_key(user_id))
+    except RedisError as e:
+        logger.warning("Data version bump failed", exception=str(e))
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [t.strip() for t in header.split(",")]
+
+
+async def cached_response(
+    request: Request,
+    user_id: UUID,
+    endpoint: str,
+    build: Callable[[], Awaitable[Any]],
+    model: Optional[Type[BaseModel]] = None,
+) -> Response:
+    """Serve ``endpoint`` for a user from cache, building it on a miss.
+
+    ``build`` produces the payload; ``model`` (the route's response model)
+    is applied before serializing so cached and uncached bodies are
+    identical. The day is part of the key because endpoints default to the
+    current month and nightly jobs refresh derived data.
+    """
+    version = await get_data_version(user_id)
+    if version is None:
+        # No version means no safe invalidation; serve uncached
+        return _json_response(_serialize(await build(), model))
+
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.sha256(
+        f"{user_id}|{endpoint}|{params}|{date.today()}|{version}".encode()
+    ).hexdigest()[:32]
+    etag = f'W/"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _if_none_match(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f"cache:{user_id}:{digest}"
+    body = local_cache.get(key)
+    if body is None:
+        try:
+            body = await get_redis().get(key)
+        except RedisError as e:
+            logger.warning("Response cache read failed", exception=str(e))
+        if body is not None:
+            body = body.encode() if isinstance(body, str) else body
+        else:
+            # Cached under the current version, so it must not be stale
+            session = getattr(request.state, "db", None)
+            if session is not None:
+                use_primary(session)
+            body = _serialize(await build(), model)
+            try:
+                await get_redis().set(key, body, ex=settings.RESPONSE_CACHE_TTL_SECONDS)
+            except RedisError as e:
+                logger.warning("Response cache fill failed", exception=str(e))
+        local_cache.set(key, body)
+
+    return _json_response(body, headers)
+
+
+def _serialize(payload: Any, model: Optional[Type[BaseModel]]) -> bytes:
+    if model is not None and not isinstance(payload, model):
+        payload = model.model_validate(payload)
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+
+
+def _json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,168 @@
+"""
+Response compression as a pure ASGI middleware.
+
+Negotiates brotli (when the ``brotli`` package is installed) or gzip from
+Accept-Encoding and compresses compressible responses above a size
+threshold. Streaming responses are compressed chunk by chunk with a flush
+after each one, so NDJSON rows reach the client as they are produced and
+nothing is buffered beyond the current chunk.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _is_refused(param: str) -> bool:
+    """True for a ``q=0`` quality parameter."""
+    name, _, value = param.partition("=")
+    try:
+        return name.strip() == "q" and float(value) == 0
+    except ValueError:
+        return False
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, without BaseHTTPMiddleware."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, accept_encoding: str) -> Optional[str]:
+        offered = set()
+        for token in accept_encoding.split(","):
+            coding, *params = [part.strip() for part in token.split(";")]
+            if not any(_is_refused(param) for param in params):
+                offered.add(coding.lower())
+        if brotli is not None and "br" in offered:
+            return "br"
+        if "gzip" in offered:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response state: decides on the first body message, then streams."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return _BrotliCompressor(self.middleware.brotli_quality)
+        return _GzipCompressor(self.middleware.gzip_level)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until we know whether the body is compressed
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self._passthrough = (
+                "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self._passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+
+            self._compressor = self._new_compressor()
+            headers = MutableHeaders(raw=self._start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self._compressor.compress(body) + self._compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._flush_start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._flush_start()
+
+        body = self._compressor.compress(body)
+        if not more_body:
+            body += self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send(start)
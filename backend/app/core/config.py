@@ -28,13 +28,38 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_BACKEND: str = "jose"  # jose | pyjwt
+    JWT_KEYS_DIR: Optional[str] = None  # <kid>.pem files for RS256/EdDSA
+    JWT_SIGNING_KEY_ID: Optional[str] = None
+    JWT_CLAIMS_CACHE_SIZE: int = 10_000
     BCRYPT_ROUNDS: int = 12
 
+    # Token revocation
+    REVOCATION_CHANNEL: str = "token_revocations"
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_REBUILD_SECONDS: int = 300
+
     # Database
     DATABASE_URL: str
+    DB_USAGE_HEADERS: bool = False  # X-DB-Checkouts / X-DB-Queries on every response
+
+    # Read replicas for GET endpoints; empty means everything uses DATABASE_URL
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated
+    REPLICA_STICKY_SECONDS: int = 5  # a user's reads stay on the primary after a write
+    REPLICA_CHECK_SECONDS: int = 10
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_EJECT_SECONDS: int = 30  # after a connection error
+
+    # Authenticated user lookups (per process)
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_SECONDS: int = 30  # how long a deactivation can go unnoticed
 
     # Redis
-    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_URL: str = "redis://localhost:6379/0"  # memory:// for an in-process stand-in
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free connection
+    REDIS_SOCKET_TIMEOUT: float = 5.0
 
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -55,6 +80,12 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str
     S3_SECURE: bool = True
     S3_REGION: str = "us-east-1"
+    STORAGE_MAX_CONNECTIONS: int = 50  # pooled HTTP connections
+    STORAGE_MAX_CONCURRENCY: int = 16  # concurrent blocking SDK calls
+    STORAGE_MULTIPART_THRESHOLD_MB: int = 8
+
+    # Receipt image renditions
+    IMAGE_WORKERS: int = 2  # processes
 
     # Google Vision API
     GOOGLE_VISION_API_KEY: Optional[str] = None
@@ -71,6 +102,22 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: Optional[str] = None
     CELERY_RESULT_BACKEND: Optional[str] = None
 
+    # Response caching
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_LOCAL_SIZE: int = 1024
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Transaction processing queue
+    QUEUE_NOTIFY_CHANNEL: str = "transaction_jobs"
+    QUEUE_BATCH_SIZE: int = 10
+    QUEUE_LEASE_SECONDS: int = 300
+    QUEUE_MAX_ATTEMPTS: int = 3
+    QUEUE_RETRY_DELAY_SECONDS: int = 30
+
     # Monitoring
     SENTRY_DSN: Optional[str] = None
     PROMETHEUS_ENABLED: bool = False
@@ -87,6 +134,21 @@ class Settings(BaseSettings):
     # ML Model Configuration
     MODEL_CONFIDENCE_THRESHOLD: float = 0.7
     VENDOR_MAPPING_CONFIDENCE: int = 80  # percentage
+    CLASSIFIER_MODEL: str = "typeform/distilbert-base-uncased-mnli"
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    VENDOR_INDEX_DIR: str = "data/vendor-index"
+    VENDOR_INDEX_MIN_SIMILARITY: float = 0.85  # cosine; below this the classifier runs
+    CATEGORY_HEAD_DIR: str = "data/category-head"
+
+    # Per-user category priors (worker process)
+    PRIOR_NOTIFY_CHANNEL: str = "category_priors"
+    PRIOR_CACHE_USERS: int = 10_000
+    PRIOR_HISTORY_DAYS: int = 180
+    PRIOR_REFRESH_SECONDS: int = 3600
+
+    def get_replica_urls(self) -> List[str]:
+        """Read replica URLs from DATABASE_REPLICA_URLS."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
 
     def get_s3_config(self) -> Dict[str, Any]:
         """Get S3 configuration dictionary."""
@@ -1,40 +1,355 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+"""
+Database engines and the request-scoped session.
+
+``get_db`` hands endpoints a ``LazySession``, which creates its
+``AsyncSession`` the first time it is used. A request rejected before it
+touches the database, or one answered from cache, creates no session and
+checks out no pool connection. Routes built with ``DBRoute`` return the
+connection to the pool as soon as the endpoint has produced its response,
+instead of holding it while the response is sent.
+
+With DATABASE_REPLICA_URLS set, GET requests on ``ReplicaRoute`` routers
+read from a replica, picked round-robin per request. Writes, and locking
+reads, always go to the primary. A user who wrote in the last
+REPLICA_STICKY_SECONDS reads from the primary too, so they see their own
+writes. Replicas are probed every REPLICA_CHECK_SECONDS. One that fails
+the probe or lags more than REPLICA_MAX_LAG_SECONDS is ejected until it
+recovers. A connection error ejects it for REPLICA_EJECT_SECONDS. While
+every replica is ejected, reads go to the primary. Reads whose results
+fill a shared cache call ``use_primary`` first. A replica that lags but
+has not been probed yet could otherwise cache stale data under the
+current data version.
+
+Pool checkouts and statements are counted per request in ``DBUsage``. The
+request log includes them, and with DB_USAGE_HEADERS they are also sent as
+X-DB-Checkouts / X-DB-Queries / X-DB-Replica-Queries response headers.
+"""
+
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+import structlog
+from fastapi import Request
+from fastapi.routing import APIRoute
+from redis.exceptions import RedisError
+from sqlalchemy import Delete, Insert, Select, Update, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
+from starlette.responses import StreamingResponse
 
 from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = structlog.get_logger()
+
+# Seconds a replica is behind the primary; 0 when it has replayed everything
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        # Configure connection pool
+        pool_size=20,
+        max_overflow=30,
+    )
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    # Configure connection pool
-    pool_size=20,
-    max_overflow=30,
+engine = _create_engine(settings.DATABASE_URL)
+
+# Create declarative base
+Base = declarative_base()
+
+
+class DBUsage:
+    """Pool checkouts and statements issued on behalf of one request."""
+
+    __slots__ = ("checkouts", "queries", "replica_queries")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.queries = 0
+        self.replica_queries = 0
+
+
+db_usage: ContextVar[Optional[DBUsage]] = ContextVar("db_usage", default=None)
+
+
+def _count_usage(target: AsyncEngine, replica: bool) -> None:
+    @event.listens_for(target.sync_engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        usage = db_usage.get()
+        if usage is not None:
+            usage.checkouts += 1
+
+    @event.listens_for(target.sync_engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        usage = db_usage.get()
+        if usage is not None:
+            usage.queries += 1
+            if replica:
+                usage.replica_queries += 1
+
+
+_count_usage(engine, replica=False)
+
+
+class ReplicaSet:
+    """Round-robin over the read replicas that are currently healthy."""
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        check_seconds: float,
+        max_lag_seconds: float,
+        eject_seconds: float,
+    ):
+        self.engines = engines
+        self.check_seconds = check_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.eject_seconds = eject_seconds
+        self._ejected_until = {id(replica): 0.0 for replica in engines}
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        for replica in engines:
+            self._watch_errors(replica)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, or None to read from the primary."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._turn) % len(self.engines)]
+            if self._ejected_until[id(replica)] <= now:
+                return replica
+        return None
+
+    def eject(self, replica: AsyncEngine, seconds: float, reason: str) -> None:
+        if self._ejected_until[id(replica)] <= time.monotonic():
+            logger.warning("Read replica ejected", replica=replica.url.host, reason=reason)
+        self._ejected_until[id(replica)] = time.monotonic() + seconds
+
+    def _restore(self, replica: AsyncEngine) -> None:
+        if self._ejected_until[id(replica)] > time.monotonic():
+            logger.info("Read replica restored", replica=replica.url.host)
+        self._ejected_until[id(replica)] = 0.0
+
+    def _watch_errors(self, replica: AsyncEngine) -> None:
+        @event.listens_for(replica.sync_engine, "handle_error")
+        def eject_on_disconnect(context):
+            # No connection means the connect itself failed
+            if context.is_disconnect or context.connection is None:
+                self.eject(replica, self.eject_seconds, str(context.original_exception))
+
+    @staticmethod
+    async def _lag(replica: AsyncEngine) -> float:
+        async with replica.connect() as conn:
+            return float(await conn.scalar(REPLICA_LAG_QUERY))
+
+    async def check(self) -> None:
+        """Probe every replica; eject the unreachable and the lagging."""
+        for replica in self.engines:
+            try:
+                lag = await asyncio.wait_for(self._lag(replica), self.check_seconds)
+            except Exception as e:
+                self.eject(replica, self.check_seconds * 2, str(e) or type(e).__name__)
+                continue
+            if lag > self.max_lag_seconds:
+                self.eject(replica, self.check_seconds * 2, f"lag {lag:.1f}s")
+            else:
+                self._restore(replica)
+
+    async def start(self) -> None:
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run_checks())
+
+    async def _run_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.engines:
+            await replica.dispose()
+
+
+def _create_replica(url: str) -> AsyncEngine:
+    replica = _create_engine(url)
+    _count_usage(replica, replica=True)
+    return replica
+
+
+replicas = ReplicaSet(
+    [_create_replica(url) for url in settings.get_replica_urls()],
+    check_seconds=settings.REPLICA_CHECK_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    eject_seconds=settings.REPLICA_EJECT_SECONDS,
 )
 
+
+class RoutingSession(Session):
+    """Reads from ``info["replica"]`` when set; everything else uses the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["wrote"] = True
+            return engine.sync_engine
+        replica = self.info.get("replica")
+        if (
+            replica is not None
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return replica.sync_engine
+        return engine.sync_engine
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
-# Create declarative base
-Base = declarative_base()
 
+def _wrote_key(user_id: Any) -> str:
+    return f"db:wrote:{user_id}"
 
-async def get_db() -> AsyncSession:
-    """Dependency to get async database session."""
-    async with AsyncSessionLocal() as session:
+
+class LazySession:
+    """Stands in for an ``AsyncSession`` and creates it on first use.
+
+    ``release`` closes the session, which returns its connection to the
+    pool. Loaded objects stay readable, and the session can be used again;
+    it then checks out a new connection.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        read_only: bool = False,
+    ):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+        self.read_only = read_only
+        self.user_id: Any = None
+        self._replica: Optional[AsyncEngine] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+            self._session.info["replica"] = self._replica
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    async def route_for_user(self, user_id: Any) -> None:
+        """Attribute this session to a user and pick where its reads go."""
+        self.user_id = user_id
+        if not (self.read_only and replicas):
+            return
         try:
-            yield session
-        finally:
-            await session.close()
+            wrote_recently = await get_redis().exists(_wrote_key(user_id))
+        except RedisError as e:
+            # Without the marker the primary is the only safe choice
+            logger.warning("Replica sticky check failed", exception=str(e))
+            return
+        if not wrote_recently:
+            self._replica = replicas.choose()
+            if self._session is not None:
+                self._session.info["replica"] = self._replica
+
+    async def release(self) -> None:
+        if self._session is None:
+            return
+        if self._session.info.pop("wrote", False) and self.user_id is not None and replicas:
+            try:
+                await get_redis().set(
+                    _wrote_key(self.user_id), 1, ex=settings.REPLICA_STICKY_SECONDS
+                )
+            except RedisError as e:
+                logger.warning("Replica sticky mark failed", exception=str(e))
+        await self._session.close()
+
+
+def use_primary(db: Any) -> None:
+    """Send a session's further reads to the primary."""
+    if isinstance(db, LazySession):
+        db._replica = None
+        if db._session is None:
+            return
+    db.info["replica"] = None
+
+
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Dependency to get async database session."""
+    session = LazySession(read_only=getattr(request.state, "db_read_only", False))
+    request.state.db = session
+    try:
+        yield session
+    finally:
+        await session.release()
+
+
+class DBRoute(APIRoute):
+    """Releases the request's connection once the response is built.
+
+    Streaming responses still read from the session while they are sent,
+    so theirs is released by ``get_db`` afterwards.
+    """
+
+    use_replicas = False
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def release_early(request: Request):
+            request.state.db_read_only = self.use_replicas and request.method in ("GET", "HEAD")
+            response = await handler(request)
+            session = getattr(request.state, "db", None)
+            if session is not None and not isinstance(response, StreamingResponse):
+                await session.release()
+            return response
+
+        return release_early
+
+
+class ReplicaRoute(DBRoute):
+    """A ``DBRoute`` whose GET requests may read from a replica."""
+
+    use_replicas = True
 
 
 async def init_db():
@@ -42,8 +357,10 @@ async def init_db():
     async with engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+    await replicas.start()
 
 
 async def close_db():
     """Close database connections."""
-    await engine.dispose()
\ No newline at end of file
+    await replicas.stop()
+    await engine.dispose()
@@ -0,0 +1,246 @@
+"""
+In-process stand-in for Redis, selected with REDIS_URL=memory://.
+
+Implements the commands this codebase uses, with the same return types as
+a ``decode_responses=True`` client: strings, hashes, sorted sets, key
+expiry, pub/sub within the process, pipelines and scripts. Scripts run
+their Python ``local`` equivalent (see app/core/redis.py). State lives in
+one process, so this is for tests and local runs only.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from redis.exceptions import ResponseError
+
+
+def _str(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+class MemoryPubSub:
+    def __init__(self, server: "MemoryRedis"):
+        self._server = server
+        self._channels: Set[str] = set()
+        self._messages: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._channels.add(channel)
+            self._server._subscribers.setdefault(channel, set()).add(self)
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self) -> None:
+        for channel in self._channels:
+            self._server._subscribers.get(channel, set()).discard(self)
+        self._channels.clear()
+
+
+class MemoryPipeline:
+    """Queues commands and runs them in order on ``execute``."""
+
+    def __init__(self, server: "MemoryRedis"):
+        self._server = server
+        self._commands: List[Tuple[str, tuple, dict]] = []
+        self.scripts: Set[Any] = set()
+
+    def __getattr__(self, name: str):
+        if not hasattr(self._server, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> "MemoryPipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def __await__(self):
+        async def pipeline():
+            return self
+        return pipeline().__await__()
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._server, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands = []
+
+
+class MemoryRedis:
+    """The subset of ``redis.asyncio.Redis`` used by the app."""
+
+    def __init__(self, scripts: Sequence[Any] = ()):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._scripts = scripts
+        self._subscribers: Dict[str, Set[MemoryPubSub]] = {}
+
+    def _live(self, key: str) -> Optional[Any]:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key)
+
+    def _expire_in(self, key: str, seconds: Any) -> None:
+        if hasattr(seconds, "total_seconds"):
+            seconds = seconds.total_seconds()
+        self._expires[key] = time.monotonic() + float(seconds)
+
+    # Connection
+
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self, close_connection_pool: Optional[bool] = None) -> None:
+        pass
+
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        return MemoryPipeline(self)
+
+    def pubsub(self) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    # Keys and strings
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._live(key)
+
+    async def set(self, key: str, value: Any, ex: Any = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._live(key) is not None:
+            return None
+        self._data[key] = _str(value)
+        self._expires.pop(key, None)
+        if ex is not None:
+            self._expire_in(key, ex)
+        return True
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(self._live(key) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            if self._live(key) is not None:
+                deleted += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return deleted
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._live(key) is not None for key in keys)
+
+    async def expire(self, key: str, seconds: Any) -> bool:
+        if self._live(key) is None:
+            return False
+        self._expire_in(key, seconds)
+        return True
+
+    # Hashes
+
+    async def hget(self, key: str, field: Any) -> Optional[str]:
+        return (self._live(key) or {}).get(_str(field))
+
+    async def hexists(self, key: str, field: Any) -> bool:
+        return _str(field) in (self._live(key) or {})
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self._live(key) or {})
+
+    async def hset(
+        self, key: str, field: Any = None, value: Any = None, mapping: Optional[dict] = None
+    ) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        hash_ = self._live(key)
+        if hash_ is None:
+            hash_ = self._data[key] = {}
+        added = sum(_str(f) not in hash_ for f in items)
+        hash_.update({_str(f): _str(v) for f, v in items.items()})
+        return added
+
+    async def hincrby(self, key: str, field: Any, amount: int = 1) -> int:
+        hash_ = self._live(key)
+        if hash_ is None:
+            hash_ = self._data[key] = {}
+        value = int(hash_.get(_str(field), 0)) + int(amount)
+        hash_[_str(field)] = str(value)
+        return value
+
+    # Sorted sets
+
+    def _zset(self, key: str) -> Dict[str, float]:
+        zset = self._live(key)
+        if zset is None:
+            zset = self._data[key] = {}
+        return zset
+
+    async def zadd(self, key: str, mapping: Dict[Any, float], gt: bool = False) -> int:
+        zset = self._zset(key)
+        added = 0
+        for member, score in mapping.items():
+            member = _str(member)
+            if member not in zset:
+                added += 1
+            elif gt and float(score) <= zset[member]:
+                continue
+            zset[member] = float(score)
+        return added
+
+    async def zremrangebyscore(self, key: str, min: Any, max: Any) -> int:
+        zset = self._zset(key)
+        low, high = float(min), float(max)
+        removed = [m for m, s in zset.items() if low <= s <= high]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    async def zrange(self, key: str, start: int, end: int) -> List[str]:
+        members = sorted(self._zset(key).items(), key=lambda item: (item[1], item[0]))
+        end = len(members) if end == -1 else end + 1
+        return [member for member, _ in members[start:end]]
+
+    async def zmscore(self, key: str, members: Sequence[Any]) -> List[Optional[float]]:
+        zset = self._zset(key)
+        return [zset.get(_str(member)) for member in members]
+
+    # Pub/sub
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._subscribers.get(channel, set())
+        for subscriber in subscribers:
+            subscriber._messages.put_nowait(
+                {"type": "message", "channel": channel, "data": _str(message)}
+            )
+        return len(subscribers)
+
+    # Scripts
+
+    async def script_load(self, script: str) -> str:
+        for registered in self._scripts:
+            if registered.script == script:
+                return registered.sha
+        raise ResponseError("Script is not registered with app.core.redis.Script")
+
+    async def evalsha(self, sha: str, numkeys: int, *keys_and_args: Any) -> Any:
+        for script in self._scripts:
+            if script.sha == sha and script.local is not None:
+                keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+                return await script.local(self, keys, args)
+        raise ResponseError(f"No local implementation for script {sha}")
@@ -0,0 +1,73 @@
+"""
+In-process stand-in for object storage, selected with S3_ENDPOINT=memory://.
+
+Implements the ``Storage`` interface (app/core/storage.py) over a dict of
+key -> (content type, bytes). Presigned URLs have the same shape as the
+real ones but point at ``memory://`` and cannot be fetched. State lives in
+one process, so this is for tests and local runs only.
+"""
+
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+MB = 1024 * 1024
+
+
+class MemoryStorage:
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self._objects: Dict[str, Tuple[str, bytes]] = {}
+
+    def presign_post(
+        self,
+        key: str,
+        fields: Optional[Dict[str, str]] = None,
+        conditions: Optional[List[Any]] = None,
+        expires_in: int = 900,
+    ) -> Dict[str, Any]:
+        return {"url": f"memory://{self.bucket}", "fields": {**(fields or {}), "key": key}}
+
+    def presign_get(self, key: str, expires_in: int = 900) -> str:
+        return f"memory://{self.bucket}/{key}"
+
+    async def put(self, key: str, file: BinaryIO, content_type: str) -> None:
+        # Read in chunks like the transfer manager, so wrappers that count
+        # bytes as they are read behave the same
+        chunks = []
+        while True:
+            chunk = file.read(MB)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self._objects[key] = (content_type, b"".join(chunks))
+
+    def _body(self, key: str) -> bytes:
+        try:
+            return self._objects[key][1]
+        except KeyError:
+            error = {"Code": "NoSuchKey", "Message": "The specified key does not exist."}
+            raise ClientError({"Error": error}, "GetObject") from None
+
+    async def get(self, key: str) -> bytes:
+        return self._body(key)
+
+    async def stream(self, key: str, chunk_size: int = MB) -> AsyncIterator[bytes]:
+        body = self._body(key)
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def find(self, prefix: str) -> Optional[Tuple[str, int]]:
+        for key in sorted(self._objects):
+            if key.startswith(prefix):
+                return key, len(self._objects[key][1])
+        return None
+
+    async def delete_many(self, keys: Iterable[str]) -> List[str]:
+        # Like S3, deleting a missing key is not an error
+        for key in keys:
+            self._objects.pop(key, None)
+        return []
+
+    def close(self) -> None:
+        self._objects.clear()
@@ -0,0 +1,128 @@
+"""
+Shared Redis client and connection pool.
+
+Response caching, budget counters, token revocation, the category catalog
+and rate limiting all use one Redis. Each process shares one client and
+one connection pool. The API creates it in its lifespan (``init_redis``)
+and closes it on shutdown. Workers and scripts create it on first use.
+When all REDIS_MAX_CONNECTIONS connections are busy, a caller waits up to
+REDIS_POOL_TIMEOUT seconds for one instead of opening another.
+
+Lua scripts are declared with ``Script`` at import time. ``init_redis``
+loads them, so each call sends only the script's SHA (EVALSHA). A script
+is reloaded if Redis has restarted since. ``pipelined`` sends a batch of
+commands in one round trip, and ``ping`` is the health probe.
+
+With REDIS_URL=memory:// the client is an in-process stand-in
+(app/core/memory_redis.py) for tests and local runs without Redis.
+"""
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence
+
+import structlog
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import NoScriptError, RedisError
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+MEMORY_URL_SCHEME = "memory://"
+
+_client: Optional[Redis] = None
+_scripts: List["Script"] = []
+
+
+class Script:
+    """A Lua script, preloaded when the pool starts and run by SHA.
+
+    ``local`` is the same logic in Python against the client API, run by the
+    in-memory stand-in, which has no Lua.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        local: Optional[Callable[[Any, Sequence[Any], Sequence[Any]], Awaitable[Any]]] = None,
+    ):
+        self.script = source
+        self.sha = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        self.local = local
+        _scripts.append(self)
+
+    async def __call__(self, keys: Sequence[Any] = (), args: Sequence[Any] = (), client=None):
+        """Run on ``client`` (default: the shared client), which may be a pipeline."""
+        if client is None:
+            client = get_redis()
+        if isinstance(client, Pipeline):
+            # The pipeline loads any missing scripts before it executes
+            client.scripts.add(self)
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await client.script_load(self.script)
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+
+
+def _create_client() -> Redis:
+    if settings.REDIS_URL.startswith(MEMORY_URL_SCHEME):
+        from app.core.memory_redis import MemoryRedis
+
+        return MemoryRedis(scripts=_scripts)
+    pool = BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+        decode_responses=True,
+    )
+    return Redis(connection_pool=pool)
+
+
+def get_redis() -> Redis:
+    """Get the process-wide Redis client (created on first use)."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+async def init_redis() -> None:
+    """Create the client and preload the registered Lua scripts."""
+    client = get_redis()
+    try:
+        for script in _scripts:
+            await client.script_load(script.script)
+    except RedisError as e:
+        # Callers degrade without Redis; scripts load on first use instead
+        logger.warning("Redis script preload failed", exception=str(e))
+
+
+@asynccontextmanager
+async def pipelined(transaction: bool = False) -> AsyncIterator[Pipeline]:
+    """Queue commands on the yielded pipeline; they are sent together on exit."""
+    async with get_redis().pipeline(transaction=transaction) as pipe:
+        yield pipe
+        await pipe.execute()
+
+
+async def ping(timeout: float = 1.0) -> bool:
+    """Health probe: whether Redis answers within ``timeout`` seconds."""
+    try:
+        return bool(await asyncio.wait_for(get_redis().ping(), timeout))
+    except (RedisError, OSError, asyncio.TimeoutError):
+        return False
+
+
+async def close_redis():
+    """Close Redis connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose(close_connection_pool=True)
+        _client = None
@@ -0,0 +1,108 @@
+"""
+Fast JSON responses.
+
+Returning a Pydantic model through ``response_model`` validates the value,
+dumps it to dicts, and serializes those with the stdlib ``json`` module.
+Hot list endpoints opt out by returning :class:`FastJSONResponse` directly.
+The body is built with :func:`compile_model`, which turns a response schema
+into a slotted dataclass. orjson serializes that dataclass natively, and it
+is filled straight from ORM objects or ``Row`` tuples by attribute, with no
+per-row dicts. The wire format matches the schema's JSON mode: Decimals as
+strings, enums by value, UTC datetimes with a ``Z`` suffix.
+"""
+
+import dataclasses
+import typing
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize ``content`` the way :class:`FastJSONResponse` does."""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """The schema inside ``Model``, ``Optional[Model]`` or ``List[Model]``."""
+    for candidate in (annotation, *typing.get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+class ModelEncoder:
+    """Projects objects onto a response schema's fields for orjson.
+
+    ``fields`` restricts the output to a subset of the schema, for endpoints
+    that let clients choose columns; the objects then only need those
+    attributes.
+    """
+
+    def __init__(self, model: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None):
+        self.model = model
+        self.fields = tuple(model.model_fields) if fields is None else fields
+        self.row_type = dataclasses.make_dataclass(
+            f"{model.__name__}Row", self.fields, slots=True
+        )
+        self._getter = attrgetter(*self.fields)
+
+        # Nested schemas are projected recursively; plain fields pass through
+        self._converters: List[Optional[Callable[[Any], Any]]] = []
+        for name in self.fields:
+            field = model.model_fields[name]
+            nested = _nested_model(field.annotation)
+            if nested is None:
+                self._converters.append(None)
+            elif typing.get_origin(field.annotation) in (list, List):
+                self._converters.append(compile_model(nested).many)
+            else:
+                self._converters.append(compile_model(nested).optional)
+        self._plain = not any(self._converters)
+
+    def __call__(self, obj: Any) -> Any:
+        values = self._getter(obj)
+        if len(self.fields) == 1:
+            values = (values,)
+        if not self._plain:
+            values = [
+                value if convert is None else convert(value)
+                for value, convert in zip(values, self._converters)
+            ]
+        return self.row_type(*values)
+
+    def optional(self, obj: Any) -> Any:
+        return None if obj is None else self(obj)
+
+    def many(self, objs: Optional[Iterable[Any]]) -> List[Any]:
+        return [] if objs is None else [self(obj) for obj in objs]
+
+
+@lru_cache(maxsize=256)
+def compile_model(
+    model: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None
+) -> ModelEncoder:
+    """The (cached) encoder for a response schema or a subset of its fields."""
+    return ModelEncoder(model, fields)
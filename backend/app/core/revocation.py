@@ -0,0 +1,242 @@
+"""
+Token revocation and refresh-token rotation.
+
+Every token carries a ``jti`` (its own id) and a ``sid`` (the login session
+it belongs to). Revoking either adds it to the ``tokens:revoked`` sorted set
+in Redis, scored by the time the last token it covers expires. A revoked
+id therefore lives exactly as long as a token it can affect, and expired
+ids are trimmed on each rebuild.
+
+Asking Redis on every request would put a network hop in front of every
+authenticated call, so each process keeps a Bloom filter of revoked ids.
+An id that is not in the filter is certainly not revoked, and that common
+case never leaves the process. Only a filter hit goes to Redis: a revoked
+token, or a false positive at about REVOCATION_BLOOM_ERROR_RATE.
+Revocations are published on REVOCATION_CHANNEL and every process adds
+them to its filter. The filter is built only once the subscription is in
+place, and built again after every resubscribe, so no revocation falls in
+a gap between the two. It is also rebuilt from Redis every
+REVOCATION_REBUILD_SECONDS, which drops expired ids.
+
+Refresh tokens rotate. Each session remembers the jti of its one valid
+refresh token in ``tokens:session:<sid>``, and refreshing swaps it for the
+new token's jti atomically. A refresh token that is not the current one
+has been used before, so it must have been copied, and the whole session
+is revoked.
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import Script, get_redis, pipelined
+
+logger = structlog.get_logger()
+
+REVOKED_KEY = "tokens:revoked"
+
+
+async def _rotate_local(redis, keys, args):
+    if await redis.get(keys[0]) == args[0]:
+        await redis.set(keys[0], args[1], ex=int(args[2]))
+        return 1
+    return 0
+
+
+# Swap the session's refresh jti only if the caller presented the current one
+_rotate = Script(
+    """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+""",
+    local=_rotate_local,
+)
+
+
+def _session_key(session_id: str) -> str:
+    return f"tokens:session:{session_id}"
+
+
+class BloomFilter:
+    """Set membership with no false negatives, sized for a false positive rate."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class RevocationList:
+    """This process's view of the revoked token and session ids."""
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_seconds: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+        self._filter: Optional[BloomFilter] = None
+        self._added_during_rebuild: Optional[List[str]] = None
+        self._rebuilt_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._first_load: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Follow revocations from other processes and load the filter.
+
+        Returns after the first load attempt. If it failed, checks go
+        straight to Redis until the listener manages a rebuild.
+        """
+        self._first_load = asyncio.Event()
+        self._task = asyncio.create_task(self._listen())
+        loaded = asyncio.create_task(self._first_load.wait())
+        await asyncio.wait({loaded, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if not loaded.done():
+            # The listener died on something other than Redis
+            loaded.cancel()
+            self._task.result()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rebuild(self) -> None:
+        """Replace the filter with one holding the currently revoked ids."""
+        self._added_during_rebuild = []
+        try:
+            redis = get_redis()
+            await redis.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+            revoked = await redis.zrange(REVOKED_KEY, 0, -1)
+            bloom = BloomFilter(max(self.capacity, 2 * len(revoked)), self.error_rate)
+            for token_id in revoked:
+                bloom.add(token_id)
+            # Revocations announced while the set was being read
+            for token_id in self._added_during_rebuild:
+                bloom.add(token_id)
+            self._filter = bloom
+            self._rebuilt_at = time.monotonic()
+        finally:
+            self._added_during_rebuild = None
+        logger.info("Revocation filter rebuilt", revoked=len(revoked), bits=bloom.size)
+
+    def _add(self, token_id: str) -> None:
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append(token_id)
+        if self._filter is not None:
+            self._filter.add(token_id)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(settings.REVOCATION_CHANNEL)
+                # Anything revoked before the subscription is read from Redis
+                self._rebuilt_at = 0.0
+                while True:
+                    if time.monotonic() - self._rebuilt_at >= self.rebuild_seconds:
+                        await self.rebuild()
+                        self._first_load.set()
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=self.rebuild_seconds
+                    )
+                    if message is not None:
+                        self._add(message["data"])
+            except RedisError as e:
+                logger.warning("Revocation subscription lost", exception=str(e))
+                self._first_load.set()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """Whether the token or its session has been revoked."""
+        ids = [claims["jti"], claims["sid"]]
+        if self._filter is not None:
+            ids = [token_id for token_id in ids if token_id in self._filter]
+            if not ids:
+                return False
+        try:
+            expiries = await get_redis().zmscore(REVOKED_KEY, ids)
+        except RedisError as e:
+            # A filter hit fails closed; without a filter there is nothing to go on
+            logger.warning("Revocation check failed", exception=str(e))
+            return self._filter is not None
+        now = time.time()
+        return any(expiry is not None and expiry > now for expiry in expiries)
+
+    async def revoke(self, token_id: str, lifetime: timedelta) -> None:
+        """Revoke a token or session id for as long as its tokens live."""
+        async with pipelined() as pipe:
+            pipe.zadd(REVOKED_KEY, {token_id: time.time() + lifetime.total_seconds()}, gt=True)
+            pipe.publish(settings.REVOCATION_CHANNEL, token_id)
+        self._add(token_id)
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    rebuild_seconds=settings.REVOCATION_REBUILD_SECONDS,
+)
+
+
+async def is_revoked(claims: Dict[str, Any]) -> bool:
+    return await revocation_list.is_revoked(claims)
+
+
+async def start_session(session_id: str, refresh_token_id: str, lifetime: timedelta) -> None:
+    """Record the first refresh token of a new login session."""
+    await get_redis().set(_session_key(session_id), refresh_token_id, ex=lifetime)
+
+
+async def rotate_refresh_token(
+    session_id: str, presented_id: str, new_id: str, lifetime: timedelta
+) -> bool:
+    """Make ``new_id`` the session's refresh token if ``presented_id`` is current.
+
+    On reuse of an older refresh token the session is revoked.
+    """
+    rotated = await _rotate(
+        keys=[_session_key(session_id)],
+        args=[presented_id, new_id, int(lifetime.total_seconds())],
+    )
+    if not rotated:
+        logger.warning("Refresh token reuse detected", session_id=session_id)
+        await end_session(session_id)
+    return bool(rotated)
+
+
+async def end_session(session_id: str) -> None:
+    """Revoke every access and refresh token issued to a session."""
+    await revocation_list.revoke(
+        session_id, timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    await get_redis().delete(_session_key(session_id))
@@ -1,67 +1,126 @@
+import hashlib
 import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Dict, Union, Optional
 
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.signing import InvalidToken, get_backend, get_key_set
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified claims by token digest. A client presents the same access token
+# on every request for its whole lifetime; entries expire with the token.
+claims_cache = LRUCache(
+    maxsize=settings.JWT_CLAIMS_CACHE_SIZE,
+    ttl=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def _encode(claims: Dict[str, Any]) -> str:
+    keys = get_key_set()
+    return get_backend().encode(claims, keys.signing_key, keys.algorithm, keys.signing_kid)
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    """Verified claims; raises InvalidToken."""
+    keys = get_key_set()
+    backend = get_backend()
+    key = keys.verification_key(backend.unverified_kid(token))
+    return backend.decode(token, key, keys.algorithm)
+
+
+def new_token_id() -> str:
+    """Generate an id for a token (``jti``) or login session (``sid``)."""
+    return secrets.token_hex(16)
+
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    session_id: Optional[str] = None,
 ) -> str:
     """Create JWT access token."""
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(
+        expire = now + timedelta(
             minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    to_encode = {
+        "exp": expire,
+        "iat": now,
+        "sub": str(subject),
+        "type": "access",
+        "jti": new_token_id(),
+        "sid": session_id or new_token_id(),
+    }
+    return _encode(to_encode)
 
 
 def create_refresh_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    session_id: Optional[str] = None,
+    token_id: Optional[str] = None,
 ) -> str:
     """Create JWT refresh token."""
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(
+        expire = now + timedelta(
             days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS
         )
 
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
-    )
-    return encoded_jwt
+    to_encode = {
+        "exp": expire,
+        "iat": now,
+        "sub": str(subject),
+        "type": "refresh",
+        "jti": token_id or new_token_id(),
+        "sid": session_id or new_token_id(),
+    }
+    return _encode(to_encode)
+
+
+def decode_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
+    """Verify JWT token and return its claims (do not modify them).
+
+    Revocation is checked separately (see app/core/revocation.py).
+    """
+    digest = hashlib.blake2b(token.encode("ascii", "replace"), digest_size=16).hexdigest()
+    payload = claims_cache.get(digest)
+    if payload is None:
+        try:
+            payload = _decode(token)
+        except InvalidToken:
+            return None
+        remaining = payload["exp"] - time.time() if "exp" in payload else None
+        if remaining is not None and remaining > 0:
+            claims_cache.set(digest, payload, ttl=remaining)
+
+    # Tokens issued before revocation support carry no jti/sid
+    if (
+        payload.get("sub") is None
+        or payload.get("type") != token_type
+        or not payload.get("jti")
+        or not payload.get("sid")
+    ):
+        return None
+    return payload
 
 
 def verify_token(token: str, token_type: str = "access") -> Optional[str]:
     """Verify JWT token and return subject."""
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        subject: str = payload.get("sub")
-        token_type_claim: str = payload.get("type")
-
-        if subject is None or token_type_claim != token_type:
-            return None
-
-        return subject
-    except JWTError:
-        return None
+    payload = decode_token(token, token_type)
+    return payload["sub"] if payload else None
 
 
 def get_password_hash(password: str) -> str:
@@ -80,22 +139,14 @@ def generate_password_reset_token(email: str) -> str:
     now = datetime.utcnow()
     expires = now + delta
     exp = expires.timestamp()
-    encoded_jwt = jwt.encode(
-        {"exp": exp, "nbf": now, "sub": email},
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
-    return encoded_jwt
+    return _encode({"exp": exp, "nbf": now, "sub": email})
 
 
 def verify_password_reset_token(token: str) -> Optional[str]:
     """Verify password reset token."""
     try:
-        decoded_token = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        return decoded_token["sub"]
-    except JWTError:
+        return _decode(token)["sub"]
+    except InvalidToken:
         return None
 
 
@@ -0,0 +1,233 @@
+"""
+JWT signing keys and pluggable JWT libraries.
+
+HS256 signs with JWT_SECRET_KEY, as before. For RS256 or EdDSA, point
+JWT_KEYS_DIR at a directory of PEM files named ``<kid>.pem`` and set
+JWT_SIGNING_KEY_ID to the key that signs. Other files there may hold only
+the public half of a retired key pair. Tokens signed by a retired key keep
+verifying until they expire, and after that its file can be removed.
+Every token names its key in the ``kid`` header. The public keys are
+served as a JWKS at /.well-known/jwks.json, so other services can verify
+tokens offline.
+
+Keys are parsed once per process. The library gets ready key objects, not
+PEM text that it would parse again on every call.
+
+JWT_BACKEND picks the library. ``jose`` is python-jose (HS256, RS256).
+``pyjwt`` is PyJWT, which also supports EdDSA and verifies faster.
+"""
+
+import base64
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jose import JWTError, jwk
+from jose import jwt as jose_jwt
+
+from app.core.config import settings
+
+try:
+    import jwt as pyjwt
+except ImportError:  # optional: PyJWT[crypto]
+    pyjwt = None
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "EdDSA"}
+
+
+class InvalidToken(Exception):
+    """Signature, expiry, key or format check failed."""
+
+
+class JWTBackend(Protocol):
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str]) -> str:
+        ...
+
+    def unverified_kid(self, token: str) -> Optional[str]:
+        ...
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]:
+        ...
+
+
+class JoseBackend:
+    """python-jose."""
+
+    def __init__(self):
+        # jose wants its own key objects; build each one once
+        self._keys: Dict[int, Tuple[Any, jwk.Key]] = {}
+
+    def _key(self, key: Any, algorithm: str) -> jwk.Key:
+        prepared = self._keys.get(id(key))
+        if prepared is None:
+            if isinstance(key, rsa.RSAPrivateKey):
+                data = key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+            elif isinstance(key, rsa.RSAPublicKey):
+                data = key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+            elif isinstance(key, str):
+                data = key
+            else:
+                raise ValueError(
+                    f"python-jose does not support {algorithm} keys; use JWT_BACKEND=pyjwt"
+                )
+            # Keep the original alive so its id is not reused
+            prepared = self._keys[id(key)] = (key, jwk.construct(data, algorithm))
+        return prepared[1]
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str]) -> str:
+        return jose_jwt.encode(
+            claims,
+            self._key(key, algorithm),
+            algorithm=algorithm,
+            headers={"kid": kid} if kid else None,
+        )
+
+    def unverified_kid(self, token: str) -> Optional[str]:
+        try:
+            return jose_jwt.get_unverified_header(token).get("kid")
+        except JWTError as e:
+            raise InvalidToken(str(e)) from e
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]:
+        try:
+            return jose_jwt.decode(token, self._key(key, algorithm), algorithms=[algorithm])
+        except JWTError as e:
+            raise InvalidToken(str(e)) from e
+
+
+class PyJWTBackend:
+    """PyJWT."""
+
+    def __init__(self):
+        if pyjwt is None:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT[crypto] package")
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str]) -> str:
+        return pyjwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid} if kid else None)
+
+    def unverified_kid(self, token: str) -> Optional[str]:
+        try:
+            return pyjwt.get_unverified_header(token).get("kid")
+        except pyjwt.InvalidTokenError as e:
+            raise InvalidToken(str(e)) from e
+
+    def decode(self, token: str, key: Any, algorithm: str) -> Dict[str, Any]:
+        try:
+            return pyjwt.decode(token, key, algorithms=[algorithm])
+        except pyjwt.InvalidTokenError as e:
+            raise InvalidToken(str(e)) from e
+
+
+BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+
+def _b64url_uint(value: int) -> str:
+    data = value.to_bytes((value.bit_length() + 7) // 8 or 1, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def public_jwk(kid: str, key: Any) -> Dict[str, str]:
+    """JWK of an RSA or Ed25519 public key."""
+    if isinstance(key, rsa.RSAPublicKey):
+        numbers = key.public_numbers()
+        return {
+            "kty": "RSA",
+            "use": "sig",
+            "alg": "RS256",
+            "kid": kid,
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e),
+        }
+    if isinstance(key, ed25519.Ed25519PublicKey):
+        raw = key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        return {
+            "kty": "OKP",
+            "use": "sig",
+            "alg": "EdDSA",
+            "crv": "Ed25519",
+            "kid": kid,
+            "x": base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii"),
+        }
+    raise ValueError(f"Unsupported public key type for {kid}: {type(key).__name__}")
+
+
+class KeySet:
+    """The signing key and every key tokens may still be verified with."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: Any,
+        signing_kid: Optional[str],
+        verification_keys: Dict[Optional[str], Any],
+    ):
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.signing_kid = signing_kid
+        self.verification_keys = verification_keys
+
+    @classmethod
+    def symmetric(cls, algorithm: str, secret: str) -> "KeySet":
+        return cls(algorithm, secret, None, {None: secret})
+
+    @classmethod
+    def from_directory(cls, algorithm: str, directory: Path, signing_kid: str) -> "KeySet":
+        """Load ``<kid>.pem`` private or public keys."""
+        private_keys: Dict[str, Any] = {}
+        public_keys: Dict[Optional[str], Any] = {}
+        for path in sorted(directory.glob("*.pem")):
+            data = path.read_bytes()
+            if b"PRIVATE KEY" in data:
+                private_keys[path.stem] = load_pem_private_key(data, password=None)
+                public_keys[path.stem] = private_keys[path.stem].public_key()
+            else:
+                public_keys[path.stem] = load_pem_public_key(data)
+        if signing_kid not in private_keys:
+            raise ValueError(f"No private key {signing_kid}.pem in {directory}")
+        return cls(algorithm, private_keys[signing_kid], signing_kid, public_keys)
+
+    def verification_key(self, kid: Optional[str]) -> Any:
+        try:
+            return self.verification_keys[kid]
+        except KeyError:
+            raise InvalidToken(f"Unknown key id {kid!r}") from None
+
+    def jwks(self) -> Dict[str, Any]:
+        """Public keys for offline verification (none for HS256)."""
+        return {
+            "keys": [
+                public_jwk(kid, key)
+                for kid, key in self.verification_keys.items()
+                if kid is not None and self.algorithm in ASYMMETRIC_ALGORITHMS
+            ]
+        }
+
+
+@lru_cache()
+def get_key_set() -> KeySet:
+    """Keys for JWT_ALGORITHM, loaded on first use."""
+    if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return KeySet.symmetric(settings.JWT_ALGORITHM, settings.JWT_SECRET_KEY)
+    if not settings.JWT_KEYS_DIR or not settings.JWT_SIGNING_KEY_ID:
+        raise ValueError(f"{settings.JWT_ALGORITHM} needs JWT_KEYS_DIR and JWT_SIGNING_KEY_ID")
+    return KeySet.from_directory(
+        settings.JWT_ALGORITHM, Path(settings.JWT_KEYS_DIR), settings.JWT_SIGNING_KEY_ID
+    )
+
+
+@lru_cache()
+def get_backend() -> JWTBackend:
+    """The JWT library selected by JWT_BACKEND."""
+    try:
+        return BACKENDS[settings.JWT_BACKEND]()
+    except KeyError:
+        raise ValueError(f"Unknown JWT_BACKEND {settings.JWT_BACKEND!r}") from None
@@ -0,0 +1,168 @@
+"""
+Object storage (S3/MinIO).
+
+One long-lived boto3 client per process, with a connection pool sized by
+STORAGE_MAX_CONNECTIONS, is shared by uploads, the processing pipeline,
+exports and deletions. boto3 is blocking, so every network call runs on a
+dedicated thread pool of STORAGE_MAX_CONCURRENCY workers. The event loop
+never blocks, and storage concurrency has a hard bound that does not
+depend on the default executor. The API creates the client in ``lifespan``;
+workers get it lazily on first use.
+
+With S3_ENDPOINT=memory:// the client is an in-process stand-in
+(app/core/memory_storage.py) for tests and local runs without MinIO.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from app.core.config import settings
+
+MB = 1024 * 1024
+MEMORY_URL_SCHEME = "memory://"
+# S3 DeleteObjects limit
+DELETE_BATCH_SIZE = 1000
+
+
+class Storage:
+    """Async facade over a pooled boto3 S3 client for one bucket."""
+
+    def __init__(self, client: Any, bucket: str, max_concurrency: int):
+        self.client = client
+        self.bucket = bucket
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="storage"
+        )
+        # Files above the threshold go up as parallel multipart uploads
+        self._transfer = TransferConfig(
+            multipart_threshold=settings.STORAGE_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.STORAGE_MULTIPART_THRESHOLD_MB * MB,
+            max_concurrency=max_concurrency,
+        )
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def presign_post(
+        self,
+        key: str,
+        fields: Optional[Dict[str, str]] = None,
+        conditions: Optional[List[Any]] = None,
+        expires_in: int = 900,
+    ) -> Dict[str, Any]:
+        """Sign a browser POST policy. Local computation, no request is made."""
+        return self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields=fields,
+            Conditions=conditions,
+            ExpiresIn=expires_in,
+        )
+
+    def presign_get(self, key: str, expires_in: int = 900) -> str:
+        """Sign a GET URL for an object. Local computation, no request is made."""
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    async def put(self, key: str, file: BinaryIO, content_type: str) -> None:
+        """Upload a file object, switching to multipart for large files."""
+        await self._run(
+            self.client.upload_fileobj,
+            file,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self._transfer,
+        )
+
+    async def get(self, key: str) -> bytes:
+        """Read a whole object."""
+        response = await self._run(self.client.get_object, Bucket=self.bucket, Key=key)
+        return await self._run(response["Body"].read)
+
+    async def stream(self, key: str, chunk_size: int = MB) -> AsyncIterator[bytes]:
+        """Read an object chunk by chunk without holding it in memory."""
+        response = await self._run(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await self._run(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def find(self, prefix: str) -> Optional[Tuple[str, int]]:
+        """Key and size of the first object under ``prefix``, if any."""
+        response = await self._run(
+            self.client.list_objects_v2, Bucket=self.bucket, Prefix=prefix, MaxKeys=1
+        )
+        for item in response.get("Contents", []):
+            return item["Key"], item["Size"]
+        return None
+
+    async def delete_many(self, keys: Iterable[str]) -> List[str]:
+        """Delete objects in batches; returns the keys that failed."""
+        keys = list(keys)
+        batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+        responses = await asyncio.gather(*(
+            self._run(
+                self.client.delete_objects,
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for batch in batches
+        ))
+        return [error["Key"] for response in responses for error in response.get("Errors", [])]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.client.close()
+
+
+_storage: Optional[Storage] = None
+
+
+def init_storage() -> Storage:
+    """Create the process-wide storage client (idempotent)."""
+    global _storage
+    if _storage is None and (settings.S3_ENDPOINT or "").startswith(MEMORY_URL_SCHEME):
+        from app.core.memory_storage import MemoryStorage
+
+        _storage = MemoryStorage(settings.S3_BUCKET_NAME)
+    if _storage is None:
+        client = boto3.client(
+            "s3",
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=settings.STORAGE_MAX_CONNECTIONS,
+                retries={"max_attempts": 3, "mode": "adaptive"},
+            ),
+            **settings.get_s3_config(),
+        )
+        _storage = Storage(client, settings.S3_BUCKET_NAME, settings.STORAGE_MAX_CONCURRENCY)
+    return _storage
+
+
+def get_storage() -> Storage:
+    """Get the process-wide storage client (created on first use)."""
+    return init_storage()
+
+
+def close_storage() -> None:
+    """Release pooled connections and worker threads."""
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
@@ -10,8 +10,14 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1.api import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import DBUsage, close_db, db_usage, init_db
+from app.core.redis import close_redis, init_redis, ping as ping_redis
+from app.core.revocation import revocation_list
+from app.core.signing import get_key_set
+from app.core.storage import close_storage, init_storage
+from app.services.images import close_image_pool
 
 # Configure structured logging
 structlog.configure(
@@ -42,12 +48,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting up expense manager API", version=settings.VERSION)
     await init_db()
     logger.info("Database initialized successfully")
+    init_storage()
+    await init_redis()
+    await revocation_list.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down expense manager API")
+    await revocation_list.stop()
     await close_db()
+    await close_redis()
+    close_image_pool()
+    close_storage()
     logger.info("Database connections closed")
 
 
@@ -71,6 +84,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli compression; streams NDJSON chunk by chunk
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 # Trusted host middleware for security
 if not settings.DEBUG:
     app.add_middleware(
@@ -93,6 +114,8 @@ async def log_requests(request: Request, call_next):
         request_id=request_id,
     )
 
+    usage = DBUsage()
+    usage_token = db_usage.set(usage)
     try:
         response = await call_next(request)
 
@@ -102,10 +125,17 @@ async def log_requests(request: Request, call_next):
             url=str(request.url),
             status_code=response.status_code,
             request_id=request_id,
+            db_checkouts=usage.checkouts,
+            db_queries=usage.queries,
+            db_replica_queries=usage.replica_queries,
         )
 
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
+        if settings.DB_USAGE_HEADERS:
+            response.headers["X-DB-Checkouts"] = str(usage.checkouts)
+            response.headers["X-DB-Queries"] = str(usage.queries)
+            response.headers["X-DB-Replica-Queries"] = str(usage.replica_queries)
         return response
 
     except Exception as e:
@@ -117,6 +147,8 @@ async def log_requests(request: Request, call_next):
             request_id=request_id,
         )
         raise
+    finally:
+        db_usage.reset(usage_token)
 
 
 # Exception handlers
@@ -174,18 +206,26 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint."""
+    redis_healthy = await ping_redis()
     return {
-        "status": "healthy",
+        # Redis features degrade without it, so the API stays up
+        "status": "healthy" if redis_healthy else "degraded",
         "version": settings.VERSION,
         "timestamp": "2024-01-01T00:00:00Z",  # Will be replaced by actual timestamp
         "services": {
             "database": "healthy",  # TODO: Add actual health checks
-            "redis": "healthy",
+            "redis": "healthy" if redis_healthy else "unavailable",
             "minio": "healthy",
         }
     }
 
 
+@app.get("/.well-known/jwks.json", tags=["Health"])
+async def jwks():
+    """Public keys for verifying access tokens offline (RS256/EdDSA only)."""
+    return get_key_set().jwks()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint."""
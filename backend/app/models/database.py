@@ -1,14 +1,17 @@
+import enum
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    CheckConstraint,
     Date,
     DateTime,
-    Decimal as SQLDecimal,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -16,7 +19,9 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    or_,
     select,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -24,6 +29,7 @@ from sqlalchemy.sql import func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import Base
+from app.models.types import Money
 
 
 class User(Base):
@@ -35,7 +41,7 @@ class User(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     email: Mapped[str] = mapped_column(
-        String(255), unique=True, index=True, nullable=False
+        String(255), unique=True, nullable=False
     )
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     timezone: Mapped[str] = mapped_column(String(50), default="UTC")
@@ -65,8 +71,6 @@ class User(Base):
         "AuditCorrection", back_populates="user", cascade="all, delete-orphan"
     )
 
-    __table_args__ = (Index("idx_user_email", "email"),)
-
     # Class methods for database operations
     @classmethod
     async def get_by_id(cls, db: AsyncSession, user_id: uuid.UUID) -> Optional["User"]:
@@ -105,7 +109,7 @@ class Category(Base):
     color: Mapped[str] = mapped_column(String(7), nullable=False)  # Hex color
     icon: Mapped[str] = mapped_column(String(10), nullable=False)  # Emoji
     monthly_budget: Mapped[Optional[Decimal]] = mapped_column(
-        SQLDecimal(precision=10, scale=2), nullable=True
+        Money, nullable=True
     )
     is_global: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(
@@ -127,7 +131,9 @@ class Category(Base):
         "VendorMapping", back_populates="category"
     )
     audit_corrections: Mapped[list["AuditCorrection"]] = relationship(
-        "AuditCorrection", back_populates="new_category"
+        "AuditCorrection",
+        back_populates="new_category",
+        foreign_keys="AuditCorrection.new_category_id",
     )
 
     __table_args__ = (
@@ -135,8 +141,21 @@ class Category(Base):
         Index("idx_category_user", "user_id"),
     )
 
+    @classmethod
+    async def get_for_user(
+        cls, db: AsyncSession, category_id: uuid.UUID, user_id: uuid.UUID
+    ) -> Optional["Category"]:
+        """Get a category visible to the user (own or global)."""
+        result = await db.execute(
+            select(cls).where(
+                cls.id == category_id,
+                or_(cls.user_id == user_id, cls.is_global.is_(True)),
+            )
+        )
+        return result.scalar_one_or_none()
 
-class TransactionStatus(str, Enum):
+
+class TransactionStatus(str, enum.Enum):
     """Transaction processing status."""
     PROCESSING = "processing"
     PARSED = "parsed"
@@ -157,23 +176,33 @@ class Transaction(Base):
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
-    category_id: Mapped[UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("categories.id"), nullable=False
+    # Receipt fields stay empty until the pipeline parses the upload;
+    # ck_transaction_complete_when_counted requires them once confirmed
+    category_id: Mapped[Optional[UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True
     )
-    amount: Mapped[Decimal] = mapped_column(
-        SQLDecimal(precision=10, scale=2), nullable=False
+    amount: Mapped[Optional[Decimal]] = mapped_column(
+        Money, nullable=True
     )
-    date: Mapped[date] = mapped_column(Date, nullable=False)
-    vendor: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    vendor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     image_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # Rendition name -> storage key (see app/services/images.py)
+    image_variants: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     parsed_json: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     confidence_score: Mapped[Optional[float]] = mapped_column(
-        Integer, nullable=True
-    )  # ML confidence percentage
+        Float(precision=24), nullable=True
+    )  # ML confidence, 0.0-1.0 (REAL)
     status: Mapped[TransactionStatus] = mapped_column(
         Enum(TransactionStatus), default=TransactionStatus.PROCESSING
     )
+    # Processing queue bookkeeping (see app/workers/queue.py)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -189,11 +218,46 @@ class Transaction(Base):
     )
 
     __table_args__ = (
-        Index("idx_transaction_user_date", "user_id", "date"),
+        # Covers the per-user monthly aggregates (sum/group by category)
+        # so they can be answered with an index-only scan.
+        Index(
+            "idx_transaction_user_date",
+            "user_id",
+            "date",
+            postgresql_include=["amount", "category_id"],
+        ),
         Index("idx_transaction_vendor", "vendor"),
-        Index("idx_transaction_status", "status"),
+        # Worker queue: only rows still moving through the pipeline.
+        Index(
+            "idx_transaction_pending",
+            "created_at",
+            postgresql_where=text(
+                "status IN ('PROCESSING', 'PARSED', 'CLASSIFIED')"
+            ),
+        ),
+        CheckConstraint(
+            "status NOT IN ('CONFIRMED', 'CORRECTED') OR ("
+            "category_id IS NOT NULL AND amount IS NOT NULL "
+            "AND date IS NOT NULL AND vendor IS NOT NULL)",
+            name="ck_transaction_complete_when_counted",
+        ),
     )
 
+    @classmethod
+    async def get_for_user(
+        cls,
+        db: AsyncSession,
+        transaction_id: uuid.UUID,
+        user_id: uuid.UUID,
+        for_update: bool = False,
+    ) -> Optional["Transaction"]:
+        """Get a transaction owned by the user, row-locked if ``for_update``."""
+        query = select(cls).where(cls.id == transaction_id, cls.user_id == user_id)
+        if for_update:
+            query = query.with_for_update()
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
 
 class BudgetsHistory(Base):
     """Budget history tracking model."""
@@ -211,7 +275,7 @@ class BudgetsHistory(Base):
     )
     month: Mapped[str] = mapped_column(String(7), nullable=False)  # YYYY-MM format
     budget_amount: Mapped[Decimal] = mapped_column(
-        SQLDecimal(precision=10, scale=2), nullable=False
+        Money, nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -229,6 +293,56 @@ class BudgetsHistory(Base):
     )
 
 
+class MonthlySpending(Base):
+    """Running spent counters per user, category and month.
+
+    Maintained incrementally by app.services.budgets whenever a transaction
+    enters, leaves or changes within the confirmed set.
+    """
+
+    __tablename__ = "monthly_spending"
+
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    # Key order (user_id, month, category_id) serves per-month lookups
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)  # YYYY-MM format
+    category_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categories.id"), primary_key=True
+    )
+    spent: Mapped[Decimal] = mapped_column(Money, nullable=False, default=0)
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Incremented by every change; lets the Redis copy tell which changes it has
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class SpendingForecast(Base):
+    """Fitted spending model per user and category.
+
+    Damped-trend exponential smoothing state in cents, refreshed by the
+    nightly forecast job (app/workers/forecast_job.py).
+    """
+
+    __tablename__ = "spending_forecasts"
+
+    user_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    category_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categories.id"), primary_key=True
+    )
+    fitted_through: Mapped[str] = mapped_column(String(7), nullable=False)  # YYYY-MM
+    level: Mapped[float] = mapped_column(Float, nullable=False)
+    trend: Mapped[float] = mapped_column(Float, nullable=False)
+    residual_std: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
 class VendorMapping(Base):
     """Vendor to category mapping for learning."""
 
@@ -240,7 +354,7 @@ class VendorMapping(Base):
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
-    vendor_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    vendor_name: Mapped[str] = mapped_column(String(255), nullable=False)
     category_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("categories.id"), nullable=False
     )
@@ -260,13 +374,36 @@ class VendorMapping(Base):
     )
 
     __table_args__ = (
+        # The unique constraint also serves lookups by user_id alone.
         UniqueConstraint("user_id", "vendor_name", name="unique_vendor_per_user"),
-        Index("idx_vendor_mapping_user", "user_id"),
         Index("idx_vendor_mapping_name", "vendor_name"),
     )
 
-
-class CorrectionType(str, Enum):
+    @classmethod
+    async def remember(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        vendor_name: str,
+        category_id: uuid.UUID,
+    ) -> "VendorMapping":
+        """Create or reinforce the user's mapping for a vendor."""
+        result = await db.execute(
+            select(cls).where(cls.user_id == user_id, cls.vendor_name == vendor_name)
+        )
+        mapping = result.scalar_one_or_none()
+        if mapping is None:
+            mapping = cls(user_id=user_id, vendor_name=vendor_name, category_id=category_id)
+            db.add(mapping)
+        elif mapping.category_id == category_id:
+            mapping.usage_count += 1
+        else:
+            mapping.category_id = category_id
+            mapping.usage_count = 1
+        return mapping
+
+
+class CorrectionType(str, enum.Enum):
     """Types of corrections users can make."""
     CATEGORY = "category"
     VENDOR = "vendor"
@@ -297,10 +434,10 @@ class AuditCorrection(Base):
     old_vendor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     new_vendor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     old_amount: Mapped[Optional[Decimal]] = mapped_column(
-        SQLDecimal(precision=10, scale=2), nullable=True
+        Money, nullable=True
     )
     new_amount: Mapped[Optional[Decimal]] = mapped_column(
-        SQLDecimal(precision=10, scale=2), nullable=True
+        Money, nullable=True
     )
     correction_type: Mapped[CorrectionType] = mapped_column(
         Enum(CorrectionType), nullable=False
@@ -315,11 +452,15 @@ class AuditCorrection(Base):
     )
     user: Mapped["User"] = relationship("User", back_populates="audit_corrections")
     new_category: Mapped["Category"] = relationship(
-        "Category", back_populates="audit_corrections"
+        "Category",
+        back_populates="audit_corrections",
+        foreign_keys=[new_category_id],
     )
 
     __table_args__ = (
         Index("idx_audit_transaction", "transaction_id"),
         Index("idx_audit_user", "user_id"),
+        # Watermark scans of the active-learning job
+        Index("idx_audit_created", "created_at", "id"),
         Index("idx_audit_correction_type", "correction_type"),
     )
\ No newline at end of file
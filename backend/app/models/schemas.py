@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Annotated, Dict, Optional, List
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
@@ -8,6 +8,13 @@ from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from app.models.database import TransactionStatus, CorrectionType
 
 
+# Money amounts are stored as BIGINT cents, so reject sub-cent precision.
+# 15 digits (under 10^15 cents) leaves room below the int64 limit for the
+# monthly_spending sums, so an oversized amount is a 422 rather than a
+# database overflow
+Cents = Annotated[Decimal, Field(max_digits=15, decimal_places=2)]
+
+
 # Base Models
 class BaseSchema(BaseModel):
     """Base schema with common configuration."""
@@ -65,7 +72,7 @@ class CategoryBase(BaseSchema):
     name: str = Field(..., min_length=1, max_length=100)
     color: str = Field(..., pattern=r"^#[0-9A-Fa-f]{6}$")
     icon: str = Field(..., min_length=1, max_length=10)
-    monthly_budget: Optional[Decimal] = Field(None, ge=0)
+    monthly_budget: Optional[Cents] = Field(None, ge=0)
 
 
 class CategoryCreate(CategoryBase):
@@ -78,7 +85,7 @@ class CategoryUpdate(BaseSchema):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     color: Optional[str] = Field(None, pattern=r"^#[0-9A-Fa-f]{6}$")
     icon: Optional[str] = Field(None, min_length=1, max_length=10)
-    monthly_budget: Optional[Decimal] = Field(None, ge=0)
+    monthly_budget: Optional[Cents] = Field(None, ge=0)
 
 
 class CategoryResponse(CategoryBase):
@@ -93,7 +100,7 @@ class CategoryResponse(CategoryBase):
 # Transaction Schemas
 class TransactionBase(BaseSchema):
     """Base transaction schema."""
-    amount: Decimal = Field(..., gt=0)
+    amount: Cents = Field(..., gt=0)
     date: date
     vendor: str = Field(..., min_length=1, max_length=255)
     category_id: UUID
@@ -108,7 +115,7 @@ class TransactionCreate(TransactionBase):
 
 class TransactionUpdate(BaseSchema):
     """Transaction update schema."""
-    amount: Optional[Decimal] = Field(None, gt=0)
+    amount: Optional[Cents] = Field(None, gt=0)
     date: Optional[date] = None
     vendor: Optional[str] = Field(None, min_length=1, max_length=255)
     category_id: Optional[UUID] = None
@@ -118,19 +125,25 @@ class TransactionConfirm(BaseSchema):
     """Transaction confirmation schema."""
     category_id: UUID
     vendor: str = Field(..., min_length=1, max_length=255)
-    amount: Decimal = Field(..., gt=0)
+    amount: Cents = Field(..., gt=0)
     date: date
     remember_vendor: bool = False
 
 
 class TransactionResponse(TransactionBase):
     """Transaction response schema."""
+    # Empty while a receipt is still being processed
+    amount: Optional[Decimal]
+    date: Optional[date]
+    vendor: Optional[str]
+    category_id: Optional[UUID]
     id: UUID
     user_id: UUID
     raw_text: Optional[str]
     image_url: Optional[str]
+    image_variants: Optional[Dict[str, str]] = None
     parsed_json: Optional[dict]
-    confidence_score: Optional[int]
+    confidence_score: Optional[float]
     status: TransactionStatus
     created_at: datetime
     updated_at: datetime
@@ -151,6 +164,22 @@ class TransactionUploadResponse(BaseSchema):
     message: str = "Receipt uploaded successfully. Processing started."
 
 
+class ReceiptUploadRequest(BaseSchema):
+    """Presigned receipt upload request schema."""
+    filename: str = Field(..., min_length=1, max_length=255)
+    # Informational: the signed content type is derived from the extension
+    content_type: str = Field(..., min_length=1, max_length=100)
+    size: int = Field(..., gt=0)  # bytes
+
+
+class PresignedUpload(BaseSchema):
+    """Presigned receipt upload response schema."""
+    upload_id: UUID
+    url: str
+    fields: Dict[str, str]  # form fields to send with the file in a POST
+    expires_at: datetime
+
+
 class TransactionStatusResponse(BaseSchema):
     """Transaction status response schema."""
     status: TransactionStatus
@@ -162,7 +191,7 @@ class TransactionStatusResponse(BaseSchema):
 # Budget Schemas
 class BudgetCreate(BaseSchema):
     """Budget creation schema."""
-    amount: Decimal = Field(..., gt=0)
+    amount: Cents = Field(..., gt=0)
     month: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}$")
 
 
@@ -177,6 +206,15 @@ class BudgetResponse(BaseSchema):
     percentage_used: float
 
 
+class BudgetSummary(BaseSchema):
+    """Budget summary response schema."""
+    month: str
+    total_budget: Decimal
+    total_spent: Decimal
+    total_remaining: Decimal
+    categories: List[BudgetResponse]
+
+
 class BudgetHistory(BaseSchema):
     """Budget history response schema."""
     month: str
@@ -0,0 +1,42 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional, Union
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value: Union[Decimal, int, float, str]) -> int:
+    """Convert a money amount to integer cents (half-up rounding)."""
+    return int((Decimal(str(value)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: Union[int, Decimal]) -> Decimal:
+    """Convert integer cents back to a two-place Decimal."""
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+class Money(TypeDecorator):
+    """Money stored as BIGINT cents, exposed to Python as Decimal.
+
+    Storage and SQL arithmetic (SUM, comparisons) run on integers; the
+    Decimal conversion happens once per value at the ORM boundary. Use
+    ``type_coerce(column, BigInteger)`` to read raw cents, e.g. when loading
+    columns into NumPy arrays.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[Union[Decimal, int, float, str]], dialect
+    ) -> Optional[int]:
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[Decimal]:
+        if value is None:
+            return None
+        return from_cents(value)
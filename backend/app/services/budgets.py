@@ -0,0 +1,381 @@
+"""
+Budget progress engine.
+
+Spending is kept as running per-(user, category, month) counters in
+``monthly_spending`` instead of being re-aggregated from ``transactions`` on
+every read. Writers call :func:`apply_spending_change` inside the same
+database transaction that confirms, edits or deletes a transaction, then
+:func:`write_through` after commit to patch the Redis copy of the month.
+Readers get a month's counters from Redis, falling back to one indexed
+primary-key range read, so budget lookups are O(categories).
+
+Every counter row carries a version that each change increments. The
+cached hash keeps the version it holds for each category. A write-through
+is applied only on top of the version just before its own. It is skipped
+if a fill already read it, and the hash is dropped when an earlier change
+is still missing. So a fill racing a commit cannot count a delta twice.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import use_primary
+from app.core.redis import Script, get_redis, pipelined
+from app.models.database import (
+    BudgetsHistory,
+    Category,
+    MonthlySpending,
+    Transaction,
+    TransactionStatus,
+)
+from app.models.schemas import BudgetResponse, BudgetSummary
+from app.models.types import from_cents, to_cents
+
+logger = structlog.get_logger()
+
+# Transactions that count towards spending
+COUNTED_STATUSES = (TransactionStatus.CONFIRMED, TransactionStatus.CORRECTED)
+
+# Bounds how long a cache fill racing a concurrent write can stay stale
+SPENDING_CACHE_TTL = 60 * 60
+# Marks a month hash as fully loaded, so empty months are cache hits too
+LOADED_FIELD = "_loaded"
+# Hash field holding the counter version a category's cached value includes
+VERSION_FIELD = "v:{}"
+
+
+async def _increment_if_cached_local(redis, keys, args):
+    if not await redis.exists(keys[0]):
+        return None
+    category, cents, version = args[0], int(args[1]), int(args[2])
+    seen = await redis.hget(keys[0], VERSION_FIELD.format(category))
+    if seen is None:
+        if await redis.hexists(keys[0], category):
+            await redis.delete(keys[0])
+            return None
+        seen = 0
+    seen = int(seen)
+    if seen >= version:
+        return None
+    if seen == version - 1:
+        await redis.hset(keys[0], VERSION_FIELD.format(category), version)
+        return await redis.hincrby(keys[0], category, cents)
+    await redis.delete(keys[0])
+    return None
+
+
+# Apply a committed delta (ARGV: category, cents, row version) to a cached
+# month. Already included by the fill: skip. An earlier delta still
+# missing, or a hash without versions: drop it, the next read rebuilds it.
+_increment_if_cached = Script(
+    """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local version_field = 'v:' .. ARGV[1]
+local seen = redis.call('HGET', KEYS[1], version_field)
+if not seen then
+    if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+        redis.call('DEL', KEYS[1])
+        return nil
+    end
+    seen = 0
+end
+seen = tonumber(seen)
+local version = tonumber(ARGV[3])
+if seen >= version then
+    return nil
+end
+if seen == version - 1 then
+    redis.call('HSET', KEYS[1], version_field, version)
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+redis.call('DEL', KEYS[1])
+return nil
+""",
+    local=_increment_if_cached_local,
+)
+
+
+def month_of(value: date) -> str:
+    """Format a date as a YYYY-MM budget month."""
+    return f"{value:%Y-%m}"
+
+
+def current_month() -> str:
+    """Current budget month."""
+    return month_of(date.today())
+
+
+def previous_month(month: str) -> str:
+    """The month before a YYYY-MM month."""
+    year, mon = map(int, month.split("-"))
+    return f"{year - 1}-12" if mon == 1 else f"{year}-{mon - 1:02d}"
+
+
+def _spending_key(user_id: UUID, month: str) -> str:
+    return f"budget:spent:{user_id}:{month}"
+
+
+@dataclass(frozen=True)
+class SpendingEntry:
+    """A transaction's contribution to one spending counter."""
+
+    user_id: UUID
+    category_id: UUID
+    month: str
+    amount: Decimal
+    count: int = 1
+    # Counter row version once this change is applied; set by apply_spending_change
+    version: int = 0
+
+    @classmethod
+    def from_transaction(cls, transaction: Transaction) -> Optional["SpendingEntry"]:
+        """Contribution of a transaction, or None if it does not count."""
+        if transaction.status not in COUNTED_STATUSES:
+            return None
+        return cls(
+            user_id=transaction.user_id,
+            category_id=transaction.category_id,
+            month=month_of(transaction.date),
+            amount=transaction.amount,
+        )
+
+    def negate(self) -> "SpendingEntry":
+        return SpendingEntry(
+            self.user_id, self.category_id, self.month, -self.amount, -self.count
+        )
+
+
+async def apply_spending_change(
+    db: AsyncSession,
+    before: Optional[SpendingEntry],
+    after: Optional[SpendingEntry],
+) -> List[SpendingEntry]:
+    """Move a transaction's contribution from ``before`` to ``after``.
+
+    Runs inside the caller's transaction. Returns the deltas applied, to be
+    passed to :func:`write_through` once the caller has committed.
+    """
+    if before == after:
+        return []
+
+    deltas = []
+    for delta in (before.negate() if before else None, after):
+        if delta is None:
+            continue
+        stmt = insert(MonthlySpending).values(
+            user_id=delta.user_id,
+            month=delta.month,
+            category_id=delta.category_id,
+            spent=delta.amount,
+            transaction_count=delta.count,
+            version=1,
+        )
+        version = await db.scalar(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "month", "category_id"],
+                set_={
+                    "spent": MonthlySpending.spent + stmt.excluded.spent,
+                    "transaction_count": (
+                        MonthlySpending.transaction_count + stmt.excluded.transaction_count
+                    ),
+                    "version": MonthlySpending.version + 1,
+                    "updated_at": func.now(),
+                },
+            ).returning(MonthlySpending.version)
+        )
+        deltas.append(replace(delta, version=version))
+    return deltas
+
+
+async def write_through(deltas: List[SpendingEntry]) -> None:
+    """Apply committed deltas to cached months. Cache errors are logged only."""
+    if not deltas:
+        return
+    try:
+        async with pipelined() as pipe:
+            for delta in deltas:
+                await _increment_if_cached(
+                    keys=[_spending_key(delta.user_id, delta.month)],
+                    args=[str(delta.category_id), to_cents(delta.amount), delta.version],
+                    client=pipe,
+                )
+    except RedisError as e:
+        logger.warning("Budget cache write-through failed", exception=str(e))
+
+
+async def get_month_spending(
+    db: AsyncSession, user_id: UUID, month: str
+) -> Dict[UUID, Decimal]:
+    """Spent amount per category for a month."""
+    redis = get_redis()
+    key = _spending_key(user_id, month)
+    try:
+        cached = await redis.hgetall(key)
+    except RedisError as e:
+        logger.warning("Budget cache read failed", exception=str(e))
+        cached = None
+
+    if cached:
+        return {
+            UUID(field): from_cents(int(value))
+            for field, value in cached.items()
+            if field != LOADED_FIELD and not field.startswith("v:")
+        }
+
+    if cached is not None:
+        # Writers only patch a filled hash, so the fill must not be stale
+        use_primary(db)
+    result = await db.execute(
+        select(
+            MonthlySpending.category_id, MonthlySpending.spent, MonthlySpending.version
+        ).where(MonthlySpending.user_id == user_id, MonthlySpending.month == month)
+    )
+    rows = result.all()
+    spending = {category_id: spent for category_id, spent, _ in rows}
+
+    if cached is not None:
+        mapping = {}
+        for category_id, spent, version in rows:
+            mapping[str(category_id)] = to_cents(spent)
+            mapping[VERSION_FIELD.format(category_id)] = version
+        mapping[LOADED_FIELD] = 1
+        try:
+            async with pipelined(transaction=True) as pipe:
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, SPENDING_CACHE_TTL)
+        except RedisError as e:
+            logger.warning("Budget cache fill failed", exception=str(e))
+
+    return spending
+
+
+def _budget_query(user_id: UUID, month: str):
+    """Categories with a budget for the month: explicit history, else the default."""
+    amount = func.coalesce(BudgetsHistory.budget_amount, Category.monthly_budget)
+    return (
+        select(Category.id, Category.name, amount.label("amount"))
+        .outerjoin(
+            BudgetsHistory,
+            and_(
+                BudgetsHistory.category_id == Category.id,
+                BudgetsHistory.user_id == user_id,
+                BudgetsHistory.month == month,
+            ),
+        )
+        .where(
+            or_(Category.user_id == user_id, Category.is_global.is_(True)),
+            amount.is_not(None),
+        )
+    )
+
+
+def budget_response(
+    category_id: UUID, category_name: str, amount: Decimal, month: str, spent: Decimal
+) -> BudgetResponse:
+    return BudgetResponse(
+        category_id=category_id,
+        category_name=category_name,
+        amount=amount,
+        month=month,
+        spent=spent,
+        remaining=amount - spent,
+        percentage_used=float(spent / amount * 100) if amount else 0.0,
+    )
+
+
+async def get_category_budget(
+    db: AsyncSession, user_id: UUID, category_id: UUID, month: str
+) -> Optional[BudgetResponse]:
+    """Budget progress for one category, or None if it has no budget."""
+    result = await db.execute(
+        _budget_query(user_id, month).where(Category.id == category_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    spending = await get_month_spending(db, user_id, month)
+    return budget_response(
+        row.id, row.name, row.amount, month, spending.get(row.id, Decimal("0.00"))
+    )
+
+
+async def get_budget_summary(
+    db: AsyncSession, user_id: UUID, month: str
+) -> BudgetSummary:
+    """Budget progress for every budgeted category in a month."""
+    result = await db.execute(_budget_query(user_id, month).order_by(Category.name))
+    spending = await get_month_spending(db, user_id, month)
+
+    categories = [
+        budget_response(
+            row.id, row.name, row.amount, month, spending.get(row.id, Decimal("0.00"))
+        )
+        for row in result.all()
+    ]
+    total_budget = sum((c.amount for c in categories), Decimal("0.00"))
+    total_spent = sum((c.spent for c in categories), Decimal("0.00"))
+    return BudgetSummary(
+        month=month,
+        total_budget=total_budget,
+        total_spent=total_spent,
+        total_remaining=total_budget - total_spent,
+        categories=categories,
+    )
+
+
+async def set_category_budget(
+    db: AsyncSession, user_id: UUID, category_id: UUID, month: str, amount: Decimal
+) -> None:
+    """Create or replace the user's budget for a category and month."""
+    stmt = insert(BudgetsHistory).values(
+        user_id=user_id, category_id=category_id, month=month, budget_amount=amount
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            constraint="unique_budget_per_month",
+            set_={"budget_amount": stmt.excluded.budget_amount},
+        )
+    )
+
+
+async def roll_over_budgets(db: AsyncSession, month: str) -> int:
+    """Materialize budgets for a new month. Idempotent; caller commits.
+
+    User categories inherit ``Category.monthly_budget``; budgets set on global
+    categories (which have no per-user default) carry over from the previous
+    month. Existing rows for the month are left untouched.
+    """
+    from_defaults = insert(BudgetsHistory).from_select(
+        ["user_id", "category_id", "month", "budget_amount"],
+        select(
+            Category.user_id, Category.id, literal(month), Category.monthly_budget
+        ).where(Category.user_id.is_not(None), Category.monthly_budget.is_not(None)),
+    ).on_conflict_do_nothing(constraint="unique_budget_per_month")
+
+    carried = insert(BudgetsHistory).from_select(
+        ["user_id", "category_id", "month", "budget_amount"],
+        select(
+            BudgetsHistory.user_id,
+            BudgetsHistory.category_id,
+            literal(month),
+            BudgetsHistory.budget_amount,
+        ).where(BudgetsHistory.month == previous_month(month)),
+    ).on_conflict_do_nothing(constraint="unique_budget_per_month")
+
+    created = 0
+    for stmt in (from_defaults, carried):
+        result = await db.execute(stmt)
+        created += result.rowcount
+    return created
@@ -0,0 +1,174 @@
+"""
+Category listing.
+
+Global categories are seeded once and almost never change, so they are held
+in an immutable process-wide catalog stamped with a version number kept in
+Redis. Seeding (or any other change to global categories) bumps the stamp;
+workers notice it within CATALOG_CHECK_SECONDS and reload. Per-user data,
+the user's own categories plus transaction counts for everything they have
+used, comes from a single grouped query over the monthly_spending rollup.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import get_redis
+from app.models.database import (
+    AuditCorrection,
+    BudgetsHistory,
+    Category,
+    MonthlySpending,
+    SpendingForecast,
+    Transaction,
+    VendorMapping,
+)
+from app.models.schemas import CategoryResponse
+
+logger = structlog.get_logger()
+
+CATALOG_VERSION_KEY = "categories:global:version"
+CATALOG_CHECK_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class GlobalCatalog:
+    """Snapshot of the global categories at a catalog version."""
+
+    version: int
+    categories: Tuple[CategoryResponse, ...]
+
+
+_catalog: Optional[GlobalCatalog] = None
+_checked_at = 0.0
+
+
+async def _catalog_version() -> Optional[int]:
+    try:
+        return int(await get_redis().get(CATALOG_VERSION_KEY) or 0)
+    except RedisError as e:
+        logger.warning("Category catalog version read failed", exception=str(e))
+        return None
+
+
+async def bump_catalog_version() -> None:
+    """Make every process reload the global catalog. Call after commit."""
+    try:
+        await get_redis().incr(CATALOG_VERSION_KEY)
+    except RedisError as e:
+        logger.warning("Category catalog version bump failed", exception=str(e))
+
+
+async def get_global_catalog(db: AsyncSession) -> GlobalCatalog:
+    """The cached global catalog, reloaded when its version stamp moves."""
+    global _catalog, _checked_at
+    now = time.monotonic()
+    if _catalog is not None and now - _checked_at < CATALOG_CHECK_SECONDS:
+        return _catalog
+
+    version = await _catalog_version()
+    _checked_at = now
+    if _catalog is not None and (version is None or version == _catalog.version):
+        # Keep serving the snapshot we have if Redis is unavailable
+        return _catalog
+
+    result = await db.execute(
+        select(Category).where(Category.is_global.is_(True)).order_by(Category.name)
+    )
+    _catalog = GlobalCatalog(
+        version=version or 0,
+        categories=tuple(CategoryResponse.model_validate(c) for c in result.scalars()),
+    )
+    logger.info(
+        "Loaded global category catalog",
+        version=_catalog.version,
+        size=len(_catalog.categories),
+    )
+    return _catalog
+
+
+async def list_categories(
+    db: AsyncSession, user_id: UUID, include_global: bool = True
+) -> List[CategoryResponse]:
+    """User categories, optionally merged with the global catalog, with counts."""
+    counts = (
+        select(
+            MonthlySpending.category_id,
+            func.sum(MonthlySpending.transaction_count).label("transaction_count"),
+        )
+        .where(MonthlySpending.user_id == user_id)
+        .group_by(MonthlySpending.category_id)
+        .subquery()
+    )
+    # Own categories with their counts, plus a count row for every global
+    # category the user has spent in, in one round trip
+    result = await db.execute(
+        select(Category, counts.c.transaction_count)
+        .outerjoin(counts, counts.c.category_id == Category.id)
+        .where(
+            or_(
+                Category.user_id == user_id,
+                and_(Category.is_global.is_(True), counts.c.category_id.is_not(None)),
+            )
+        )
+    )
+
+    usage: Dict[UUID, int] = {}
+    own: List[CategoryResponse] = []
+    for category, count in result.all():
+        usage[category.id] = int(count or 0)
+        if category.user_id == user_id:
+            own.append(CategoryResponse.model_validate(category))
+
+    categories = own
+    if include_global:
+        catalog = await get_global_catalog(db)
+        categories = list(catalog.categories) + own
+
+    # Catalog entries are shared, so counts go on copies
+    return [
+        c.model_copy(update={"transaction_count": usage.get(c.id, 0)})
+        for c in sorted(categories, key=lambda c: c.name.lower())
+    ]
+
+
+async def category_usage(db: AsyncSession, user_id: UUID, category_id: UUID) -> int:
+    """Confirmed transaction count for one category, from the rollup."""
+    result = await db.execute(
+        select(func.coalesce(func.sum(MonthlySpending.transaction_count), 0)).where(
+            MonthlySpending.user_id == user_id,
+            MonthlySpending.category_id == category_id,
+        )
+    )
+    return int(result.scalar_one())
+
+
+async def category_in_use(db: AsyncSession, user_id: UUID, category_id: UUID) -> bool:
+    """Whether any transaction or correction still references the category."""
+    # Only the owner's rows can reference a user category; the user_id
+    # predicate keeps both probes on per-user indexes
+    transactions = select(Transaction.id).where(
+        Transaction.user_id == user_id, Transaction.category_id == category_id
+    )
+    corrections = select(AuditCorrection.id).where(
+        AuditCorrection.user_id == user_id,
+        or_(
+            AuditCorrection.old_category_id == category_id,
+            AuditCorrection.new_category_id == category_id,
+        ),
+    )
+    result = await db.execute(select(or_(exists(transactions), exists(corrections))))
+    return bool(result.scalar_one())
+
+
+async def delete_category(db: AsyncSession, category: Category) -> None:
+    """Delete an unused category along with its budgets and vendor mappings."""
+    for model in (BudgetsHistory, MonthlySpending, SpendingForecast, VendorMapping):
+        await db.execute(delete(model).where(model.category_id == category.id))
+    await db.delete(category)
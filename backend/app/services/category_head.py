@@ -0,0 +1,188 @@
+"""
+Category head: an online linear classifier over vendor embeddings.
+
+Learns from user corrections (app/workers/active_learning_job.py) and sits
+between the vendor similarity index and the zero-shot transformer in the
+classification stage. It reuses the sentence embeddings of the vendor
+index, so a prediction costs one small matrix product, and a confident
+one skips the transformer.
+
+The model is multinomial logistic regression over global categories,
+trained with mini-batch SGD in NumPy. Each training run continues from the
+published weights (``partial_fit``) and adds a row for any category it has
+not seen before. Versions are published to CATEGORY_HEAD_DIR through
+app/services/model_store.py, together with the training watermark and a
+rolling holdout set. Running workers switch to a new version within a
+minute.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import model_store
+from app.services.vendor_index import normalize_vendor, vendor_vectors
+
+LEARNING_RATE = 0.5
+L2_PENALTY = 1e-4
+BATCH_SIZE = 64
+EPOCHS = 5
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Last audit correction a head has been trained on."""
+
+    created_at: str  # ISO timestamp
+    id: str
+
+
+@dataclass(frozen=True)
+class CategoryHead:
+    """Weights, labels and training state of one published version."""
+
+    version: str
+    category_ids: Tuple[UUID, ...]
+    weights: np.ndarray  # (categories, dimensions)
+    bias: np.ndarray  # (categories,)
+    trained_examples: int = 0
+    watermark: Optional[Watermark] = None
+    holdout_accuracy: Optional[float] = None
+    # Rolling evaluation set: embeddings and category indexes
+    holdout: Tuple[np.ndarray, np.ndarray] = field(
+        default_factory=lambda: (np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int64))
+    )
+
+    @classmethod
+    def empty(cls, dimensions: int) -> "CategoryHead":
+        return cls(
+            version="",
+            category_ids=(),
+            weights=np.zeros((0, dimensions), dtype=np.float32),
+            bias=np.zeros(0, dtype=np.float32),
+            holdout=(np.empty((0, dimensions), dtype=np.float32), np.empty(0, dtype=np.int64)),
+        )
+
+    def predict(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best category index and its probability for each row."""
+        if not self.category_ids:
+            return np.zeros(len(vectors), dtype=np.int64), np.zeros(len(vectors))
+        probabilities = _softmax(vectors @ self.weights.T + self.bias)
+        best = probabilities.argmax(axis=1)
+        return best, probabilities[np.arange(len(vectors)), best]
+
+    def accuracy(self, vectors: np.ndarray, labels: np.ndarray) -> Optional[float]:
+        if not len(labels):
+            return None
+        return float((self.predict(vectors)[0] == labels).mean())
+
+    def with_categories(self, category_ids: Sequence[UUID]) -> "CategoryHead":
+        """Copy that also knows ``category_ids``; new rows start at zero."""
+        new = [c for c in dict.fromkeys(category_ids) if c not in self.category_ids]
+        if not new:
+            return self
+        dimensions = self.weights.shape[1]
+        return replace(
+            self,
+            category_ids=self.category_ids + tuple(new),
+            weights=np.vstack([self.weights, np.zeros((len(new), dimensions), dtype=np.float32)]),
+            bias=np.concatenate([self.bias, np.zeros(len(new), dtype=np.float32)]),
+        )
+
+    def labels(self, category_ids: Sequence[UUID]) -> np.ndarray:
+        positions = {c: i for i, c in enumerate(self.category_ids)}
+        return np.array([positions[c] for c in category_ids], dtype=np.int64)
+
+    def partial_fit(
+        self,
+        vectors: np.ndarray,
+        labels: np.ndarray,
+        epochs: int = EPOCHS,
+        seed: int = 0,
+    ) -> "CategoryHead":
+        """Copy trained further on (vectors, labels); the original is untouched."""
+        weights, bias = self.weights.copy(), self.bias.copy()
+        targets = np.zeros((len(labels), len(self.category_ids)), dtype=np.float32)
+        targets[np.arange(len(labels)), labels] = 1
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(labels))
+            for start in range(0, len(order), BATCH_SIZE):
+                batch = order[start:start + BATCH_SIZE]
+                error = _softmax(vectors[batch] @ weights.T + bias) - targets[batch]
+                weights -= LEARNING_RATE * (error.T @ vectors[batch] / len(batch) + L2_PENALTY * weights)
+                bias -= LEARNING_RATE * error.mean(axis=0)
+        return replace(
+            self,
+            weights=weights,
+            bias=bias,
+            trained_examples=self.trained_examples + len(labels),
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write this head as a new version and make it current."""
+        path = model_store.version_dir(directory, self.version)
+        np.savez(
+            path / "head.npz",
+            weights=self.weights,
+            bias=self.bias,
+            holdout_vectors=self.holdout[0],
+            holdout_labels=self.holdout[1],
+        )
+        with open(path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "category_ids": [str(c) for c in self.category_ids],
+                "trained_examples": self.trained_examples,
+                "watermark": self.watermark.__dict__ if self.watermark else None,
+                "holdout_accuracy": self.holdout_accuracy,
+            }, f)
+        model_store.publish(directory, self.version)
+
+    @classmethod
+    def load(cls, path: Path, version: str) -> "CategoryHead":
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(path / "head.npz") as arrays:
+            return cls(
+                version=version,
+                category_ids=tuple(UUID(c) for c in meta["category_ids"]),
+                weights=arrays["weights"],
+                bias=arrays["bias"],
+                trained_examples=meta["trained_examples"],
+                watermark=Watermark(**meta["watermark"]) if meta["watermark"] else None,
+                holdout_accuracy=meta["holdout_accuracy"],
+                holdout=(arrays["holdout_vectors"], arrays["holdout_labels"]),
+            )
+
+
+_head = model_store.ArtifactCache(settings.CATEGORY_HEAD_DIR, CategoryHead.load)
+
+
+def get_category_head() -> Optional[CategoryHead]:
+    """The current head, reloaded when training publishes a new version."""
+    return _head.get()
+
+
+def _predict(vendor: str) -> Optional[Tuple[UUID, float]]:
+    head = get_category_head()
+    if head is None or not head.category_ids:
+        return None
+    best, probability = head.predict(vendor_vectors([normalize_vendor(vendor)]))
+    return head.category_ids[best[0]], float(probability[0])
+
+
+async def predict_category(vendor: str) -> Optional[Tuple[UUID, float]]:
+    """Most likely category for a vendor, off the event loop."""
+    return await asyncio.to_thread(_predict, vendor)
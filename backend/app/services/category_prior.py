@@ -0,0 +1,269 @@
+"""
+Per-user category priors, the first source the classification stage asks.
+
+Most of a user's transactions are at a small set of vendors they have
+already confirmed. A prior maps the hash of each such vendor to a category
+and a confidence. These are held as parallel NumPy arrays sorted by hash,
+15 bytes a vendor, so a lookup is one binary search and needs neither a
+query nor a model.
+
+Priors live in the worker process. A user's prior is built on their first
+transaction from their vendor mappings and from the transactions they
+confirmed or corrected in the last PRIOR_HISTORY_DAYS. It is then updated
+in place. Confirming or correcting a transaction announces the vendor and
+category on PRIOR_NOTIFY_CHANNEL with pg_notify, which is delivered when
+the request commits, and every worker applies it to its copy. Priors are
+rebuilt after PRIOR_REFRESH_SECONDS in case a worker missed a notification
+while reconnecting.
+
+Every confirmation of the same category halves the distance to certainty
+(0.5, 0.75, 0.875, ...). A different category starts again at 0.5. A
+vendor mapping the user asked to remember counts for at least its own
+confidence.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.database import Transaction, TransactionStatus, VendorMapping
+from app.services.vendor_index import normalize_vendor
+
+logger = structlog.get_logger()
+
+FIRST_CONFIDENCE = 0.5
+REPORT_EVERY = 1_000  # lookups between stats log lines
+
+# (category, confidence, from a vendor mapping)
+Entry = Tuple[UUID, float, bool]
+
+
+def vendor_hash(vendor: str) -> Optional[int]:
+    """Signed 64-bit hash of the normalized vendor name."""
+    name = normalize_vendor(vendor)
+    if not name:
+        return None
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _confirmed(entry: Optional[Entry], category_id: UUID) -> Entry:
+    if entry is not None and entry[0] == category_id:
+        return category_id, entry[1] + (1 - entry[1]) / 2, entry[2]
+    return category_id, FIRST_CONFIDENCE, False
+
+
+def _remembered(entry: Optional[Entry], category_id: UUID, confidence: float) -> Entry:
+    if entry is not None and entry[0] == category_id:
+        return category_id, max(entry[1], confidence), True
+    return category_id, confidence, True
+
+
+class UserPrior:
+    """One user's known vendors as arrays sorted by vendor hash."""
+
+    def __init__(self, entries: Dict[int, Entry]):
+        self.category_ids: List[UUID] = list(dict.fromkeys(e[0] for e in entries.values()))
+        self._category_index = {c: i for i, c in enumerate(self.category_ids)}
+        keys = sorted(entries)
+        self.hashes = np.array(keys, dtype=np.int64)
+        self.categories = np.array(
+            [self._category_index[entries[k][0]] for k in keys], dtype=np.uint16
+        )
+        self.confidence = np.array([entries[k][1] for k in keys], dtype=np.float32)
+        self.from_mapping = np.array([entries[k][2] for k in keys], dtype=bool)
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _find(self, key: int) -> Tuple[int, bool]:
+        position = int(np.searchsorted(self.hashes, key))
+        return position, position < len(self.hashes) and self.hashes[position] == key
+
+    def _entry(self, position: int) -> Entry:
+        return (
+            self.category_ids[self.categories[position]],
+            float(self.confidence[position]),
+            bool(self.from_mapping[position]),
+        )
+
+    def get(self, vendor: str) -> Optional[Entry]:
+        key = vendor_hash(vendor)
+        if key is None:
+            return None
+        position, found = self._find(key)
+        return self._entry(position) if found else None
+
+    def _set(self, key: int, entry: Entry) -> None:
+        category = self._category_index.get(entry[0])
+        if category is None:
+            category = self._category_index[entry[0]] = len(self.category_ids)
+            self.category_ids.append(entry[0])
+
+        position, found = self._find(key)
+        if found:
+            self.categories[position] = category
+            self.confidence[position] = entry[1]
+            self.from_mapping[position] = entry[2]
+        else:
+            self.hashes = np.insert(self.hashes, position, key)
+            self.categories = np.insert(self.categories, position, category)
+            self.confidence = np.insert(self.confidence, position, entry[1])
+            self.from_mapping = np.insert(self.from_mapping, position, entry[2])
+
+    def apply(self, vendor: str, category_id: UUID, remembered: Optional[float]) -> None:
+        """Fold in one confirmation, and the mapping it saved if any."""
+        key = vendor_hash(vendor)
+        if key is None:
+            return
+        position, found = self._find(key)
+        entry = _confirmed(self._entry(position) if found else None, category_id)
+        if remembered is not None:
+            entry = _remembered(entry, category_id, remembered)
+        self._set(key, entry)
+
+
+async def build_prior(db: AsyncSession, user_id: UUID) -> UserPrior:
+    """A user's prior from their confirmed history and vendor mappings."""
+    since = date.today() - timedelta(days=settings.PRIOR_HISTORY_DAYS)
+    history = await db.execute(
+        select(Transaction.vendor, Transaction.category_id)
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.date >= since,
+            Transaction.status.in_([TransactionStatus.CONFIRMED, TransactionStatus.CORRECTED]),
+        )
+        .order_by(Transaction.date, Transaction.created_at)
+    )
+    mappings = await db.execute(
+        select(VendorMapping.vendor_name, VendorMapping.category_id, VendorMapping.confidence)
+        .where(VendorMapping.user_id == user_id)
+    )
+
+    entries: Dict[int, Entry] = {}
+    for vendor, category_id in history:
+        key = vendor_hash(vendor)
+        if key is not None:
+            entries[key] = _confirmed(entries.get(key), category_id)
+    for vendor, category_id, confidence in mappings:
+        key = vendor_hash(vendor)
+        if key is not None:
+            entries[key] = _remembered(entries.get(key), category_id, confidence / 100)
+    return UserPrior(entries)
+
+
+class PriorCache:
+    """Priors of recently active users, least recently used evicted first."""
+
+    def __init__(self, max_users: int, refresh_seconds: float):
+        self.max_users = max_users
+        self.refresh_seconds = refresh_seconds
+        self._priors: "OrderedDict[UUID, UserPrior]" = OrderedDict()
+        # Updates that arrive while a user's prior is being built
+        self._pending: Dict[UUID, List[Tuple[str, UUID, Optional[float]]]] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.model_calls_saved = 0
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> UserPrior:
+        prior = self._priors.get(user_id)
+        if prior is not None and time.monotonic() - prior.built_at < self.refresh_seconds:
+            self._priors.move_to_end(user_id)
+            return prior
+
+        self._pending.setdefault(user_id, [])
+        try:
+            prior = await build_prior(db, user_id)
+        finally:
+            updates = self._pending.pop(user_id, [])
+        for update in updates:
+            prior.apply(*update)
+
+        self._priors[user_id] = prior
+        self._priors.move_to_end(user_id)
+        while len(self._priors) > self.max_users:
+            self._priors.popitem(last=False)
+        return prior
+
+    def apply(self, user_id: UUID, vendor: str, category_id: UUID, remembered: Optional[float]) -> None:
+        if user_id in self._pending:
+            self._pending[user_id].append((vendor, category_id, remembered))
+        prior = self._priors.get(user_id)
+        if prior is not None:
+            prior.apply(vendor, category_id, remembered)
+
+    def record(self, entry: Optional[Entry], used: bool) -> None:
+        self.lookups += 1
+        if used:
+            self.hits += 1
+            # Without the prior a vendor mapping would still have answered
+            if not entry[2]:
+                self.model_calls_saved += 1
+        if self.lookups % REPORT_EVERY == 0:
+            logger.info("Category prior stats", **self.stats())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._priors),
+            "vendors": sum(len(p) for p in self._priors.values()),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "model_calls_saved": self.model_calls_saved,
+        }
+
+
+_cache = PriorCache(settings.PRIOR_CACHE_USERS, settings.PRIOR_REFRESH_SECONDS)
+
+
+def get_prior_cache() -> PriorCache:
+    return _cache
+
+
+async def predict_category(
+    db: AsyncSession, user_id: UUID, vendor: str
+) -> Optional[Tuple[UUID, float]]:
+    """The user's own category for a vendor, if confident enough to skip the models."""
+    prior = await _cache.get(db, user_id)
+    entry = prior.get(vendor)
+    used = entry is not None and entry[1] >= settings.MODEL_CONFIDENCE_THRESHOLD
+    _cache.record(entry, used)
+    return (entry[0], entry[1]) if used else None
+
+
+async def notify_confirmed(
+    db: AsyncSession,
+    user_id: UUID,
+    vendor: str,
+    category_id: UUID,
+    remembered: bool = False,
+) -> None:
+    """Announce a confirmation to the workers; delivered when the caller commits."""
+    payload = {"user_id": str(user_id), "vendor": vendor, "category_id": str(category_id)}
+    if remembered:
+        payload["remembered"] = settings.VENDOR_MAPPING_CONFIDENCE / 100
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.PRIOR_NOTIFY_CHANNEL, "payload": json.dumps(payload)},
+    )
+
+
+def apply_notification(payload: str) -> None:
+    """Apply a confirmation announced by notify_confirmed."""
+    update = json.loads(payload)
+    _cache.apply(
+        UUID(update["user_id"]),
+        update["vendor"],
+        UUID(update["category_id"]),
+        update.get("remembered"),
+    )
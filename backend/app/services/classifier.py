@@ -0,0 +1,55 @@
+"""
+Transaction category classifier.
+
+The last resort of the classification stage, for vendors that neither the
+user's vendor mappings nor the vendor similarity index know. A DistilBERT
+NLI model scores the receipt against every global category name
+(zero-shot), so it works without any training data. It is by far the
+slowest step of the pipeline and runs in a worker thread.
+"""
+
+import asyncio
+from typing import Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.categories import get_global_catalog
+
+HYPOTHESIS_TEMPLATE = "This purchase is for {}."
+# Enough of the receipt to show what was bought
+CONTEXT_CHARS = 300
+
+_model = None
+
+
+def get_model():
+    """The zero-shot classification pipeline (loaded on first use)."""
+    global _model
+    if _model is None:
+        from transformers import pipeline
+
+        _model = pipeline("zero-shot-classification", model=settings.CLASSIFIER_MODEL, device=-1)
+    return _model
+
+
+def classify(text: str, labels: Sequence[str]) -> Tuple[str, float]:
+    """Best label for ``text`` and its score."""
+    result = get_model()(
+        text, candidate_labels=list(labels), hypothesis_template=HYPOTHESIS_TEMPLATE
+    )
+    return result["labels"][0], float(result["scores"][0])
+
+
+async def predict_category(
+    db: AsyncSession, vendor: str, raw_text: Optional[str] = None
+) -> Optional[Tuple[UUID, float]]:
+    """Most likely global category for a receipt, with the model's score."""
+    catalog = await get_global_catalog(db)
+    if not catalog.categories:
+        return None
+    by_name = {category.name: category.id for category in catalog.categories}
+    text = f"{vendor}. {raw_text[:CONTEXT_CHARS]}" if raw_text else vendor
+    label, score = await asyncio.to_thread(classify, text, list(by_name))
+    return by_name[label], score
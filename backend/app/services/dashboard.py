@@ -0,0 +1,215 @@
+"""
+Dashboard aggregates.
+
+Monthly totals come from the monthly_spending rollup maintained by the
+budget engine; only the top-vendor breakdown reads transactions, through
+the (user_id, date) index.
+"""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import BudgetsHistory, Category, MonthlySpending, Transaction
+from app.models.schemas import (
+    CategoryChartData,
+    CategoryChartResponse,
+    CategorySpending,
+    ChartDataPoint,
+    DashboardSummary,
+    TopVendor,
+)
+from app.models.types import CENT
+from app.services.budgets import COUNTED_STATUSES, current_month
+from app.services.forecasting import get_forecasts, month_from_index, month_index
+
+TOP_VENDORS = 5
+ZERO = Decimal("0.00")
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """First day of ``month`` and of the month after."""
+    following = month_from_index(month_index(month) + 1)
+    return date.fromisoformat(f"{month}-01"), date.fromisoformat(f"{following}-01")
+
+
+async def get_summary(db: AsyncSession, user_id: UUID, month: str) -> DashboardSummary:
+    """Totals, category breakdown and top vendors for a month."""
+    budget = func.coalesce(BudgetsHistory.budget_amount, Category.monthly_budget)
+    result = await db.execute(
+        select(
+            Category.id,
+            Category.name,
+            budget.label("budget"),
+            MonthlySpending.spent,
+            MonthlySpending.transaction_count,
+        )
+        .outerjoin(
+            BudgetsHistory,
+            and_(
+                BudgetsHistory.category_id == Category.id,
+                BudgetsHistory.user_id == user_id,
+                BudgetsHistory.month == month,
+            ),
+        )
+        .outerjoin(
+            MonthlySpending,
+            and_(
+                MonthlySpending.category_id == Category.id,
+                MonthlySpending.user_id == user_id,
+                MonthlySpending.month == month,
+            ),
+        )
+        .where(
+            or_(Category.user_id == user_id, Category.is_global.is_(True)),
+            or_(budget.is_not(None), MonthlySpending.spent != 0),
+        )
+    )
+    rows = result.all()
+
+    total_expenses = sum((row.spent or ZERO for row in rows), ZERO)
+    total_budget = sum((row.budget or ZERO for row in rows), ZERO)
+    categories = sorted(
+        (
+            CategorySpending(
+                category_id=row.id,
+                category_name=row.name,
+                amount_spent=row.spent or ZERO,
+                budget_amount=row.budget,
+                percentage=(
+                    float((row.spent or ZERO) / total_expenses * 100) if total_expenses else 0.0
+                ),
+            )
+            for row in rows
+        ),
+        key=lambda c: c.amount_spent,
+        reverse=True,
+    )
+
+    start, end = month_bounds(month)
+    spent = func.sum(Transaction.amount)
+    vendors = await db.execute(
+        select(Transaction.vendor, spent, func.count())
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.date >= start,
+            Transaction.date < end,
+            Transaction.status.in_(COUNTED_STATUSES),
+        )
+        .group_by(Transaction.vendor)
+        .order_by(desc(spent))
+        .limit(TOP_VENDORS)
+    )
+
+    # Income is not tracked yet, so savings are measured against the budget
+    budget_remaining = total_budget - total_expenses
+    return DashboardSummary(
+        total_expenses=total_expenses,
+        total_income=ZERO,
+        savings=max(budget_remaining, ZERO),
+        budget_remaining=budget_remaining,
+        categories_spending=categories,
+        top_vendors=[
+            TopVendor(vendor=vendor, amount=amount, count=count)
+            for vendor, amount, count in vendors.all()
+        ],
+        transaction_count=sum(row.transaction_count or 0 for row in rows),
+        month=month,
+    )
+
+
+async def get_category_chart(
+    db: AsyncSession, user_id: UUID, month: str, months_count: int
+) -> CategoryChartResponse:
+    """Per-category monthly spending for ``months_count`` months from ``month``."""
+    first = month_index(month)
+    months = [month_from_index(i) for i in range(first, first + months_count)]
+
+    result = await db.execute(
+        select(
+            MonthlySpending.month,
+            MonthlySpending.category_id,
+            MonthlySpending.spent,
+            Category.name,
+            Category.color,
+        )
+        .join(Category, Category.id == MonthlySpending.category_id)
+        .where(
+            MonthlySpending.user_id == user_id,
+            MonthlySpending.month >= months[0],
+            MonthlySpending.month <= months[-1],
+        )
+    )
+
+    by_category: Dict[UUID, Dict[str, Any]] = {}
+    by_month: Dict[str, Dict[str, Decimal]] = defaultdict(dict)
+    for row in result.all():
+        category = by_category.setdefault(
+            row.category_id, {"name": row.name, "color": row.color, "months": {}}
+        )
+        category["months"][row.month] = row.spent
+        by_month[row.month][row.name] = row.spent
+
+    totals: List[CategoryChartData] = [
+        CategoryChartData(
+            category_id=category_id,
+            category_name=data["name"],
+            total_amount=sum(data["months"].values(), ZERO),
+            color=data["color"],
+            monthly_data=[
+                ChartDataPoint(month=m, amount=data["months"].get(m, ZERO)) for m in months
+            ],
+        )
+        for category_id, data in by_category.items()
+    ]
+    totals.sort(key=lambda c: c.total_amount, reverse=True)
+
+    return CategoryChartResponse(
+        monthly_data=[{"month": m, **by_month.get(m, {})} for m in months],
+        totals=totals,
+    )
+
+
+async def get_trends(db: AsyncSession, user_id: UUID, months_count: int) -> Dict[str, Any]:
+    """Month-over-month totals plus forecasts for this month and the next."""
+    this_month = month_index(current_month())
+    months = [month_from_index(i) for i in range(this_month - months_count + 1, this_month + 1)]
+
+    result = await db.execute(
+        select(MonthlySpending.month, func.sum(MonthlySpending.spent))
+        .where(
+            MonthlySpending.user_id == user_id,
+            MonthlySpending.month >= months[0],
+        )
+        .group_by(MonthlySpending.month)
+    )
+    totals = dict(result.all())
+
+    history = []
+    previous = None
+    for month in months:
+        amount = totals.get(month, ZERO)
+        change = (
+            round(float((amount - previous) / previous * 100), 1) if previous else None
+        )
+        history.append({"month": month, "amount": amount, "change_percentage": change})
+        previous = amount
+
+    # Predictions come from models fitted by the nightly forecast job
+    forecasts = await get_forecasts(
+        db, user_id, [months[-1], month_from_index(this_month + 1)]
+    )
+
+    completed = [h["amount"] for h in history[:-1]]
+    return {
+        "months": history,
+        "average_monthly": (
+            (sum(completed, ZERO) / len(completed)).quantize(CENT) if completed else None
+        ),
+        "forecast": forecasts,
+    }
@@ -0,0 +1,140 @@
+"""
+Spending forecasts.
+
+Each (user, category) monthly spending series is modelled with damped-trend
+exponential smoothing. Fitting is a batch operation over a 2-D matrix
+(series x months) and is vectorized across series *and* across the
+smoothing-parameter grid, so the only Python loop is over time steps. Only
+the final state (level, trend, residual spread) is stored; evaluating a
+forecast is a closed-form expression over those three numbers.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import SpendingForecast
+from app.models.types import from_cents
+
+# Smoothing parameter grid searched per series
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.05, 0.1, 0.2])
+# Trend damping; keeps sparse series from extrapolating runaway trends
+PHI = 0.9
+MIN_MONTHS = 3
+
+
+def month_index(month: str) -> int:
+    """YYYY-MM to a month count, so month arithmetic is integer arithmetic."""
+    year, mon = map(int, month.split("-"))
+    return year * 12 + mon - 1
+
+
+def month_from_index(index: int) -> str:
+    """Inverse of :func:`month_index`."""
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+@dataclass
+class HoltFit:
+    """Per-series final smoothing state, as parallel arrays."""
+
+    level: np.ndarray
+    trend: np.ndarray
+    residual_std: np.ndarray
+
+
+def _fit_block(y: np.ndarray) -> HoltFit:
+    n_series, n_months = y.shape
+    alpha = np.repeat(ALPHAS, len(BETAS))[:, None]
+    beta = np.tile(BETAS, len(ALPHAS))[:, None]
+    n_params = alpha.shape[0]
+
+    level = np.broadcast_to(y[:, 0], (n_params, n_series)).copy()
+    trend = np.broadcast_to(y[:, 1] - y[:, 0], (n_params, n_series)).copy()
+    sse = np.zeros((n_params, n_series))
+
+    for t in range(1, n_months):
+        predicted = level + PHI * trend
+        error = y[:, t] - predicted
+        sse += error * error
+        new_level = predicted + alpha * error
+        trend = beta * (new_level - level) + (1 - beta) * PHI * trend
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_series)
+    return HoltFit(
+        level=level[best, columns],
+        trend=trend[best, columns],
+        residual_std=np.sqrt(sse[best, columns] / (n_months - 1)),
+    )
+
+
+def fit_damped_holt(series: np.ndarray, block_size: int = 100_000) -> HoltFit:
+    """Fit every row of a (n_series, n_months) matrix.
+
+    All (alpha, beta) grid points run in one stacked pass of shape
+    (n_params, n_series); each series keeps the parameters with the lowest
+    one-step-ahead squared error. Rows are processed in blocks to bound the
+    working set of the stacked pass.
+    """
+    y = np.asarray(series, dtype=np.float64)
+    if y.ndim != 2 or y.shape[1] < 2:
+        raise ValueError("Need a (series, months) matrix with at least two months")
+
+    fits = [_fit_block(y[start:start + block_size]) for start in range(0, len(y), block_size)]
+    if not fits:
+        empty = np.empty(0)
+        return HoltFit(empty, empty, empty)
+    return HoltFit(
+        level=np.concatenate([f.level for f in fits]),
+        trend=np.concatenate([f.trend for f in fits]),
+        residual_std=np.concatenate([f.residual_std for f in fits]),
+    )
+
+
+def predict(level: float, trend: float, horizon: int) -> float:
+    """Damped-trend forecast ``horizon`` months past the fitted month, in cents."""
+    damping = PHI * (1 - PHI ** horizon) / (1 - PHI)
+    return max(level + trend * damping, 0.0)
+
+
+def _evaluate(model: SpendingForecast, month: str) -> Optional[Dict[str, Any]]:
+    horizon = month_index(month) - month_index(model.fitted_through)
+    if horizon < 1:
+        return None
+    expected = predict(model.level, model.trend, horizon)
+    # ~80% interval; error grows with the square root of the horizon
+    spread = 1.28 * model.residual_std * horizon ** 0.5
+    return {
+        "category_id": model.category_id,
+        "amount": from_cents(round(expected)),
+        "lower": from_cents(round(max(expected - spread, 0.0))),
+        "upper": from_cents(round(expected + spread)),
+    }
+
+
+async def get_forecasts(
+    db: AsyncSession, user_id: UUID, months: List[str]
+) -> List[Dict[str, Any]]:
+    """Evaluate the user's stored models for each of ``months``."""
+    result = await db.execute(
+        select(SpendingForecast).where(SpendingForecast.user_id == user_id)
+    )
+    models = result.scalars().all()
+
+    forecasts = []
+    for month in months:
+        categories = [f for f in (_evaluate(m, month) for m in models) if f]
+        forecasts.append({
+            "month": month,
+            "amount": sum((f["amount"] for f in categories), Decimal("0.00")),
+            "categories": categories,
+        })
+    return forecasts
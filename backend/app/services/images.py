@@ -0,0 +1,135 @@
+"""
+Receipt image derivatives.
+
+List views show small WebP renditions instead of the original upload. A
+thumbnail and a preview are rendered by the pipeline's parse stage, from
+the bytes it already downloaded for OCR, and recorded on
+``Transaction.image_variants``. Other widths (from a fixed set)
+are rendered on first request. Every rendition is stored under a
+deterministic key derived from the original, so it is generated once and
+then served straight from storage.
+
+Decoding and resizing are CPU-bound, so they run in a process pool and
+never hold an API worker's event loop or GIL.
+"""
+
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.storage import get_storage
+
+# Rendered on upload: variant name -> width in pixels
+UPLOAD_VARIANTS = {"thumbnail": 160, "preview": 800}
+# Widths that may be rendered on demand; bounds the number of objects per receipt
+ALLOWED_WIDTHS = (96, 160, 320, 480, 800, 1200)
+WEBP_QUALITY = 80
+DERIVED_PREFIX = "derived"
+# Formats Pillow can decode; PDF receipts have no renditions
+RENDERABLE_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    """Get the process pool for image work (created on first use)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _pool
+
+
+def close_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def is_renderable(image_key: str) -> bool:
+    return image_key.rsplit(".", 1)[-1].lower() in RENDERABLE_EXTENSIONS
+
+
+def variant_key(image_key: str, width: int) -> str:
+    """Deterministic storage key of a rendition of ``image_key``."""
+    stem = image_key.rsplit(".", 1)[0]
+    return f"{DERIVED_PREFIX}/{stem}/w{width}.webp"
+
+
+def render_variants(data: bytes, widths: Iterable[int]) -> Dict[int, bytes]:
+    """Render WebP renditions of an image, one per width.
+
+    Runs in a pool process. Images already narrower than a width are not
+    upscaled.
+    """
+    from PIL import Image, ImageOps
+
+    widths = sorted(set(widths), reverse=True)
+    with Image.open(io.BytesIO(data)) as image:
+        # Let the JPEG decoder downscale by a power of two while decoding
+        image.draft("RGB", (widths[0] * 2, widths[0] * 2))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+
+        rendered = {}
+        for width in widths:
+            if image.width > width:
+                image = image.resize(
+                    (width, max(1, round(image.height * width / image.width))),
+                    Image.LANCZOS,
+                )
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+            rendered[width] = buffer.getvalue()
+    return rendered
+
+
+async def generate_variants(
+    image_key: str, widths: Iterable[int], original: Optional[bytes] = None
+) -> Dict[int, str]:
+    """Render and store renditions of a stored image; returns width -> key.
+
+    Pass ``original`` when the image is already in memory to skip the download.
+    """
+    storage = get_storage()
+    if original is None:
+        original = await storage.get(image_key)
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(
+        get_image_pool(), render_variants, original, tuple(widths)
+    )
+
+    keys = {width: variant_key(image_key, width) for width in rendered}
+    await asyncio.gather(*(
+        storage.put(keys[width], io.BytesIO(body), "image/webp")
+        for width, body in rendered.items()
+    ))
+    return keys
+
+
+async def generate_upload_variants(
+    image_key: str, original: Optional[bytes] = None
+) -> Dict[str, str]:
+    """Render the variants every receipt gets; returns name -> key."""
+    keys = await generate_variants(image_key, UPLOAD_VARIANTS.values(), original)
+    return {name: keys[width] for name, width in UPLOAD_VARIANTS.items()}
+
+
+def recorded_variant(variants: Optional[Dict[str, str]], width: int) -> Optional[str]:
+    """Key of a ``width`` rendition listed in ``Transaction.image_variants``."""
+    for name, key in (variants or {}).items():
+        if UPLOAD_VARIANTS.get(name) == width:
+            return key
+    return None
+
+
+async def get_variant_key(image_key: str, width: int) -> str:
+    """Key of a rendition, rendering it first if it does not exist yet.
+
+    Checks storage, so prefer :func:`recorded_variant` when it has the key.
+    """
+    key = variant_key(image_key, width)
+    if await get_storage().find(key) is None:
+        await generate_variants(image_key, [width])
+    return key
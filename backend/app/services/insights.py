@@ -0,0 +1,238 @@
+"""
+Spending insights engine.
+
+Loads a user's confirmed history once as columnar arrays and derives every
+insight with vectorized pandas/NumPy operations; nothing iterates over
+transactions in Python. Results are cached in Redis per (user, month) under
+the user's data version (see app.core.cache), so any write invalidates
+every cached month at once.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import BigInteger, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_data_version
+from app.core.database import use_primary
+from app.core.redis import get_redis
+from app.models.database import Transaction
+from app.services.budgets import COUNTED_STATUSES
+
+logger = structlog.get_logger()
+
+HISTORY_MONTHS = 60
+BASELINE_MONTHS = 6
+MIN_BASELINE_MONTHS = 3
+ANOMALY_Z_SCORE = 2.0
+# Std floor for steady baselines (rent, subscriptions): a share of the mean, at least ₹100
+BASELINE_MIN_STD_SHARE = 0.1
+BASELINE_MIN_STD_CENTS = 100_00
+VENDOR_SPIKE_RATIO = 2.0
+TOP_CATEGORIES = 5
+INSIGHTS_CACHE_TTL = 60 * 60 * 24
+
+# (label, min gap days, max gap days)
+RECURRING_PERIODS = (("weekly", 6, 8), ("monthly", 26, 35), ("yearly", 350, 380))
+RECURRING_MIN_OCCURRENCES = 3
+RECURRING_MAX_GAP_STD_DAYS = 3.0
+RECURRING_MAX_AMOUNT_CV = 0.1
+
+
+def _insights_key(user_id: UUID, month: str, version: int) -> str:
+    return f"insights:{user_id}:{month}:{version}"
+
+
+def _money(cents: float) -> float:
+    return round(float(cents) / 100, 2)
+
+
+async def load_history(db: AsyncSession, user_id: UUID, month: str) -> pd.DataFrame:
+    """Load confirmed transactions up to the end of ``month`` as columns."""
+    target = pd.Period(month, freq="M")
+    since = (target - (HISTORY_MONTHS - 1)).start_time.date()
+    until = (target + 1).start_time.date()
+
+    result = await db.execute(
+        select(
+            Transaction.date,
+            type_coerce(Transaction.amount, BigInteger),
+            Transaction.category_id,
+            Transaction.vendor,
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.status.in_(COUNTED_STATUSES),
+            Transaction.date >= since,
+            Transaction.date < until,
+        )
+    )
+    rows = result.all()
+    dates, cents, categories, vendors = zip(*rows) if rows else ((), (), (), ())
+
+    return pd.DataFrame({
+        "date": pd.to_datetime(np.array(dates, dtype="datetime64[D]")),
+        "cents": np.fromiter(cents, dtype=np.int64, count=len(rows)),
+        "category": pd.Categorical([str(c) for c in categories]),
+        "vendor": pd.Categorical([v.strip().lower() for v in vendors]),
+    })
+
+
+def _monthly_matrix(frame: pd.DataFrame, key: str, periods: pd.PeriodIndex) -> pd.DataFrame:
+    """Months x ``key`` matrix of summed cents, zero-filled over ``periods``."""
+    return (
+        frame.groupby([frame["date"].dt.to_period("M"), key], observed=True)["cents"]
+        .sum()
+        .unstack(fill_value=0)
+        .reindex(periods, fill_value=0)
+    )
+
+
+def _rolling_z(matrix: pd.DataFrame):
+    """Baseline mean/std of the preceding months and the z-score against it.
+
+    The std is floored so a jump over a perfectly steady baseline still
+    scores; a baseline of no spending at all has no z-score.
+    """
+    baseline = matrix.shift(1).rolling(BASELINE_MONTHS, min_periods=MIN_BASELINE_MONTHS)
+    mean, std = baseline.mean(), baseline.std()
+    floor = (mean.abs() * BASELINE_MIN_STD_SHARE).clip(lower=BASELINE_MIN_STD_CENTS)
+    z = (matrix - mean) / np.maximum(std, floor.where(mean != 0, 0)).replace(0, np.nan)
+    return mean, z
+
+
+def compute_insights(frame: pd.DataFrame, month: str) -> Dict[str, Any]:
+    """Derive insights for ``month`` from a user's history frame."""
+    target = pd.Period(month, freq="M")
+    insights: Dict[str, Any] = {
+        "month": month,
+        "total_spent": 0.0,
+        "change_from_previous": None,
+        "top_categories": [],
+        "category_anomalies": [],
+        "vendor_spikes": [],
+        "recurring_charges": [],
+    }
+    if frame.empty:
+        return insights
+
+    first = min(frame["date"].min().to_period("M"), target)
+    periods = pd.period_range(first, target, freq="M")
+    in_month = frame["date"].dt.to_period("M") == target
+
+    # Category totals and rolling z-scores
+    categories = _monthly_matrix(frame, "category", periods)
+    current = categories.iloc[-1]
+    total = int(current.sum())
+    insights["total_spent"] = _money(total)
+    if len(categories) > 1:
+        previous = int(categories.iloc[-2].sum())
+        if previous:
+            insights["change_from_previous"] = round((total - previous) / previous * 100, 1)
+
+    top = current[current > 0].nlargest(TOP_CATEGORIES)
+    insights["top_categories"] = [
+        {"category_id": cid, "amount": _money(cents), "share": round(cents / total * 100, 1)}
+        for cid, cents in top.items()
+    ]
+
+    mean, z = _rolling_z(categories)
+    z_now, mean_now = z.iloc[-1], mean.iloc[-1]
+    # Only overspending: an in-progress month always looks low
+    anomalous = z_now[z_now >= ANOMALY_Z_SCORE].sort_values(ascending=False)
+    insights["category_anomalies"] = [
+        {
+            "category_id": cid,
+            "amount": _money(current[cid]),
+            "baseline": _money(mean_now[cid]),
+            "z_score": round(float(score), 2),
+        }
+        for cid, score in anomalous.items()
+    ]
+
+    # Vendor spikes, restricted to vendors seen this month
+    month_vendors = frame.loc[in_month, "vendor"].unique()
+    if len(month_vendors):
+        vendor_frame = frame[frame["vendor"].isin(month_vendors)]
+        vendors = _monthly_matrix(vendor_frame, "vendor", periods)
+        v_mean, v_z = _rolling_z(vendors)
+        v_now, v_mean_now, v_z_now = vendors.iloc[-1], v_mean.iloc[-1], v_z.iloc[-1]
+        spikes = (v_z_now >= ANOMALY_Z_SCORE) & (v_now >= VENDOR_SPIKE_RATIO * v_mean_now)
+        insights["vendor_spikes"] = [
+            {
+                "vendor": vendor,
+                "amount": _money(v_now[vendor]),
+                "baseline": _money(v_mean_now[vendor]),
+                "ratio": round(float(v_now[vendor] / v_mean_now[vendor]), 2),
+            }
+            for vendor in v_now[spikes].sort_values(ascending=False).index
+        ]
+
+    # Recurring charges: regular gaps and stable amounts per vendor
+    ordered = frame.sort_values(["vendor", "date"])
+    by_vendor = ordered.groupby("vendor", observed=True)
+    gaps = by_vendor["date"].diff().dt.days
+    stats = pd.DataFrame({
+        "count": by_vendor.size(),
+        "gap": gaps.groupby(ordered["vendor"], observed=True).median(),
+        "gap_std": gaps.groupby(ordered["vendor"], observed=True).std().fillna(0),
+        "amount": by_vendor["cents"].mean(),
+        "amount_cv": by_vendor["cents"].std().fillna(0) / by_vendor["cents"].mean(),
+        "last": by_vendor["date"].max(),
+    })
+    candidates = stats[
+        (stats["count"] >= RECURRING_MIN_OCCURRENCES)
+        & (stats["gap_std"] <= RECURRING_MAX_GAP_STD_DAYS)
+        & (stats["amount_cv"] <= RECURRING_MAX_AMOUNT_CV)
+    ]
+    recurring = []
+    for label, low, high in RECURRING_PERIODS:
+        matched = candidates[candidates["gap"].between(low, high)]
+        recurring.extend(
+            {
+                "vendor": vendor,
+                "amount": _money(row.amount),
+                "period": label,
+                "interval_days": int(row.gap),
+                "next_expected": (row.last + pd.Timedelta(days=int(row.gap))).date().isoformat(),
+            }
+            for vendor, row in zip(matched.index, matched.itertuples())
+        )
+    insights["recurring_charges"] = sorted(recurring, key=lambda r: -r["amount"])
+
+    return insights
+
+
+async def get_insights(db: AsyncSession, user_id: UUID, month: str) -> Dict[str, Any]:
+    """Cached insights for a user and month."""
+    redis = get_redis()
+    key: Optional[str] = None
+    version = await get_data_version(user_id)
+    if version is not None:
+        key = _insights_key(user_id, month, version)
+        try:
+            cached = await redis.get(key)
+            if cached:
+                return json.loads(cached)
+        except RedisError as e:
+            logger.warning("Insights cache read failed", exception=str(e))
+
+    if key:
+        use_primary(db)
+    frame = await load_history(db, user_id, month)
+    # Keep the event loop free while pandas works
+    insights = await asyncio.to_thread(compute_insights, frame, month)
+
+    if key:
+        try:
+            await redis.set(key, json.dumps(insights), ex=INSIGHTS_CACHE_TTL)
+        except RedisError as e:
+            logger.warning("Insights cache fill failed", exception=str(e))
+    return insights
+
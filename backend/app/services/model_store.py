@@ -0,0 +1,109 @@
+"""
+Versioned model artifacts on local disk.
+
+Offline jobs publish models that every worker process loads (the vendor
+index, the category head). Each artifact directory holds one subdirectory
+per version and a CURRENT file naming the live one::
+
+    <directory>/CURRENT
+    <directory>/<version>/...
+
+A job writes a complete version directory and only then replaces CURRENT
+atomically, so readers never see a half-written model. Readers check
+CURRENT at most every ``check_seconds`` and load a new version on their
+next call, so a published model goes live in running workers without a
+restart.
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+import structlog
+
+logger = structlog.get_logger()
+
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+
+T = TypeVar("T")
+
+
+def new_version() -> str:
+    """Version name that sorts chronologically."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+
+def version_dir(directory: Path, version: str) -> Path:
+    path = directory / version
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def current_version(directory: Path) -> Optional[str]:
+    try:
+        return (directory / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(directory: Path, version: str) -> None:
+    """Make a fully written version current and prune old ones."""
+    pointer = directory / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, directory / CURRENT_FILE)
+
+    # Workers still holding an older version keep their open/mapped files
+    versions = sorted(p for p in directory.iterdir() if p.is_dir())
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+class ArtifactCache(Generic[T]):
+    """Process-wide handle on the current version of one artifact."""
+
+    def __init__(
+        self,
+        directory: str,
+        load: Callable[[Path, str], T],
+        check_seconds: float = 60,
+    ):
+        self.directory = Path(directory)
+        self._load = load
+        self.check_seconds = check_seconds
+        self._value: Optional[T] = None
+        self._version: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._version
+
+    def get(self) -> Optional[T]:
+        """The current version, loading a newly published one first."""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return self._value
+
+        # Callers run in worker threads; load each version once
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+                return self._value
+            version = current_version(self.directory)
+            if version is not None and version != self._version:
+                started = time.perf_counter()
+                self._value = self._load(self.directory / version, version)
+                self._version = version
+                logger.info(
+                    "Loaded model artifact",
+                    directory=str(self.directory),
+                    version=version,
+                    seconds=round(time.perf_counter() - started, 3),
+                )
+            self._checked_at = now
+        return self._value
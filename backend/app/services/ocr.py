@@ -0,0 +1,65 @@
+"""
+Receipt text extraction.
+
+Google Vision is used when GOOGLE_VISION_API_KEY is configured. Tesseract
+is the fallback, both when Vision is not configured and when a Vision call
+fails. Tesseract is CPU-bound, so it runs in the image process pool
+alongside rendition rendering.
+"""
+
+import asyncio
+import base64
+import io
+
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.services.images import get_image_pool
+
+logger = structlog.get_logger()
+
+VISION_URL = "https://vision.googleapis.com/v1/images:annotate"
+VISION_TIMEOUT_SECONDS = 30
+
+
+def tesseract_text(data: bytes) -> str:
+    """OCR an image with Tesseract. Runs in a pool process."""
+    import pytesseract
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        # Greyscale with corrected orientation reads better than raw camera output
+        image = ImageOps.exif_transpose(image).convert("L")
+        # --psm 4: a single column of text of variable sizes, i.e. a receipt
+        return pytesseract.image_to_string(image, config="--psm 4")
+
+
+async def vision_text(data: bytes) -> str:
+    """OCR an image with the Google Vision document text detector."""
+    async with httpx.AsyncClient(timeout=VISION_TIMEOUT_SECONDS) as client:
+        response = await client.post(
+            VISION_URL,
+            params={"key": settings.GOOGLE_VISION_API_KEY},
+            json={"requests": [{
+                "image": {"content": base64.b64encode(data).decode()},
+                "features": [{"type": "DOCUMENT_TEXT_DETECTION"}],
+            }]},
+        )
+    response.raise_for_status()
+    result = response.json()["responses"][0]
+    if "error" in result:
+        raise RuntimeError(result["error"].get("message", "Vision request failed"))
+    return result.get("fullTextAnnotation", {}).get("text", "")
+
+
+async def extract_text(data: bytes) -> str:
+    """Text of a receipt image: Google Vision, falling back to Tesseract."""
+    if settings.GOOGLE_VISION_API_KEY:
+        try:
+            return await vision_text(data)
+        except (httpx.HTTPError, KeyError, RuntimeError) as e:
+            logger.warning("Google Vision OCR failed, using Tesseract", exception=str(e))
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_image_pool(), tesseract_text, data)
@@ -0,0 +1,181 @@
+"""
+PII detection and redaction for OCR text.
+
+Card numbers (Luhn-checked), phone numbers, email addresses, UPI ids and
+bank account numbers are found by one compiled scan over the text, not by
+one regex per detector per line.
+
+The pattern begins with a single character class, ``[0-9+(@]``, because
+every detector's value begins with a digit, a ``+`` or ``(``, or follows an
+``@``. The regex engine uses that leading class to skip straight to
+candidate positions. It only starts matching where PII can begin, so the
+scan runs about as fast as a plain search for those characters. Each match
+is either a digit run or the part after an ``@``. It is then classified in
+code, which is cheap because candidates are rare:
+
+- An ``@`` match takes the local part to its left. It is an email when the
+  domain has a dot, and a UPI id (``name@okaxis``) otherwise.
+- A digit run is a card when it has 13-19 digits and passes the Luhn
+  check. It is a phone number when its digits fit an Indian mobile,
+  landline or NANP layout, and an account number when an account keyword
+  precedes it. Anything else (order numbers, UTRs, dates) is left alone.
+  A run may join several numbers ("9876543210 12 items", a card followed
+  by its expiry), so it is classified at each digit-group boundary, longest
+  first, and the scan resumes after the value found. A run with no value
+  at its start is retried from its next group.
+
+Spans refer to the text they were found in. :func:`redact` returns the
+redacted text together with the spans of its placeholders, so stored spans
+always point into the stored text.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+PLACEHOLDERS = {
+    "card": "[CARD]",
+    "email": "[EMAIL]",
+    "upi": "[UPI]",
+    "phone": "[PHONE]",
+    "account": "[ACCOUNT]",
+}
+
+PII_PATTERN = re.compile(
+    r"[0-9+(@](?:"
+    r"(?<=@)(?P<domain>[a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)*)"
+    r"|(?<=[0-9+(])(?P<number>(?:[ ()-]{0,2}[0-9]){6,22})"
+    r")"
+)
+# Anchored at the end of the searched window (endpos)
+_LOCAL_PART = re.compile(r"[\w.+-]+\Z")
+_ACCOUNT_KEYWORD = re.compile(
+    r"(?:a/c|acct|account)(?:\s*(?:no|number|#))?\.?[\s:#-]*\Z", re.IGNORECASE
+)
+_NANP_LAYOUT = re.compile(r"\(?\d{3}\)?[ -]?\d{3}[ -]\d{4}")
+_DIGIT_GROUP = re.compile(r"[0-9]+")
+_LOOKBEHIND_CHARS = 24
+
+
+@dataclass(frozen=True)
+class PIISpan:
+    """One detected PII value: ``text[start:end]`` is of type ``kind``."""
+
+    kind: str
+    start: int
+    end: int
+
+    def to_json(self) -> dict:
+        return {"kind": self.kind, "start": self.start, "end": self.end}
+
+
+def luhn_valid(digits: str) -> bool:
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        digit = ord(char) - 48
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def _is_phone(digits: str, candidate: str) -> bool:
+    count = len(digits)
+    if count == 10:
+        # Indian mobile, landline with STD code, or NANP written as such
+        return digits[0] in "6789" or digits[0] == "0" or bool(_NANP_LAYOUT.fullmatch(candidate))
+    if count == 11:
+        return digits[0] == "0" or (digits[0] == "1" and candidate[0] == "+")
+    if count == 12:
+        return digits.startswith("91") and digits[2] in "6789"
+    # Landline without STD code prefix: 040-2345678
+    return 9 <= count <= 12 and digits[0] == "0" and "-" in candidate
+
+
+def _classify_number(text: str, start: int, candidate: str) -> Optional[str]:
+    digits = "".join(filter(str.isdigit, candidate))
+    if 13 <= len(digits) <= 19 and luhn_valid(digits):
+        return "card"
+    if _is_phone(digits, candidate):
+        return "phone"
+    if 9 <= len(digits) <= 18 and _ACCOUNT_KEYWORD.search(
+        text, max(0, start - _LOOKBEHIND_CHARS), start
+    ):
+        return "account"
+    return None
+
+
+def _longest_number(text: str, start: int, candidate: str) -> Tuple[Optional[str], int]:
+    """Kind and length of the longest PII prefix of ``candidate``.
+
+    Prefixes end at digit-group boundaries. When none is PII, the kind is
+    None and the length is that of the first group.
+    """
+    # Most candidates are a single value
+    kind = _classify_number(text, start, candidate)
+    if kind is not None:
+        return kind, len(candidate)
+    ends = [group.end() for group in _DIGIT_GROUP.finditer(candidate)]
+    for end in reversed(ends[:-1]):
+        kind = _classify_number(text, start, candidate[:end])
+        if kind is not None:
+            return kind, end
+    return None, ends[0]
+
+
+def detect_pii(text: str) -> List[PIISpan]:
+    """All PII spans in ``text``, in order, in one pass."""
+    spans = []
+    position = 0
+    while True:
+        match = PII_PATTERN.search(text, position)
+        if match is None:
+            return spans
+        start, end = match.span()
+        position = end
+        if match.lastgroup == "domain":
+            local = _LOCAL_PART.search(text, max(0, start - 64), start)
+            if local is None:
+                continue
+            kind = "email" if "." in match.group("domain") else "upi"
+            start = local.start()
+            # The local part may already be a span (9876543210@ybl); the
+            # address replaces it
+            while spans and spans[-1].end > start:
+                spans.pop()
+        else:
+            # Part of a longer token such as an invoice number
+            candidate = match.group()
+            if start and text[start - 1].isalnum():
+                position = start + _DIGIT_GROUP.search(candidate).end()
+                continue
+            kind, length = _longest_number(text, start, candidate)
+            position = end = start + length
+            if kind is None:
+                continue
+            # A leading "(" only belongs to the value if it is closed
+            if candidate[0] == "(" and ")" not in candidate[:length]:
+                start += 1
+        spans.append(PIISpan(kind, start, end))
+
+
+def redact(text: str) -> Tuple[str, List[PIISpan]]:
+    """Replace PII with placeholders.
+
+    Returns the redacted text and the spans of the placeholders in it.
+    """
+    parts: List[str] = []
+    spans: List[PIISpan] = []
+    position = length = 0
+    for span in detect_pii(text):
+        parts.append(text[position:span.start])
+        length += span.start - position
+        placeholder = PLACEHOLDERS[span.kind]
+        parts.append(placeholder)
+        spans.append(PIISpan(span.kind, length, length + len(placeholder)))
+        length += len(placeholder)
+        position = span.end
+    parts.append(text[position:])
+    return "".join(parts), spans
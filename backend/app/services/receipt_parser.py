@@ -0,0 +1,292 @@
+"""
+Receipt text parser.
+
+Turns OCR text from a paper receipt or a UPI payment screenshot into
+amount, date, vendor and currency, with a confidence for each field.
+
+Every locale's grammar is compiled once, at import, into a single
+alternation pattern that tags each token on a line as one of: total
+keyword, non-total keyword (tax, subtotal, change, ...), amount, numeric
+date, textual date, UPI marker or payee. The parser makes one pass over
+the lines and runs that one pattern per line. Matches are scored as
+candidates per field, and the best-scoring candidate wins. Its score is
+reported as the field's confidence.
+
+Numeric dates are read directly from the regex groups in the locale's
+day/month order. Only textual dates ("12 Jan 2024", "Jan 12, 2024") go
+through dateutil.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil import parser as date_parser
+
+PARSER_VERSION = 2
+MAX_AMOUNT = Decimal("10000000")  # anything larger is an OCR artefact
+VENDOR_SEARCH_LINES = 6
+
+
+@dataclass(frozen=True)
+class Locale:
+    """Number, date and currency conventions of a receipt locale."""
+
+    code: str
+    currency: str
+    decimal_separator: str
+    thousands_separator: str
+    day_first: bool
+    # Currency symbol/code -> ISO code, as written on receipts
+    currency_tokens: Tuple[Tuple[str, str], ...]
+
+
+LOCALES = {
+    locale.code: locale
+    for locale in (
+        Locale("en_IN", "INR", ".", ",", True, (("₹", "INR"), ("rs.", "INR"), ("rs", "INR"), ("inr", "INR"))),
+        Locale("en_US", "USD", ".", ",", False, (("us$", "USD"), ("$", "USD"), ("usd", "USD"))),
+        Locale("en_GB", "GBP", ".", ",", True, (("£", "GBP"), ("gbp", "GBP"))),
+        Locale("de_DE", "EUR", ",", ".", True, (("€", "EUR"), ("eur", "EUR"))),
+    )
+}
+DEFAULT_LOCALE = "en_IN"
+
+TOTAL_KEYWORDS = (
+    "grand total", "total amount", "amount paid", "net amount", "net payable",
+    "amount payable", "total due", "balance due", "bill amount", "total", "summe",
+    "gesamt", "betrag",
+)
+NON_TOTAL_KEYWORDS = (
+    "subtotal", "sub total", "sub-total", "cgst", "sgst", "igst", "gst", "vat",
+    "tax", "discount", "savings", "change", "cash tendered", "tendered", "round off",
+    "saved", "you saved", "mwst", "rückgeld", "tip",
+)
+UPI_MARKERS = (
+    "upi", "utr", "transaction id", "upi ref", "google pay", "phonepe", "paytm",
+    "bhim", "payment successful", "paid successfully", "money sent",
+)
+# Lines that are never the vendor name
+NOT_VENDOR = re.compile(
+    r"\b(?:gstin|tax invoice|invoice|receipt|bill no|phone|tel|telephone|mob|mobile|"
+    r"address|cashier|table|order|date|time|welcome|thanks?)\b|www\.|\.com",
+    re.IGNORECASE,
+)
+MONTHS = r"jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec|january|february|march|april|june|july|august|september|october|november|december"
+
+
+def _alternation(words) -> str:
+    # Longest first so "grand total" wins over "total"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+def _compile_grammar(locale: Locale) -> "re.Pattern[str]":
+    thousands = re.escape(locale.thousands_separator)
+    decimal = re.escape(locale.decimal_separator)
+    # 1,234.56 / 1,23,456.78 (lakh grouping) / 1234.56; a bare 1234 is only
+    # kept next to a currency or on a total line (see parse_receipt)
+    number = (
+        rf"\d{{1,3}}(?:{thousands}\d{{2,3}})+(?:{decimal}\d{{1,2}})?"
+        rf"|\d+{decimal}\d{{1,2}}"
+    )
+    currency = _alternation(token for token, _ in locale.currency_tokens)
+    return re.compile(
+        rf"(?P<non_total>\b(?:{_alternation(NON_TOTAL_KEYWORDS)})\b)"
+        rf"|(?P<total>\b(?:{_alternation(TOTAL_KEYWORDS)})\b)"
+        rf"|(?P<upi>\b(?:{_alternation(UPI_MARKERS)})\b|[\w.\-]+@[a-z]{{2,}}\b)"
+        rf"|(?P<payee>(?:\b(?:paid to|sent to|payment to)\b[:\s]+|^to:\s*)(?P<payee_name>[^\d₹$€£@\n]{{2,60}}))"
+        rf"|(?P<numeric_date>\b(?P<d1>\d{{1,4}})[/.\-](?P<d2>\d{{1,2}})[/.\-](?P<d3>\d{{2,4}})\b)"
+        rf"|(?P<text_date>\b(?:\d{{1,2}}(?:st|nd|rd|th)?[\s\-]+(?:{MONTHS})[a-z]*[\s,\-]+\d{{2,4}}"
+        rf"|(?:{MONTHS})[a-z]*[\s\-]+\d{{1,2}}(?:st|nd|rd|th)?,?[\s\-]+\d{{2,4}})\b)"
+        rf"|(?P<amount>(?:(?P<currency>{currency})\s*)?(?P<number>{number}|(?<!\d)(?P<integer>\d+)\b)"
+        rf"(?:\s*(?P<currency_after>{currency}))?)",
+        re.IGNORECASE,
+    )
+
+
+GRAMMARS = {code: _compile_grammar(locale) for code, locale in LOCALES.items()}
+
+# Locale detection fast path: the first marker found decides
+# A numeric date whose day comes second can only be from a US receipt
+_LOCALE_MARKERS = re.compile(
+    r"(₹|\brs\.?\s*\d|\binr\b|\bupi\b|\bgstin?\b)|(€|\beur\b|\bmwst\b|\bsumme\b)|(£|\bgbp\b)"
+    r"|(\$|\busd\b|\b(?:0?[1-9]|1[0-2])/(?:1[3-9]|2\d|3[01])/\d{2,4}\b)",
+    re.IGNORECASE,
+)
+_MARKER_LOCALES = ("en_IN", "de_DE", "en_GB", "en_US")
+
+
+def detect_locale(text: str, default: str = DEFAULT_LOCALE) -> str:
+    match = _LOCALE_MARKERS.search(text)
+    if not match:
+        return default
+    return _MARKER_LOCALES[match.lastindex - 1]
+
+
+@dataclass
+class ParsedReceipt:
+    """Fields extracted from receipt text, with per-field confidence."""
+
+    kind: str  # "receipt" or "upi"
+    locale: str
+    currency: str
+    amount: Optional[Decimal] = None
+    date: Optional[date] = None
+    vendor: Optional[str] = None
+    confidence: Dict[str, float] = field(default_factory=dict)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Shape stored in ``Transaction.parsed_json``."""
+        return {
+            "parser_version": PARSER_VERSION,
+            "kind": self.kind,
+            "locale": self.locale,
+            "currency": self.currency,
+            "amount": str(self.amount) if self.amount is not None else None,
+            "date": self.date.isoformat() if self.date else None,
+            "vendor": self.vendor,
+            "confidence": self.confidence,
+        }
+
+
+def _to_decimal(number: str, locale: Locale) -> Optional[Decimal]:
+    cleaned = number.replace(locale.thousands_separator, "").replace(locale.decimal_separator, ".")
+    try:
+        value = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return value if Decimal("0") < value < MAX_AMOUNT else None
+
+
+def _numeric_date(match: "re.Match[str]", locale: Locale, today: date) -> Optional[date]:
+    first, second, third = (int(match.group(g)) for g in ("d1", "d2", "d3"))
+    if len(match.group("d1")) == 4:
+        year, month, day = first, second, third
+    else:
+        year = third + 2000 if third < 100 else third
+        day, month = (first, second) if locale.day_first else (second, first)
+        # Unambiguous when one side cannot be a month
+        if month > 12 and day <= 12:
+            day, month = month, day
+    try:
+        value = date(year, month, day)
+    except ValueError:
+        return None
+    return value if date(2000, 1, 1) <= value <= today + timedelta(days=1) else None
+
+
+def _text_date(text: str, locale: Locale, today: date) -> Optional[date]:
+    try:
+        value = date_parser.parse(text, dayfirst=locale.day_first, fuzzy=True).date()
+    except (ValueError, OverflowError):
+        return None
+    return value if date(2000, 1, 1) <= value <= today + timedelta(days=1) else None
+
+
+def _clean_vendor(line: str) -> str:
+    return re.sub(r"\s{2,}", " ", line.strip(" \t*#-=:|~")).strip()[:255]
+
+
+def _confidence(score: float) -> float:
+    return round(max(0.0, min(score, 1.0)), 2)
+
+
+def parse_receipt(
+    text: str, locale: Optional[str] = None, today: Optional[date] = None
+) -> ParsedReceipt:
+    """Extract amount, date, vendor and currency from OCR text in one pass."""
+    code = locale or detect_locale(text)
+    conventions = LOCALES.get(code, LOCALES[DEFAULT_LOCALE])
+    grammar = GRAMMARS[conventions.code]
+    currencies = dict(conventions.currency_tokens)
+    today = today or date.today()
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    amounts: List[Tuple[float, Decimal]] = []
+    dates: List[Tuple[float, date]] = []
+    vendors: List[Tuple[float, str]] = []
+    currency_seen: Optional[str] = None
+    upi = False
+    total_pending = False  # a total keyword with no amount on its line
+
+    for index, line in enumerate(lines):
+        position = index / max(len(lines) - 1, 1)
+        line_amounts: List[Tuple[Decimal, bool]] = []
+        has_total = has_non_total = has_date = False
+
+        for match in grammar.finditer(line):
+            kind = match.lastgroup
+            if match.group("non_total"):
+                has_non_total = True
+            elif match.group("total"):
+                has_total = True
+            elif match.group("upi"):
+                upi = True
+            elif match.group("payee"):
+                name = _clean_vendor(match.group("payee_name"))
+                if name and not NOT_VENDOR.search(name):
+                    vendors.append((0.9, name))
+            elif match.group("numeric_date"):
+                value = _numeric_date(match, conventions, today)
+                if value:
+                    has_date = True
+                    score = 0.6 + 0.2 * (len(match.group("d3")) == 4 or len(match.group("d1")) == 4)
+                    dates.append((score + 0.2 * ("date" in line.lower()), value))
+            elif match.group("text_date"):
+                value = _text_date(match.group("text_date"), conventions, today)
+                if value:
+                    has_date = True
+                    dates.append((0.8 + 0.1 * ("date" in line.lower()), value))
+            elif kind == "amount":
+                value = _to_decimal(match.group("number"), conventions)
+                if value is None:
+                    continue
+                symbol = (match.group("currency") or match.group("currency_after") or "").lower()
+                # Bare integers elsewhere are quantities, codes and times
+                if match.group("integer") and not (symbol or has_total or total_pending):
+                    continue
+                if symbol:
+                    currency_seen = currency_seen or currencies.get(symbol)
+                line_amounts.append((value, bool(symbol)))
+
+        for value, has_currency in line_amounts:
+            score = 0.2 + 0.15 * has_currency + 0.1 * position
+            if has_total:
+                score += 0.6
+            elif total_pending:
+                score += 0.45
+            if has_non_total:
+                score -= 0.6
+            if has_date:
+                score -= 0.2
+            # UPI screenshots show the amount alone on a line, near the top
+            if len(line_amounts) == 1 and len(line) <= 16 and has_currency:
+                score += 0.35 + 0.1 * (1 - position)
+            amounts.append((score, value))
+        total_pending = has_total and not line_amounts
+
+        # Receipts name the merchant in the header
+        if index < VENDOR_SEARCH_LINES and not line_amounts and not has_date:
+            letters = sum(c.isalpha() for c in line)
+            if letters >= 3 and not NOT_VENDOR.search(line) and not has_total:
+                score = 0.7 - 0.08 * index - 0.2 * (letters / len(line) < 0.6)
+                vendors.append((score, _clean_vendor(line)))
+
+    result = ParsedReceipt(
+        kind="upi" if upi else "receipt",
+        locale=conventions.code,
+        currency=currency_seen or conventions.currency,
+    )
+    if amounts:
+        # Ties go to the larger value: the total exceeds the lines it sums
+        score, result.amount = max(amounts, key=lambda c: (c[0], c[1]))
+        result.confidence["amount"] = _confidence(score)
+    if dates:
+        score, result.date = max(dates, key=lambda c: c[0])
+        result.confidence["date"] = _confidence(score)
+    if vendors:
+        score, result.vendor = max(vendors, key=lambda c: c[0])
+        result.confidence["vendor"] = _confidence(score)
+    return result
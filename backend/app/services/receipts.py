@@ -0,0 +1,164 @@
+"""
+Receipt uploads.
+
+Clients upload receipt images straight to object storage with a presigned
+POST, so receipt bytes never pass through an API worker. The POST policy
+pins the object key, content type and size range. Once the upload
+finishes, the client calls the completion endpoint, which checks that the
+object exists and creates the PROCESSING transaction that the pipeline
+picks up. A bucket notification handler can call
+:func:`create_receipt_transaction` the same way.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, List, Optional, Tuple
+from uuid import UUID
+
+import structlog
+from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import get_storage
+from app.models.database import Transaction, TransactionStatus
+from app.models.schemas import PresignedUpload
+from app.workers.queue import notify_new_job
+
+logger = structlog.get_logger()
+
+RECEIPT_PREFIX = "receipts"
+UPLOAD_URL_EXPIRES_SECONDS = 15 * 60
+# Stored and signed content types come from the extension, never the client
+RECEIPT_CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "pdf": "application/pdf",
+}
+
+
+def max_upload_bytes() -> int:
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def receipt_extension(filename: str) -> Optional[str]:
+    """Lower-cased extension if it is an allowed receipt type."""
+    _, dot, extension = filename.rpartition(".")
+    extension = extension.lower()
+    if (
+        not dot
+        or extension not in settings.ALLOWED_EXTENSIONS
+        or extension not in RECEIPT_CONTENT_TYPES
+    ):
+        return None
+    return extension
+
+
+def receipt_key(user_id: UUID, upload_id: UUID, extension: str) -> str:
+    return f"{RECEIPT_PREFIX}/{user_id}/{upload_id}.{extension}"
+
+
+def create_presigned_upload(user_id: UUID, upload_id: UUID, extension: str) -> PresignedUpload:
+    """Sign a POST policy for one receipt object.
+
+    A presigned POST rather than PUT, because only a POST policy can
+    enforce the size limit on the storage side. Signing is local; no
+    request goes to storage.
+    """
+    content_type = RECEIPT_CONTENT_TYPES[extension]
+    post = get_storage().presign_post(
+        receipt_key(user_id, upload_id, extension),
+        fields={"Content-Type": content_type},
+        conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_upload_bytes()],
+        ],
+        expires_in=UPLOAD_URL_EXPIRES_SECONDS,
+    )
+    return PresignedUpload(
+        upload_id=upload_id,
+        url=post["url"],
+        fields=post["fields"],
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=UPLOAD_URL_EXPIRES_SECONDS),
+    )
+
+
+async def find_upload(user_id: UUID, upload_id: UUID) -> Optional[Tuple[str, int]]:
+    """Key and size of an uploaded receipt, or None if nothing was uploaded."""
+    return await get_storage().find(f"{RECEIPT_PREFIX}/{user_id}/{upload_id}.")
+
+
+class UploadTooLarge(Exception):
+    """A proxied receipt grew past the size limit while it was read."""
+
+
+class _SizeLimitedReader:
+    """Reads through to ``file`` and raises once ``limit`` bytes are passed.
+
+    It has no ``seek``, so storage reads it front to back in chunks and the
+    limit holds even when the client sent no size up front.
+    """
+
+    def __init__(self, file: BinaryIO, limit: int):
+        self._file = file
+        self._limit = limit
+        self._read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._read += len(chunk)
+        if self._read > self._limit:
+            raise UploadTooLarge()
+        return chunk
+
+
+async def store_receipt(user_id: UUID, upload_id: UUID, extension: str, file: BinaryIO) -> str:
+    """Upload a receipt received by the API itself; returns its key.
+
+    Raises :class:`UploadTooLarge` past the size limit; storage then
+    discards the partial object.
+    """
+    key = receipt_key(user_id, upload_id, extension)
+    await get_storage().put(
+        key, _SizeLimitedReader(file, max_upload_bytes()), RECEIPT_CONTENT_TYPES[extension]
+    )
+    return key
+
+
+async def delete_receipts(keys: List[str]) -> None:
+    """Remove receipt images of deleted transactions. Best effort."""
+    try:
+        failed = await get_storage().delete_many(keys)
+    except (BotoCoreError, ClientError) as e:
+        logger.warning("Receipt deletion failed", exception=str(e))
+        return
+    if failed:
+        logger.warning("Receipt deletion failed", keys=failed)
+
+
+async def create_receipt_transaction(
+    db: AsyncSession, user_id: UUID, upload_id: UUID, key: str
+) -> Optional[Transaction]:
+    """Queue an uploaded receipt for processing. The caller commits.
+
+    Idempotent: concurrent or retried completions of one upload all get the
+    same transaction, and only the first wakes the workers. Returns None if
+    the id belongs to another user's transaction.
+    """
+    inserted = await db.scalar(
+        insert(Transaction)
+        .values(
+            id=upload_id,
+            user_id=user_id,
+            image_url=key,
+            status=TransactionStatus.PROCESSING,
+        )
+        .on_conflict_do_nothing(index_elements=[Transaction.id])
+        .returning(Transaction.id)
+    )
+    if inserted is not None:
+        await notify_new_job(db, inserted)
+    return await Transaction.get_for_user(db, upload_id, user_id)
+
@@ -0,0 +1,213 @@
+"""
+Vendor similarity index for cold-start categorization.
+
+When a user has no vendor mapping for a vendor, it is very often a near
+duplicate of one that other users have already categorized ("DMart Thane"
+vs "D-Mart", "Starbucks #1234" vs "STARBUCKS COFFEE"). The index holds
+every normalized vendor name that users agree on, with its majority global
+category. A new vendor is matched by cosine similarity of sentence
+embeddings, and a close enough match skips the transformer classifier.
+
+The index is rebuilt offline by app/workers/vendor_index_job.py and
+published as a versioned artifact (see app/services/model_store.py) in
+VENDOR_INDEX_DIR. Each version holds ``embeddings.npy`` (float32,
+unit-length rows) and ``vendors.json`` (name, category id and agreement per
+row). Workers memory-map the embeddings, so every process on a host shares
+one copy through the page cache. Search is brute force: one matrix product per batch
+of queries, chunked over the index rows. A few hundred thousand vendors
+fit easily.
+"""
+
+import asyncio
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import model_store
+
+ENCODE_BATCH_SIZE = 256
+# Index rows scored per step; bounds the temporary score matrix
+SEARCH_CHUNK_ROWS = 65_536
+
+# Joined rather than split: "D-Mart" and "DMart", "Joe's" and "Joes"
+_JOINERS = re.compile(r"[-'’.]")
+_PUNCTUATION = re.compile(r"[^\w\s&]+")
+_NUMBERS = re.compile(r"\b\d+\b")
+_LEGAL_SUFFIXES = re.compile(
+    r"\b(?:pvt|private|ltd|limited|llp|llc|inc|corp|co|gmbh|plc|store|shop)\b"
+)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_vendor(name: str) -> str:
+    """Canonical vendor name: case, punctuation, store numbers and legal suffixes dropped."""
+    name = _PUNCTUATION.sub(" ", _JOINERS.sub("", name.casefold()))
+    name = _LEGAL_SUFFIXES.sub(" ", _NUMBERS.sub(" ", name))
+    return _SPACES.sub(" ", name).strip()
+
+
+_encoder = None
+
+
+def get_encoder():
+    """The sentence-transformers model (loaded on first use)."""
+    global _encoder
+    if _encoder is None:
+        from sentence_transformers import SentenceTransformer
+
+        _encoder = SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu")
+    return _encoder
+
+
+def embed(names: Sequence[str]) -> np.ndarray:
+    """Unit-length float32 embeddings, one row per name."""
+    vectors = get_encoder().encode(
+        list(names),
+        batch_size=ENCODE_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def vendor_vectors(vendors: Sequence[str]) -> np.ndarray:
+    """Embeddings of normalized vendor names, reusing the index's rows."""
+    index = get_vendor_index()
+    vectors = [index.vector(vendor) if index else None for vendor in vendors]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        for i, vector in zip(missing, embed([vendors[i] for i in missing])):
+            vectors[i] = vector
+    return np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+
+@dataclass(frozen=True)
+class VendorMatch:
+    """Closest indexed vendor to a query."""
+
+    vendor: str
+    category_id: UUID
+    similarity: float
+    agreement: float  # share of users who chose this category
+
+
+class VendorIndex:
+    """Normalized vendor names with their majority category and embeddings."""
+
+    def __init__(
+        self,
+        version: str,
+        vendors: List[str],
+        category_ids: List[UUID],
+        agreement: List[float],
+        embeddings: np.ndarray,
+    ):
+        self.version = version
+        self.vendors = vendors
+        self.category_ids = category_ids
+        self.agreement = agreement
+        self.embeddings = embeddings
+        self._rows: Dict[str, int] = {vendor: row for row, vendor in enumerate(vendors)}
+
+    def __len__(self) -> int:
+        return len(self.vendors)
+
+    @classmethod
+    def load(cls, path: Path, version: str) -> "VendorIndex":
+        with open(path / "vendors.json", encoding="utf-8") as f:
+            rows = json.load(f)
+        embeddings = np.load(path / "embeddings.npy", mmap_mode="r")
+        return cls(
+            version,
+            [vendor for vendor, _, _ in rows],
+            [UUID(category_id) for _, category_id, _ in rows],
+            [agreement for _, _, agreement in rows],
+            embeddings,
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write this index as a new version and make it current."""
+        path = model_store.version_dir(directory, self.version)
+        np.save(path / "embeddings.npy", np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        with open(path / "vendors.json", "w", encoding="utf-8") as f:
+            json.dump(
+                [[v, str(c), a] for v, c, a in zip(self.vendors, self.category_ids, self.agreement)],
+                f,
+            )
+        model_store.publish(directory, self.version)
+
+    def vector(self, vendor: str) -> Optional[np.ndarray]:
+        """Cached embedding of a normalized vendor name, if indexed."""
+        row = self._rows.get(vendor)
+        return None if row is None else self.embeddings[row]
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best index row and its cosine similarity for each query row."""
+        best_rows = np.zeros(len(queries), dtype=np.int64)
+        best_scores = np.full(len(queries), -1.0, dtype=np.float32)
+        columns = np.arange(len(queries))
+        for start in range(0, len(self), SEARCH_CHUNK_ROWS):
+            scores = self.embeddings[start:start + SEARCH_CHUNK_ROWS] @ queries.T
+            rows = scores.argmax(axis=0)
+            top = scores[rows, columns]
+            better = top > best_scores
+            best_scores[better] = top[better]
+            best_rows[better] = rows[better] + start
+        return best_rows, best_scores
+
+    def match(self, names: Sequence[str], min_similarity: float) -> List[Optional[VendorMatch]]:
+        """Closest indexed vendor for each name, or None below ``min_similarity``."""
+        normalized = [normalize_vendor(name) for name in names]
+        matches: List[Optional[VendorMatch]] = [None] * len(names)
+
+        # Exact hits need neither the encoder nor a search
+        unknown = []
+        for i, vendor in enumerate(normalized):
+            row = self._rows.get(vendor)
+            if row is not None:
+                matches[i] = self._match(row, 1.0)
+            elif vendor:
+                unknown.append(i)
+        if not unknown or not len(self):
+            return matches
+
+        rows, scores = self.search(embed([normalized[i] for i in unknown]))
+        for i, row, score in zip(unknown, rows, scores):
+            if score >= min_similarity:
+                matches[i] = self._match(int(row), float(score))
+        return matches
+
+    def _match(self, row: int, similarity: float) -> VendorMatch:
+        return VendorMatch(
+            vendor=self.vendors[row],
+            category_id=self.category_ids[row],
+            similarity=similarity,
+            agreement=self.agreement[row],
+        )
+
+
+_index = model_store.ArtifactCache(settings.VENDOR_INDEX_DIR, VendorIndex.load)
+
+
+def get_vendor_index() -> Optional[VendorIndex]:
+    """The current index, reloaded when a rebuild publishes a new version."""
+    return _index.get()
+
+
+def _match(names: Sequence[str]) -> List[Optional[VendorMatch]]:
+    index = get_vendor_index()
+    if index is None:
+        return [None] * len(names)
+    return index.match(names, settings.VENDOR_INDEX_MIN_SIMILARITY)
+
+
+async def match_vendors(names: Sequence[str]) -> List[Optional[VendorMatch]]:
+    """Match vendors against the index off the event loop."""
+    return await asyncio.to_thread(_match, names)
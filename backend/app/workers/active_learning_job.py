@@ -0,0 +1,153 @@
+"""
+Incremental category head training from user corrections.
+
+Reads the audit corrections recorded since the published head's watermark,
+in (created_at, id) order via idx_audit_created. Only corrections to a
+global category that name a vendor are used. About one in HOLDOUT_SHARE,
+chosen by correction id, joins the rolling holdout set. The rest continue
+training the published head. The candidate is published only if its
+holdout accuracy is no more than --tolerance below the current head's.
+Otherwise the current head is republished with the watermark past the
+batch and the batch's held-out rows in its holdout, so a rejected batch
+is skipped rather than read again on every run. Running workers switch
+to the new version within a minute:
+
+    python -m app.workers.active_learning_job [--max-corrections 50000] [--tolerance 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import select, tuple_
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.database import AuditCorrection, Category
+from app.services.category_head import CategoryHead, Watermark, get_category_head
+from app.services.model_store import new_version
+from app.services.vendor_index import normalize_vendor, vendor_vectors
+
+logger = structlog.get_logger()
+
+HOLDOUT_SHARE = 10  # one correction in N is held out
+HOLDOUT_SIZE = 5_000  # most recent held-out examples kept
+
+
+async def load_corrections(watermark: Optional[Watermark], limit: int):
+    """Corrections past the watermark, oldest first."""
+    query = (
+        select(
+            AuditCorrection.id,
+            AuditCorrection.created_at,
+            AuditCorrection.new_vendor,
+            AuditCorrection.new_category_id,
+        )
+        .join(Category, Category.id == AuditCorrection.new_category_id)
+        .where(Category.is_global.is_(True), AuditCorrection.new_vendor.is_not(None))
+        .order_by(AuditCorrection.created_at, AuditCorrection.id)
+        .limit(limit)
+    )
+    if watermark is not None:
+        query = query.where(
+            tuple_(AuditCorrection.created_at, AuditCorrection.id)
+            > (datetime.fromisoformat(watermark.created_at), UUID(watermark.id))
+        )
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(query)).all()
+
+
+def train(
+    current: Optional[CategoryHead], rows, vectors: np.ndarray, tolerance: float
+) -> CategoryHead:
+    """Head to publish: trained on the new rows, or the current one if that evaluates worse."""
+    base = (current or CategoryHead.empty(vectors.shape[1])).with_categories(
+        [row.new_category_id for row in rows]
+    )
+    labels = base.labels([row.new_category_id for row in rows])
+    held_out = np.array([row.id.int % HOLDOUT_SHARE == 0 for row in rows])
+
+    candidate = base.partial_fit(vectors[~held_out], labels[~held_out])
+    holdout_vectors = np.vstack([base.holdout[0], vectors[held_out]])[-HOLDOUT_SIZE:]
+    holdout_labels = np.concatenate([base.holdout[1], labels[held_out]])[-HOLDOUT_SIZE:]
+
+    accuracy = candidate.accuracy(holdout_vectors, holdout_labels)
+    baseline = current.accuracy(holdout_vectors, holdout_labels) if current else None
+    if accuracy is not None and baseline is not None and accuracy < baseline - tolerance:
+        logger.warning(
+            "Category head candidate rejected, corrections skipped",
+            corrections=len(rows),
+            holdout_accuracy=round(accuracy, 4),
+            current_accuracy=round(baseline, 4),
+            holdout_size=len(holdout_labels),
+        )
+        candidate, accuracy = base, baseline
+
+    last = rows[-1]
+    return replace(
+        candidate,
+        version=new_version(),
+        watermark=Watermark(created_at=last.created_at.isoformat(), id=str(last.id)),
+        holdout_accuracy=accuracy,
+        holdout=(holdout_vectors, holdout_labels),
+    )
+
+
+async def run(max_corrections: int, tolerance: float) -> Optional[CategoryHead]:
+    """Train on new corrections and publish the result if it holds up.
+
+    Publishes the current head with an advanced watermark when it does not.
+    """
+    started = time.perf_counter()
+    current = get_category_head()
+    rows = await load_corrections(current.watermark if current else None, max_corrections)
+    if not rows:
+        logger.info("No new corrections to learn from")
+        return None
+
+    embed_started = time.perf_counter()
+    vectors = await asyncio.to_thread(
+        vendor_vectors, [normalize_vendor(row.new_vendor) for row in rows]
+    )
+    embed_seconds = time.perf_counter() - embed_started
+
+    train_started = time.perf_counter()
+    head = train(current, rows, vectors, tolerance)
+    train_seconds = time.perf_counter() - train_started
+
+    head.save(Path(settings.CATEGORY_HEAD_DIR))
+    logger.info(
+        "Category head published",
+        version=head.version,
+        corrections=len(rows),
+        categories=len(head.category_ids),
+        trained_examples=head.trained_examples,
+        holdout_accuracy=head.holdout_accuracy,
+        embed_seconds=round(embed_seconds, 2),
+        train_seconds=round(train_seconds, 2),
+        total_seconds=round(time.perf_counter() - started, 2),
+    )
+    return head
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the category head on new corrections")
+    parser.add_argument("--max-corrections", type=int, default=50_000, help="Corrections per run")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Allowed holdout accuracy drop")
+    args = parser.parse_args()
+
+    try:
+        await run(args.max_corrections, args.tolerance)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""
+Month rollover batch job for budgets.
+
+Materializes every user's budgets for a month in two set-based INSERT ...
+SELECT statements (see app.services.budgets.roll_over_budgets). Safe to run
+repeatedly; schedule it shortly after midnight on the first of the month:
+
+    python -m app.workers.budget_rollover [--month YYYY-MM]
+"""
+
+import argparse
+import asyncio
+
+import structlog
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.budgets import current_month, roll_over_budgets
+
+logger = structlog.get_logger()
+
+
+async def run(month: str) -> int:
+    """Roll budgets over into ``month`` and return the rows created."""
+    async with AsyncSessionLocal() as db:
+        created = await roll_over_budgets(db, month)
+        await db.commit()
+
+    logger.info("Budget rollover completed", month=month, budgets_created=created)
+    return created
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Roll budgets over into a new month")
+    parser.add_argument("--month", default=current_month(), help="Target month (YYYY-MM)")
+    args = parser.parse_args()
+
+    try:
+        await run(args.month)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
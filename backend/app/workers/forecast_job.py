@@ -0,0 +1,153 @@
+"""
+Nightly spending forecast fit.
+
+Reads the monthly_spending rollup for the last HISTORY_MONTHS completed
+months, lays every (user, category) series out as one row of a dense
+matrix, fits all of them in a single vectorized pass and upserts the
+compact model state into spending_forecasts. Models for series that no
+longer qualify are deleted in the same transaction:
+
+    python -m app.workers.forecast_job [--through YYYY-MM]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import structlog
+from sqlalchemy import BigInteger, delete, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.database import MonthlySpending, SpendingForecast
+from app.services.budgets import current_month, previous_month
+from app.services.forecasting import (
+    MIN_MONTHS,
+    fit_damped_holt,
+    month_from_index,
+    month_index,
+)
+
+logger = structlog.get_logger()
+
+HISTORY_MONTHS = 24
+FETCH_SIZE = 50_000
+UPSERT_BATCH = 5_000
+
+
+async def _delete_unwritten(db: AsyncSession) -> int:
+    """Delete the models this transaction did not write."""
+    # Every row upserted here got the transaction's now() as updated_at
+    result = await db.execute(
+        delete(SpendingForecast)
+        .where(SpendingForecast.updated_at != func.now())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def run(through: str) -> int:
+    """Fit every series ending at ``through`` and store the models."""
+    started = time.perf_counter()
+    last = month_index(through)
+    first = last - HISTORY_MONTHS + 1
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(
+                MonthlySpending.user_id,
+                MonthlySpending.category_id,
+                MonthlySpending.month,
+                type_coerce(MonthlySpending.spent, BigInteger),
+            )
+            .where(
+                MonthlySpending.month >= month_from_index(first),
+                MonthlySpending.month <= through,
+            )
+            .execution_options(yield_per=FETCH_SIZE)
+        )
+        columns = ["user_id", "category_id", "month", "cents"]
+        frames = [pd.DataFrame(rows, columns=columns) async for rows in result.partitions()]
+
+        if not frames:
+            deleted = await _delete_unwritten(db)
+            await db.commit()
+            logger.info("No spending to forecast", through=through, deleted=deleted)
+            return 0
+
+        # One matrix row per (user, category) series, one column per month
+        data = pd.concat(frames, ignore_index=True)
+        series, uniques = pd.MultiIndex.from_frame(data[["user_id", "category_id"]]).factorize()
+        keys = uniques.to_frame(index=False)
+        offsets = data["month"].map(month_index).to_numpy() - first
+
+        matrix = np.zeros((len(keys), HISTORY_MONTHS))
+        matrix[series, offsets] = data["cents"].to_numpy()
+
+        keep = np.count_nonzero(matrix, axis=1) >= MIN_MONTHS
+        fit_started = time.perf_counter()
+        fit = fit_damped_holt(matrix[keep])
+        fit_seconds = time.perf_counter() - fit_started
+        keys = keys[keep]
+
+        rows = [
+            {
+                "user_id": user_id,
+                "category_id": category_id,
+                "fitted_through": through,
+                "level": float(level),
+                "trend": float(trend),
+                "residual_std": float(spread),
+            }
+            for user_id, category_id, level, trend, spread in zip(
+                keys["user_id"], keys["category_id"], fit.level, fit.trend, fit.residual_std
+            )
+        ]
+        for start in range(0, len(rows), UPSERT_BATCH):
+            stmt = insert(SpendingForecast).values(rows[start:start + UPSERT_BATCH])
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user_id", "category_id"],
+                    set_={
+                        "fitted_through": stmt.excluded.fitted_through,
+                        "level": stmt.excluded.level,
+                        "trend": stmt.excluded.trend,
+                        "residual_std": stmt.excluded.residual_std,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+            )
+        deleted = await _delete_unwritten(db)
+        await db.commit()
+
+    logger.info(
+        "Spending forecasts fitted",
+        through=through,
+        series=len(rows),
+        deleted=deleted,
+        fit_seconds=round(fit_seconds, 2),
+        total_seconds=round(time.perf_counter() - started, 2),
+    )
+    return len(rows)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit spending forecasts for all users")
+    parser.add_argument(
+        "--through",
+        default=previous_month(current_month()),
+        help="Last completed month to fit (YYYY-MM)",
+    )
+    args = parser.parse_args()
+
+    try:
+        await run(args.through)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+Transaction processing stages.
+
+Importing this module registers the stage handlers with the queue worker
+(see app/workers/queue.py).
+
+PROCESSING -> PARSED: OCR the receipt image (unless the text is already
+known) and render its thumbnail and preview, then extract amount, date
+and vendor with the receipt parser. The
+full parse, with per-field confidence, is kept in ``parsed_json``.
+Extracted fields only fill columns that are still empty. The text is then
+scanned for PII before it is stored. It is parsed first because UPI ids
+are what identify a payment screenshot.
+
+PARSED -> CLASSIFIED: suggest a category from the cheapest source that
+knows the vendor. That is the user's in-memory prior (when it is
+confident), the user's own vendor mapping, then the vendor similarity
+index (when confident), then the category head trained on user corrections (when it is
+confident), then the transformer classifier. The prior is kept current by
+the confirm/correct notifications this module listens to. The suggestion
+is applied when its confidence reaches MODEL_CONFIDENCE_THRESHOLD. Either
+way its source and confidence are recorded in
+``parsed_json["classification"]``.
+"""
+
+from typing import Optional, Tuple
+from uuid import UUID
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import get_storage
+from app.models.database import Transaction, TransactionStatus, VendorMapping
+from app.services import (
+    category_head,
+    category_prior,
+    classifier,
+    images,
+    ocr,
+    pii,
+    vendor_index,
+)
+from app.services.receipt_parser import parse_receipt
+from app.workers.queue import PermanentError, listen, stage
+
+logger = structlog.get_logger()
+
+
+async def record_variants(transaction: Transaction, data: Optional[bytes] = None) -> None:
+    """Render and record the receipt's thumbnail and preview.
+
+    Best effort: a failure only costs a render on first view, because the
+    image endpoint renders missing variants on demand.
+    """
+    if (
+        transaction.image_variants is not None
+        or not transaction.image_url
+        or not images.is_renderable(transaction.image_url)
+    ):
+        return
+    try:
+        transaction.image_variants = await images.generate_upload_variants(
+            transaction.image_url, data
+        )
+    except Exception as e:
+        logger.warning(
+            "Receipt variant rendering failed",
+            transaction_id=str(transaction.id),
+            exception=str(e),
+        )
+
+
+@stage(TransactionStatus.PROCESSING)
+async def parse_stage(db: AsyncSession, transaction: Transaction) -> TransactionStatus:
+    data = None
+    if transaction.raw_text is None:
+        if not transaction.image_url or not images.is_renderable(transaction.image_url):
+            raise PermanentError(f"No OCR support for receipt {transaction.image_url!r}")
+        data = await get_storage().get(transaction.image_url)
+        transaction.raw_text = await ocr.extract_text(data)
+    await record_variants(transaction, data)
+
+    parsed = parse_receipt(transaction.raw_text)
+    transaction.parsed_json = parsed.to_json()
+    if transaction.amount is None and parsed.amount is not None:
+        transaction.amount = parsed.amount
+    if transaction.date is None and parsed.date is not None:
+        transaction.date = parsed.date
+    if transaction.vendor is None and parsed.vendor is not None:
+        transaction.vendor = parsed.vendor
+
+    if settings.PII_DETECTION_ENABLED:
+        if settings.PII_REDACTION_ENABLED:
+            transaction.raw_text, spans = pii.redact(transaction.raw_text)
+        else:
+            spans = pii.detect_pii(transaction.raw_text)
+        # Offsets into the stored raw_text
+        transaction.parsed_json["pii"] = [span.to_json() for span in spans]
+    return TransactionStatus.PARSED
+
+
+async def suggest_category(
+    db: AsyncSession, transaction: Transaction
+) -> Optional[Tuple[UUID, float, str]]:
+    """(category_id, confidence, source) for a transaction's vendor."""
+    prediction = await category_prior.predict_category(db, transaction.user_id, transaction.vendor)
+    if prediction is not None:
+        return (*prediction, "prior")
+
+    result = await db.execute(
+        select(VendorMapping.category_id, VendorMapping.confidence).where(
+            VendorMapping.user_id == transaction.user_id,
+            VendorMapping.vendor_name == transaction.vendor,
+        )
+    )
+    mapping = result.first()
+    if mapping is not None:
+        return mapping.category_id, mapping.confidence / 100, "vendor_mapping"
+
+    # A near-identical vendor that users disagree on is not decisive
+    match = (await vendor_index.match_vendors([transaction.vendor]))[0]
+    index_suggestion = None
+    if match is not None:
+        index_suggestion = (match.category_id, match.similarity * match.agreement, "vendor_index")
+        if index_suggestion[1] >= settings.MODEL_CONFIDENCE_THRESHOLD:
+            return index_suggestion
+
+    prediction = await category_head.predict_category(transaction.vendor)
+    if prediction is not None and prediction[1] >= settings.MODEL_CONFIDENCE_THRESHOLD:
+        return (*prediction, "category_head")
+
+    prediction = await classifier.predict_category(db, transaction.vendor, transaction.raw_text)
+    if prediction is not None:
+        return (*prediction, "model")
+    return index_suggestion
+
+
+@stage(TransactionStatus.PARSED)
+async def classify_stage(db: AsyncSession, transaction: Transaction) -> TransactionStatus:
+    if transaction.category_id is not None or not transaction.vendor:
+        return TransactionStatus.CLASSIFIED
+
+    suggestion = await suggest_category(db, transaction)
+    if suggestion is None:
+        return TransactionStatus.CLASSIFIED
+
+    category_id, confidence, source = suggestion
+    transaction.confidence_score = confidence
+    if confidence >= settings.MODEL_CONFIDENCE_THRESHOLD:
+        transaction.category_id = category_id
+    # Reassigned, not mutated: JSON columns do not track in-place changes
+    transaction.parsed_json = {
+        **(transaction.parsed_json or {}),
+        "classification": {
+            "source": source,
+            "category_id": str(category_id),
+            "confidence": round(confidence, 3),
+        },
+    }
+    return TransactionStatus.CLASSIFIED
+
+
+@listen(settings.PRIOR_NOTIFY_CHANNEL)
+def prior_changed(payload: str) -> None:
+    category_prior.apply_notification(payload)
@@ -0,0 +1,308 @@
+"""
+Postgres-backed work queue for the transaction processing pipeline.
+
+Rows in ``transactions`` are the jobs. A worker claims a batch with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and stamps each row with a lease and an
+incremented attempt counter in the same statement, so concurrent workers
+never pick the same row and a crashed worker's rows become claimable again
+once the lease expires. Rows that exhaust ``QUEUE_MAX_ATTEMPTS`` move to
+``ERROR``, as do rows whose stage raises ``PermanentError``.
+
+New work is announced with ``pg_notify`` and workers block on LISTEN instead
+of sleep-polling. An idle worker wakes again when the earliest pending retry
+or lease comes due, and at the latest after the lease timeout.
+Other channels can be listened to on the same connection with ``@listen``.
+
+Run a worker with::
+
+    python -m app.workers.queue
+"""
+
+import asyncio
+import signal
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+import structlog
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.database import Transaction, TransactionStatus
+
+logger = structlog.get_logger()
+
+# A stage handler receives a claimed transaction and returns the status the
+# row should move to (e.g. PROCESSING -> PARSED).
+StageHandler = Callable[[AsyncSession, Transaction], Awaitable[TransactionStatus]]
+
+STAGE_HANDLERS: Dict[TransactionStatus, StageHandler] = {}
+
+# A listener receives the payload of each notification on its channel. It
+# runs on the event loop, so it must not block.
+Listener = Callable[[str], None]
+
+LISTENERS: Dict[str, Listener] = {}
+
+
+class PermanentError(Exception):
+    """A stage failure that retrying cannot fix; the row moves to ERROR at once."""
+
+
+def stage(status: TransactionStatus):
+    """Register the handler for rows in the given status."""
+    def decorator(func: StageHandler) -> StageHandler:
+        STAGE_HANDLERS[status] = func
+        return func
+    return decorator
+
+
+def listen(channel: str):
+    """Register a listener for notifications on ``channel``."""
+    def decorator(func: Listener) -> Listener:
+        LISTENERS[channel] = func
+        return func
+    return decorator
+
+
+async def notify_new_job(db: AsyncSession, transaction_id: UUID) -> None:
+    """Wake listening workers; delivered when the caller's transaction commits."""
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.QUEUE_NOTIFY_CHANNEL, "payload": str(transaction_id)},
+    )
+
+
+async def claim_batch(
+    db: AsyncSession,
+    statuses: List[TransactionStatus],
+    batch_size: int = settings.QUEUE_BATCH_SIZE,
+    lease_seconds: int = settings.QUEUE_LEASE_SECONDS,
+    max_attempts: int = settings.QUEUE_MAX_ATTEMPTS,
+) -> List[UUID]:
+    """Lease up to ``batch_size`` runnable rows. Caller must commit."""
+    runnable = (
+        select(Transaction.id)
+        .where(
+            Transaction.status.in_(statuses),
+            Transaction.attempts < max_attempts,
+            or_(
+                Transaction.lease_expires_at.is_(None),
+                Transaction.lease_expires_at < func.now(),
+            ),
+        )
+        .order_by(Transaction.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(Transaction)
+        .where(Transaction.id.in_(runnable.scalar_subquery()))
+        .values(
+            attempts=Transaction.attempts + 1,
+            lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+        )
+        .returning(Transaction.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars())
+
+
+async def fail_exhausted(
+    db: AsyncSession,
+    statuses: List[TransactionStatus],
+    max_attempts: int = settings.QUEUE_MAX_ATTEMPTS,
+) -> int:
+    """Move rows whose last lease expired after the final attempt to ERROR."""
+    result = await db.execute(
+        update(Transaction)
+        .where(
+            Transaction.status.in_(statuses),
+            Transaction.attempts >= max_attempts,
+            Transaction.lease_expires_at < func.now(),
+        )
+        .values(
+            status=TransactionStatus.ERROR,
+            lease_expires_at=None,
+            last_error=func.coalesce(Transaction.last_error, "Lease expired"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def seconds_until_due(db: AsyncSession, statuses: List[TransactionStatus]) -> Optional[float]:
+    """Time until the earliest leased or retry-delayed row becomes runnable."""
+    due = await db.scalar(
+        select(func.extract("epoch", func.min(Transaction.lease_expires_at) - func.now()))
+        .where(
+            Transaction.status.in_(statuses),
+            Transaction.lease_expires_at > func.now(),
+        )
+    )
+    return None if due is None else float(due)
+
+
+class TransactionWorker:
+    """Claims pipeline rows in batches and runs the registered stage handlers."""
+
+    def __init__(
+        self,
+        handlers: Optional[Dict[TransactionStatus, StageHandler]] = None,
+        listeners: Optional[Dict[str, Listener]] = None,
+        batch_size: int = settings.QUEUE_BATCH_SIZE,
+        lease_seconds: int = settings.QUEUE_LEASE_SECONDS,
+        max_attempts: int = settings.QUEUE_MAX_ATTEMPTS,
+        retry_delay_seconds: int = settings.QUEUE_RETRY_DELAY_SECONDS,
+    ):
+        self.handlers = handlers if handlers is not None else STAGE_HANDLERS
+        self.listeners = listeners if listeners is not None else LISTENERS
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self._wakeup = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._next_due: Optional[float] = None
+
+    def stop(self) -> None:
+        """Finish the current batch and exit."""
+        self._stopped.set()
+        self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """Claim and process one batch. Returns the number of rows claimed."""
+        statuses = list(self.handlers)
+        if not statuses:
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            failed = await fail_exhausted(db, statuses, self.max_attempts)
+            claimed = await claim_batch(
+                db, statuses, self.batch_size, self.lease_seconds, self.max_attempts
+            )
+            await db.commit()
+
+        if failed:
+            logger.warning("Transactions moved to error after max attempts", count=failed)
+
+        await asyncio.gather(*(self._process(transaction_id) for transaction_id in claimed))
+
+        # Includes retry delays set by failures in the batch just processed
+        async with AsyncSessionLocal() as db:
+            self._next_due = await seconds_until_due(db, statuses)
+        return len(claimed)
+
+    async def _process(self, transaction_id: UUID) -> None:
+        """Run one stage for one leased row and record the outcome."""
+        async with AsyncSessionLocal() as db:
+            # Locked so a concurrent confirm or edit waits for this stage
+            transaction = await db.get(Transaction, transaction_id, with_for_update=True)
+            if transaction is None or transaction.status not in self.handlers:
+                # Deleted, or confirmed by its owner since it was claimed
+                return
+            # Rollback expires the instance, so keep what the error path needs
+            status, attempts = transaction.status, transaction.attempts
+
+            try:
+                next_status = await self.handlers[status](db, transaction)
+            except Exception as e:
+                await db.rollback()
+                logger.error(
+                    "Transaction stage failed",
+                    transaction_id=str(transaction_id),
+                    attempts=attempts,
+                    exception=str(e),
+                )
+                exhausted = isinstance(e, PermanentError) or attempts >= self.max_attempts
+                # The rollback released the lock; skip rows confirmed since
+                await db.execute(
+                    update(Transaction)
+                    .where(Transaction.id == transaction_id, Transaction.status == status)
+                    .values(
+                        status=TransactionStatus.ERROR if exhausted else status,
+                        lease_expires_at=None if exhausted else (
+                            func.now() + timedelta(seconds=self.retry_delay_seconds)
+                        ),
+                        last_error=str(e)[:1000],
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                return
+
+            transaction.status = next_status
+            transaction.attempts = 0
+            transaction.lease_expires_at = None
+            transaction.last_error = None
+            # Chain straight into the next stage if this worker handles it
+            if next_status in self.handlers:
+                await notify_new_job(db, transaction_id)
+            await db.commit()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._wakeup.set()
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        try:
+            self.listeners[channel](payload)
+        except Exception as e:
+            logger.error("Notification listener failed", channel=channel, exception=str(e))
+
+    async def run(self) -> None:
+        """Process batches until stopped, sleeping on LISTEN between them."""
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            listener = raw.driver_connection
+            await listener.add_listener(settings.QUEUE_NOTIFY_CHANNEL, self._on_notify)
+            for channel in self.listeners:
+                await listener.add_listener(channel, self._dispatch)
+            logger.info(
+                "Transaction worker started",
+                stages=[s.value for s in self.handlers],
+                batch_size=self.batch_size,
+            )
+
+            try:
+                while not self._stopped.is_set():
+                    # Clear before claiming so a NOTIFY racing the claim is kept
+                    self._wakeup.clear()
+                    if await self.run_once() == self.batch_size:
+                        continue
+                    timeout = self.lease_seconds
+                    if self._next_due is not None:
+                        timeout = min(timeout, max(self._next_due, 1.0))
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                await listener.remove_listener(settings.QUEUE_NOTIFY_CHANNEL, self._on_notify)
+                for channel in self.listeners:
+                    await listener.remove_listener(channel, self._dispatch)
+                logger.info("Transaction worker stopped")
+
+
+async def main() -> None:
+    """Run a worker until SIGINT/SIGTERM."""
+    # Importing the pipeline registers its stages. They land in
+    # app.workers.queue, which under ``python -m`` is not this __main__ module.
+    import app.workers.pipeline  # noqa: F401
+    from app.workers.queue import LISTENERS as listeners
+    from app.workers.queue import STAGE_HANDLERS as handlers
+
+    worker = TransactionWorker(handlers=handlers, listeners=listeners)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
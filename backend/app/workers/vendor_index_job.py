@@ -0,0 +1,147 @@
+"""
+Vendor similarity index rebuild.
+
+Collects every user's categorization of each vendor, from explicit vendor
+mappings and from confirmed transactions, restricted to global categories.
+Vendor names are normalized and each user casts one vote per vendor: their
+vendor mapping if they have one, otherwise their most used category.
+Vendors whose majority category has enough users and agreement go into the
+index. Embeddings of vendors already in the current index are reused, so a
+rebuild only encodes names it has not seen before:
+
+    python -m app.workers.vendor_index_job [--min-users 2] [--min-agreement 0.6]
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import pandas as pd
+import structlog
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.database import Category, Transaction, TransactionStatus, VendorMapping
+from app.services.model_store import new_version
+from app.services.vendor_index import (
+    VendorIndex,
+    get_vendor_index,
+    normalize_vendor,
+    vendor_vectors,
+)
+
+logger = structlog.get_logger()
+
+FETCH_SIZE = 50_000
+# A remembered mapping outweighs any number of individual transactions
+MAPPING_WEIGHT = 1_000_000
+
+
+async def load_votes() -> pd.DataFrame:
+    """(vendor, user_id, category_id, weight) rows from mappings and transactions."""
+    mappings = (
+        select(
+            VendorMapping.vendor_name,
+            VendorMapping.user_id,
+            VendorMapping.category_id,
+            (VendorMapping.usage_count + MAPPING_WEIGHT).label("weight"),
+        )
+        .join(Category, Category.id == VendorMapping.category_id)
+        .where(Category.is_global.is_(True))
+    )
+    transactions = (
+        select(
+            Transaction.vendor,
+            Transaction.user_id,
+            Transaction.category_id,
+            func.count().label("weight"),
+        )
+        .join(Category, Category.id == Transaction.category_id)
+        .where(
+            Category.is_global.is_(True),
+            Transaction.status.in_([TransactionStatus.CONFIRMED, TransactionStatus.CORRECTED]),
+            Transaction.vendor.is_not(None),
+        )
+        .group_by(Transaction.vendor, Transaction.user_id, Transaction.category_id)
+    )
+
+    columns = ["vendor", "user_id", "category_id", "weight"]
+    frames = []
+    async with AsyncSessionLocal() as db:
+        for query in (mappings, transactions):
+            result = await db.stream(query.execution_options(yield_per=FETCH_SIZE))
+            frames.extend([pd.DataFrame(rows, columns=columns) async for rows in result.partitions()])
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def majority_categories(votes: pd.DataFrame, min_users: int, min_agreement: float) -> pd.DataFrame:
+    """One row per normalized vendor: category, users and agreement."""
+    names = votes["vendor"].unique()
+    votes = votes.assign(vendor=votes["vendor"].map(dict(zip(names, map(normalize_vendor, names)))))
+    votes = votes[votes["vendor"] != ""]
+
+    # One vote per user and vendor: their heaviest category
+    weights = votes.groupby(["vendor", "user_id", "category_id"], as_index=False)["weight"].sum()
+    ballots = weights.sort_values("weight").drop_duplicates(["vendor", "user_id"], keep="last")
+
+    tally = ballots.groupby(["vendor", "category_id"]).size().rename("votes").reset_index()
+    tally["users"] = tally.groupby("vendor")["votes"].transform("sum")
+    winners = tally.sort_values("votes").drop_duplicates("vendor", keep="last")
+    winners = winners.assign(agreement=winners["votes"] / winners["users"])
+    return winners[
+        (winners["users"] >= min_users) & (winners["agreement"] >= min_agreement)
+    ].sort_values("vendor", ignore_index=True)
+
+
+async def run(min_users: int, min_agreement: float) -> int:
+    """Rebuild the index and publish it. Returns the number of vendors."""
+    started = time.perf_counter()
+    winners = majority_categories(await load_votes(), min_users, min_agreement)
+    if winners.empty:
+        logger.info("No agreed vendors to index")
+        return 0
+
+    vendors = winners["vendor"].tolist()
+    previous = get_vendor_index()
+    reused = sum(previous.vector(v) is not None for v in vendors) if previous else 0
+    encode_started = time.perf_counter()
+    embeddings = vendor_vectors(vendors)
+    encode_seconds = time.perf_counter() - encode_started
+
+    index = VendorIndex(
+        version=new_version(),
+        vendors=vendors,
+        category_ids=winners["category_id"].tolist(),
+        agreement=winners["agreement"].round(3).tolist(),
+        embeddings=embeddings,
+    )
+    index.save(Path(settings.VENDOR_INDEX_DIR))
+
+    logger.info(
+        "Vendor index published",
+        version=index.version,
+        vendors=len(index),
+        encoded=len(vendors) - reused,
+        reused=reused,
+        encode_seconds=round(encode_seconds, 2),
+        total_seconds=round(time.perf_counter() - started, 2),
+    )
+    return len(index)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the vendor similarity index")
+    parser.add_argument("--min-users", type=int, default=2, help="Users who must have categorized a vendor")
+    parser.add_argument("--min-agreement", type=float, default=0.6, help="Share of users agreeing on the category")
+    args = parser.parse_args()
+
+    try:
+        await run(args.min_users, args.min_agreement)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
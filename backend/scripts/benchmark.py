@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for backend hot paths.
+
+Each benchmark is a subcommand; run with --help for the list.
+
+Usage:
+    python scripts/benchmark.py money-sum --rows 1000000
+    python scripts/benchmark.py money-sum --rows 1000000 --database
+    python scripts/benchmark.py insights --years 5
+    python scripts/benchmark.py forecast-fit --series 1000000
+    python scripts/benchmark.py serialize --rows 500
+    python scripts/benchmark.py transaction-page --rows 50 --database
+    python scripts/benchmark.py receipt-parser --repeat 200
+    python scripts/benchmark.py pii-scan --mb 8
+    python scripts/benchmark.py vendor-index --vendors 200000
+    python scripts/benchmark.py category-head --corrections 50000
+    python scripts/benchmark.py category-prior --vendors 500
+    python scripts/benchmark.py jwt-verify --tokens 2000
+    REDIS_URL=memory:// python scripts/benchmark.py replica-routing --requests 10000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from decimal import Decimal
+from typing import Callable, Dict, Tuple
+
+
+BENCHMARKS: Dict[str, Tuple[str, Callable[[argparse.Namespace], None], tuple]] = {}
+
+
+def benchmark(name: str, help: str, *arguments: Tuple[str, dict]):
+    """Register a benchmark subcommand with its (flag, add_argument kwargs)."""
+    def decorator(func):
+        BENCHMARKS[name] = (help, func, arguments)
+        return func
+    return decorator
+
+
+def timed(label: str, func: Callable, repeat: int = 5):
+    """Run func `repeat` times and print the best wall time."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:10.2f} ms")
+    return best, result
+
+
+# ---------------------------------------------------------------------------
+# Money aggregation
+# ---------------------------------------------------------------------------
+
+async def _money_sum_database(rows: int) -> None:
+    from sqlalchemy import text
+
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(
+            "CREATE TEMP TABLE bench_money AS "
+            "SELECT (random() * 100000)::bigint AS cents, "
+            "(random() * 1000)::numeric(10, 2) AS amount "
+            "FROM generate_series(1, :rows)"
+        ), {"rows": rows})
+        await db.execute(text("ANALYZE bench_money"))
+
+        for label, sql in (
+            ("postgres SUM(numeric)", "SELECT sum(amount) FROM bench_money"),
+            ("postgres SUM(bigint cents)", "SELECT sum(cents) FROM bench_money"),
+        ):
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                await db.execute(text(sql))
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:<40} {best * 1000:10.2f} ms")
+
+        await db.rollback()
+
+
+@benchmark(
+    "money-sum",
+    "Decimal vs integer-cents aggregation",
+    ("--rows", {"type": int, "default": 1_000_000}),
+    ("--database", {"action": "store_true", "help": "Also compare SUM in Postgres"}),
+)
+def money_sum(args: argparse.Namespace) -> None:
+    import numpy as np
+
+    rng = random.Random(42)
+    cents = [rng.randrange(1, 10_000_000) for _ in range(args.rows)]
+    decimals = [Decimal(c).scaleb(-2) for c in cents]
+    cents_array = np.asarray(cents, dtype=np.int64)
+
+    print(f"rows: {args.rows}")
+    slow, expected = timed("python sum(Decimal)", lambda: sum(decimals, Decimal(0)))
+    timed("python sum(int cents)", lambda: sum(cents))
+    fast, total = timed("numpy int64 cents.sum()", lambda: int(cents_array.sum()))
+    assert Decimal(total).scaleb(-2) == expected
+    print(f"{'speedup (Decimal -> numpy cents)':<40} {slow / fast:10.1f} x")
+
+    if args.database:
+        asyncio.run(_money_sum_database(args.rows))
+
+
+# ---------------------------------------------------------------------------
+# Spending insights
+# ---------------------------------------------------------------------------
+
+def synthetic_history(years: int, per_day: int, seed: int = 42):
+    """A heavy user's history as the frame load_history() returns."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(end=pd.Timestamp.today().normalize(), periods=365 * years, freq="D")
+    n = len(days) * per_day
+    categories = [str(uuid.UUID(int=i)) for i in range(10)]
+    vendors = [f"vendor {i}" for i in range(300)]
+
+    frame = pd.DataFrame({
+        "date": np.repeat(days.values, per_day),
+        "cents": rng.lognormal(7, 1, n).astype(np.int64),
+        "category": rng.choice(categories, n),
+        "vendor": rng.choice(vendors, n),
+    })
+    # One clean monthly subscription for the recurring-charge detector
+    subscription = pd.DataFrame({
+        "date": pd.date_range(days[0], days[-1], freq="30D"),
+        "cents": 64900,
+        "category": categories[0],
+        "vendor": "netflix",
+    })
+    frame = pd.concat([frame, subscription], ignore_index=True)
+    return frame.astype({"category": "category", "vendor": "category"})
+
+
+@benchmark(
+    "insights",
+    "Vectorized insights over a multi-year history",
+    ("--years", {"type": int, "default": 5}),
+    ("--per-day", {"type": int, "default": 10}),
+)
+def insights(args: argparse.Namespace) -> None:
+    from app.services.insights import compute_insights
+
+    frame = synthetic_history(args.years, args.per_day)
+    month = f"{frame['date'].max():%Y-%m}"
+    print(f"rows: {len(frame)} ({args.years} years)")
+    best, result = timed("compute_insights", lambda: compute_insights(frame, month))
+    print(f"{'recurring charges found':<40} {len(result['recurring_charges']):10d}")
+    print(f"{'target':<40} {'PASS' if best < 0.05 else 'FAIL':>10} (< 50 ms)")
+
+
+# ---------------------------------------------------------------------------
+# Spending forecasts
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "forecast-fit",
+    "Vectorized damped-Holt fit across user-category series",
+    ("--series", {"type": int, "default": 1_000_000}),
+    ("--months", {"type": int, "default": 24}),
+)
+def forecast_fit(args: argparse.Namespace) -> None:
+    import numpy as np
+
+    from app.services.forecasting import fit_damped_holt, predict
+
+    rng = np.random.default_rng(42)
+    base = rng.lognormal(9, 1, (args.series, 1))
+    growth = rng.normal(0, 0.02, (args.series, 1))
+    months = np.arange(args.months)
+    matrix = base * (1 + growth) ** months * rng.lognormal(0, 0.2, (args.series, args.months))
+
+    print(f"series: {args.series} x {args.months} months")
+    best, fit = timed("fit_damped_holt", lambda: fit_damped_holt(matrix), repeat=1)
+    print(f"{'series fitted per second':<40} {args.series / best:10.0f}")
+
+    level, trend = float(fit.level[0]), float(fit.trend[0])
+    start = time.perf_counter()
+    for horizon in range(1, 100_001):
+        predict(level, trend, horizon % 12 + 1)
+    per_call = (time.perf_counter() - start) / 100_000
+    print(f"{'predict() per call':<40} {per_call * 1e6:10.2f} us")
+
+
+# ---------------------------------------------------------------------------
+# Response serialization
+# ---------------------------------------------------------------------------
+
+def synthetic_transactions(rows: int, seed: int = 42):
+    """Transient Transaction objects with OCR-sized raw_text/parsed_json."""
+    from datetime import date, datetime, timedelta, timezone
+
+    from app.models.database import Transaction, TransactionStatus
+
+    rng = random.Random(seed)
+    user_id, now = uuid.uuid4(), datetime.now(timezone.utc)
+    transactions = []
+    for i in range(rows):
+        lines = [
+            {"description": f"item {j}", "quantity": rng.randint(1, 3),
+             "price": f"{rng.uniform(1, 50):.2f}"}
+            for j in range(rng.randint(5, 25))
+        ]
+        transactions.append(Transaction(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            category_id=uuid.uuid4(),
+            amount=Decimal(rng.randrange(100, 50_000)).scaleb(-2),
+            date=date.today() - timedelta(days=i % 30),
+            vendor=f"Vendor {rng.randrange(300)}",
+            raw_text="\n".join(f"{l['description']}  x{l['quantity']}  {l['price']}" for l in lines),
+            image_url=f"receipts/{user_id}/{i}.jpg",
+            parsed_json={"vendor": f"Vendor {i}", "line_items": lines, "currency": "USD"},
+            confidence_score=rng.random(),
+            status=TransactionStatus.CONFIRMED,
+            created_at=now,
+            updated_at=now,
+        ))
+    return transactions
+
+
+@benchmark(
+    "serialize",
+    "FastAPI response_model path vs orjson row projection for a transaction page",
+    ("--rows", {"type": int, "default": 500}),
+)
+def serialize(args: argparse.Namespace) -> None:
+    import json
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from app.core.responses import compile_model, dumps
+    from app.models.schemas import TransactionList, TransactionResponse
+
+    transactions = synthetic_transactions(args.rows)
+    adapter = TypeAdapter(TransactionList)
+    envelope = {"total": args.rows, "has_more": False}
+
+    def default_path():
+        # What FastAPI does with response_model=TransactionList
+        page = adapter.validate_python({"transactions": transactions, **envelope})
+        return json.dumps(jsonable_encoder(adapter.dump_python(page, mode="json"))).encode()
+
+    def fast_path():
+        encoder = compile_model(TransactionResponse)
+        return dumps({"transactions": encoder.many(transactions), **envelope})
+
+    print(f"rows: {args.rows}")
+    slow, expected = timed("response_model + json.dumps", default_path)
+    fast, body = timed("compile_model + orjson", fast_path)
+    assert json.loads(body) == json.loads(expected)
+    print(f"{'body size':<40} {len(body) / 1024:10.1f} KiB")
+    print(f"{'speedup':<40} {slow / fast:10.1f} x")
+
+
+async def _transaction_page_database(rows: int) -> None:
+    from sqlalchemy import func, select
+
+    from app.api.v1.endpoints.transactions import LIST_FIELDS
+    from app.core.database import AsyncSessionLocal
+    from app.models.database import Transaction
+
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            select(Transaction.user_id)
+            .group_by(Transaction.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        if user_id is None:
+            print("no transactions in the database; run scripts/seed-data.py first")
+            return
+
+        for label, columns in (
+            ("postgres select(Transaction)", list(Transaction.__table__.columns)),
+            ("postgres projected list columns", [getattr(Transaction, f) for f in LIST_FIELDS]),
+        ):
+            query = (
+                select(*columns)
+                .where(Transaction.user_id == user_id)
+                .order_by(Transaction.date.desc())
+                .limit(rows)
+            )
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                (await db.execute(query)).all()
+                best = min(best, time.perf_counter() - start)
+            size = await db.scalar(
+                select(func.sum(func.pg_column_size(func.row(*query.subquery().c))))
+            )
+            print(f"{label:<40} {best * 1000:10.2f} ms {int(size or 0) / 1024:10.1f} KiB")
+
+
+@benchmark(
+    "transaction-page",
+    "Transaction list page: full rows vs projected columns",
+    ("--rows", {"type": int, "default": 50}),
+    ("--database", {"action": "store_true", "help": "Also time the queries in Postgres"}),
+)
+def transaction_page(args: argparse.Namespace) -> None:
+    from app.api.v1.endpoints.transactions import LIST_FIELDS
+    from app.core.responses import compile_model, dumps
+    from app.models.schemas import TransactionResponse
+
+    transactions = synthetic_transactions(args.rows)
+    full = compile_model(TransactionResponse)
+    projected = compile_model(TransactionResponse, LIST_FIELDS)
+
+    print(f"rows per page: {args.rows}")
+    for label, encoder in (("full rows", full), ("projected list columns", projected)):
+        best, body = timed(f"serialize {label}", lambda: dumps(encoder.many(transactions)))
+        print(f"{'  body size':<40} {len(body) / 1024:10.1f} KiB")
+
+    if args.database:
+        asyncio.run(_transaction_page_database(args.rows))
+
+
+# ---------------------------------------------------------------------------
+# Receipt parsing
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "receipt-parser",
+    "Receipt parser throughput over the labelled corpus",
+    ("--repeat", {"type": int, "default": 200, "help": "Passes over the corpus"}),
+)
+def receipt_parser(args: argparse.Namespace) -> None:
+    import json
+    from pathlib import Path
+
+    from app.services.receipt_parser import parse_receipt
+
+    corpus = Path(__file__).parent / "data" / "receipt-corpus.jsonl"
+    with open(corpus, encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+    receipts = [text for text in texts for _ in range(args.repeat)]
+
+    print(f"receipts: {len(receipts)} ({len(texts)} samples x {args.repeat})")
+    best, _ = timed("parse_receipt", lambda: [parse_receipt(text) for text in receipts])
+    print(f"{'per receipt':<40} {best / len(receipts) * 1e6:10.2f} us")
+    print(f"{'throughput':<40} {len(receipts) / best:10.0f} /s")
+
+
+@benchmark(
+    "pii-scan",
+    "PII detection: one regex per detector per line vs the single scan (MB/s)",
+    ("--mb", {"type": float, "default": 8}),
+)
+def pii_scan(args: argparse.Namespace) -> None:
+    import json
+    import re
+    from pathlib import Path
+
+    from app.services.pii import detect_pii, redact
+
+    corpus = Path(__file__).parent / "data" / "receipt-corpus.jsonl"
+    with open(corpus, encoding="utf-8") as f:
+        samples = [json.loads(line)["text"] for line in f if line.strip()]
+    samples.append(
+        "Card 4111 1111 1111 1111\nA/c No: 12345678901\n"
+        "Ph +91 98765 43210\nmail rk@example.com\nramesh@okaxis"
+    )
+    chunks, size, target = [], 0, int(args.mb * 1024 * 1024)
+    while size < target:
+        sample = samples[len(chunks) % len(samples)]
+        chunks.append(sample)
+        size += len(sample.encode())
+    text = "\n".join(chunks)
+    lines = text.splitlines()
+    megabytes = len(text.encode()) / (1024 * 1024)
+
+    # The straightforward approach: an independent regex per detector
+    detectors = [re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"\b(?:\d[ -]?){12,18}\d\b",
+        r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}\b",
+        r"\b[\w.-]{2,}@[a-z]{2,}\b",
+        r"\b(?:a/c|acct|account)(?:\s*(?:no|number|#))?\.?[\s:#-]*\d[\d -]{7,20}\d",
+        r"(?:\+91[\s-]?|\b0)?\b[6-9]\d{4}[\s-]?\d{5}\b|\(?\b\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b",
+    )]
+
+    def per_detector():
+        return [match for line in lines for pattern in detectors for match in pattern.finditer(line)]
+
+    print(f"text: {megabytes:.1f} MiB, {len(lines)} lines")
+    baseline, _ = timed("regex per detector per line", per_detector, repeat=3)
+    print(f"{'  throughput':<40} {megabytes / baseline:10.1f} MiB/s")
+    best, _ = timed("single scan, detect_pii", lambda: detect_pii(text), repeat=3)
+    print(f"{'  throughput':<40} {megabytes / best:10.1f} MiB/s")
+    print(f"{'  speedup':<40} {baseline / best:10.1f} x")
+    best, _ = timed("single scan, redact", lambda: redact(text), repeat=3)
+    print(f"{'  throughput':<40} {megabytes / best:10.1f} MiB/s")
+
+
+# ---------------------------------------------------------------------------
+# Vendor similarity index
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "vendor-index",
+    "Vendor index: memory-mapped load and brute-force batch search",
+    ("--vendors", {"type": int, "default": 200_000}),
+    ("--dimensions", {"type": int, "default": 384, "help": "all-MiniLM-L6-v2 is 384"}),
+)
+def vendor_index(args: argparse.Namespace) -> None:
+    import tempfile
+    from pathlib import Path
+
+    import numpy as np
+
+    from app.services.vendor_index import VendorIndex
+
+    rng = np.random.default_rng(42)
+    embeddings = rng.standard_normal((args.vendors, args.dimensions), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    category_ids = [uuid.uuid4() for _ in range(20)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        VendorIndex(
+            "bench",
+            [f"vendor {i}" for i in range(args.vendors)],
+            [category_ids[i % 20] for i in range(args.vendors)],
+            [1.0] * args.vendors,
+            embeddings,
+        ).save(Path(directory))
+        print(f"vendors: {args.vendors} x {args.dimensions} ({embeddings.nbytes / 2**20:.0f} MiB)")
+        _, index = timed("load (memory-mapped)", lambda: VendorIndex.load(Path(directory) / "bench", "bench"))
+
+        for batch in (1, 32, 256):
+            queries = embeddings[rng.integers(0, args.vendors, batch)]
+            best, (rows, scores) = timed(f"search batch of {batch}", lambda: index.search(queries))
+            assert np.allclose(scores, 1.0, atol=1e-4)
+            print(f"{'  per query':<40} {best / batch * 1000:10.3f} ms")
+
+
+# ---------------------------------------------------------------------------
+# Category head (active learning)
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "category-head",
+    "Category head: incremental training, holdout evaluation and hot swap",
+    ("--corrections", {"type": int, "default": 50_000, "help": "per training run"}),
+    ("--categories", {"type": int, "default": 20}),
+    ("--dimensions", {"type": int, "default": 384}),
+)
+def category_head(args: argparse.Namespace) -> None:
+    import tempfile
+    from dataclasses import replace
+    from pathlib import Path
+
+    import numpy as np
+
+    from app.services.category_head import CategoryHead
+    from app.services.model_store import ArtifactCache, new_version
+
+    # Vendors of one category cluster around a centre, as embeddings do
+    rng = np.random.default_rng(42)
+    centres = rng.standard_normal((args.categories, args.dimensions), dtype=np.float32)
+    category_ids = [uuid.uuid4() for _ in range(args.categories)]
+
+    def corrections(count: int):
+        labels = rng.integers(0, args.categories, count)
+        vectors = centres[labels] + 8 * rng.standard_normal((count, args.dimensions), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors, [category_ids[label] for label in labels]
+
+    holdout_vectors, holdout_categories = corrections(2_000)
+    head = CategoryHead.empty(args.dimensions).with_categories(category_ids)
+    holdout_labels = head.labels(holdout_categories)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ArtifactCache(directory, CategoryHead.load, check_seconds=0)
+        print(f"corrections: {args.corrections} per run, {args.categories} categories")
+        for run in range(1, 4):
+            vectors, categories = corrections(args.corrections)
+            labels = head.labels(categories)
+            _, head = timed(f"run {run}: partial_fit", lambda: head.partial_fit(vectors, labels), repeat=1)
+            _, accuracy = timed(
+                f"run {run}: holdout evaluation",
+                lambda: head.accuracy(holdout_vectors, holdout_labels),
+            )
+            print(f"{'  holdout accuracy':<40} {accuracy:10.3f}")
+            head = replace(head, version=new_version(), holdout_accuracy=accuracy)
+            timed(f"run {run}: save and publish", lambda: head.save(Path(directory)), repeat=1)
+            _, live = timed(f"run {run}: hot swap (reload)", cache.get, repeat=1)
+            assert live.version == head.version
+
+        query = holdout_vectors[:1]
+        timed("predict one vendor", lambda: live.predict(query), repeat=100)
+
+
+# ---------------------------------------------------------------------------
+# Per-user category prior
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "category-prior",
+    "Category prior: per-user build, lookup and incremental update",
+    ("--vendors", {"type": int, "default": 500, "help": "distinct vendors per user"}),
+    ("--history", {"type": int, "default": 5_000, "help": "confirmed transactions per user"}),
+)
+def category_prior(args: argparse.Namespace) -> None:
+    from app.services.category_prior import UserPrior, _confirmed, vendor_hash
+
+    def name(i: int) -> str:
+        # Digits are dropped by vendor normalization, so spell the number
+        letters = ""
+        while True:
+            i, digit = divmod(i, 26)
+            letters += chr(ord("a") + digit)
+            if not i:
+                return f"Cafe {letters.title()} Pvt Ltd"
+
+    rng = random.Random(42)
+    vendors = [name(i) for i in range(args.vendors)]
+    category_ids = [uuid.uuid4() for _ in range(20)]
+    habits = {vendor: rng.choice(category_ids) for vendor in vendors}
+    history = [rng.choice(vendors) for _ in range(args.history)]
+
+    def build():
+        entries = {}
+        for vendor in history:
+            key = vendor_hash(vendor)
+            entries[key] = _confirmed(entries.get(key), habits[vendor])
+        return UserPrior(entries)
+
+    _, prior = timed(f"build from {args.history} confirmations", build)
+    arrays = (prior.hashes, prior.categories, prior.confidence, prior.from_mapping)
+    print(f"{'  vendors':<40} {len(prior):10d}")
+    print(f"{'  array bytes':<40} {sum(a.nbytes for a in arrays):10d}")
+
+    queries = [rng.choice(vendors) for _ in range(10_000)]
+    best, _ = timed("10k lookups", lambda: [prior.get(vendor) for vendor in queries])
+    print(f"{'  per lookup':<40} {best / len(queries) * 1e6:10.2f} us")
+    best, _ = timed(
+        "1k updates (new vendors)",
+        lambda: [prior.apply(name(args.vendors + i), category_ids[0], None) for i in range(1_000)],
+        repeat=1,
+    )
+    print(f"{'  per update':<40} {best / 1_000 * 1e6:10.2f} us")
+
+
+# ---------------------------------------------------------------------------
+# JWT verification
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "jwt-verify",
+    "JWT: tokens verified per second by backend and algorithm, and the claims cache",
+    ("--tokens", {"type": int, "default": 2_000}),
+)
+def jwt_verify(args: argparse.Namespace) -> None:
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    from app.core import security
+    from app.core.signing import BACKENDS, KeySet
+
+    keys = {
+        "HS256": KeySet.symmetric("HS256", "benchmark-secret-" + "x" * 32),
+        "RS256": KeySet("RS256", rsa.generate_private_key(65537, 2048), "rs", {}),
+        "EdDSA": KeySet("EdDSA", ed25519.Ed25519PrivateKey.generate(), "ed", {}),
+    }
+    for key_set in keys.values():
+        if key_set.signing_kid:
+            key_set.verification_keys[key_set.signing_kid] = key_set.signing_key.public_key()
+
+    claims = {"sub": str(uuid.uuid4()), "type": "access", "exp": int(time.time()) + 900}
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except RuntimeError as e:
+            print(f"{name}: skipped ({e})")
+            continue
+        for algorithm, key_set in keys.items():
+            try:
+                tokens = [
+                    backend.encode(
+                        {**claims, "jti": str(i)}, key_set.signing_key, algorithm, key_set.signing_kid
+                    )
+                    for i in range(args.tokens)
+                ]
+            except ValueError:
+                print(f"{f'{name} {algorithm}':<40} {'unsupported':>10}")
+                continue
+
+            def verify():
+                for token in tokens:
+                    key = key_set.verification_key(backend.unverified_kid(token))
+                    backend.decode(token, key, algorithm)
+
+            best, _ = timed(f"{name} {algorithm}: verify {args.tokens}", verify, repeat=3)
+            print(f"{'  tokens/s':<40} {args.tokens / best:10.0f}")
+
+    # The request path: the same token presented again hits the claims cache
+    token = security.create_access_token(claims["sub"])
+    security.decode_token(token)
+    best, _ = timed(
+        f"decode_token, cached: {args.tokens}",
+        lambda: [security.decode_token(token) for _ in range(args.tokens)],
+    )
+    print(f"{'  tokens/s':<40} {args.tokens / best:10.0f}")
+
+
+# ---------------------------------------------------------------------------
+# Read replica routing
+# ---------------------------------------------------------------------------
+
+@benchmark(
+    "replica-routing",
+    "Read replicas: routing decisions against never-connected engines, and their cost",
+    ("--requests", {"type": int, "default": 10_000}),
+    ("--users", {"type": int, "default": 10_000}),
+    ("--write-ratio", {"type": float, "default": 0.05, "help": "share of write requests"}),
+)
+def replica_routing(args: argparse.Namespace) -> None:
+    from collections import Counter
+
+    from sqlalchemy import select, update
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core import database
+    from app.models.database import Transaction
+
+    # Engines only connect on first use, so these record where a query would go
+    fakes = [create_async_engine(f"postgresql+asyncpg://bench@replica-{n}/db") for n in "ab"]
+    database.replicas = database.ReplicaSet(
+        fakes, check_seconds=10, max_lag_seconds=5, eject_seconds=30
+    )
+    rng = random.Random(42)
+    users = [str(uuid.uuid4()) for _ in range(args.users)]
+    read, write = select(Transaction), update(Transaction).values(notes=None)
+
+    async def simulate():
+        decisions = {"reads": Counter(), "after own write": Counter()}
+        wrote = set()
+        for i in range(args.requests):
+            if i == args.requests // 2:
+                database.replicas.eject(fakes[0], 3600, "benchmark")
+            user = rng.choice(users)
+            writes = rng.random() < args.write_ratio
+            db = database.LazySession(read_only=not writes)
+            await db.route_for_user(user)
+            bind = db.session.sync_session.get_bind
+            if writes:
+                bind(clause=write)
+                wrote.add(user)
+            else:
+                kind = "after own write" if user in wrote else "reads"
+                decisions[kind][bind(clause=read).url.host] += 1
+            await db.release()
+        return decisions
+
+    start = time.perf_counter()
+    decisions = asyncio.run(simulate())
+    elapsed = time.perf_counter() - start
+    print(f"requests: {args.requests}, replica-a ejected halfway")
+    for kind, hosts in decisions.items():
+        for host, count in sorted(hosts.items()):
+            print(f"{f'{kind} -> {host}':<40} {count:10d}")
+    print(f"{'routing + sticky check per request':<40} {elapsed / args.requests * 1e6:10.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    for name, (help, _, arguments) in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=help)
+        for flag, kwargs in arguments:
+            subparser.add_argument(flag, **kwargs)
+
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark][1](args)
+
+
+if __name__ == "__main__":
+    main()
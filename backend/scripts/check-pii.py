@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+PII detector check.
+
+Runs the detector over every labelled sample in the corpus (cards, phone
+numbers next to other numbers, accounts, emails, UPI ids, and numbers that
+are not PII) and compares the detected values with the labels. Prints the
+mismatches. Exits non-zero if any sample differs.
+
+Usage:
+    python scripts/check-pii.py
+    python scripts/check-pii.py --corpus my-samples.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from app.services.pii import detect_pii
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "pii-corpus.jsonl"
+
+
+def load_corpus(path: Path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    args = parser.parse_args()
+
+    samples = load_corpus(args.corpus)
+    failures = 0
+    for sample in samples:
+        text = sample["text"]
+        found = [[span.kind, text[span.start:span.end]] for span in detect_pii(text)]
+        if found != sample["expected"]:
+            failures += 1
+            print(f"FAIL  {sample['id']:<24} got {found!r}, expected {sample['expected']!r}")
+
+    print(f"\nsamples: {len(samples)}")
+    print(f"{'ok  ' if not failures else 'FAIL'}  {len(samples) - failures} of {len(samples)} match")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
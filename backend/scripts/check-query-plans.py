@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check.
+
+Runs EXPLAIN on the hot query paths and fails if any of them stops being
+served by the index it was designed for. Sequential scans are disabled for
+the session so the check verifies that the index *can* serve the query shape,
+independent of how much data the target database holds.
+
+Usage:
+    python scripts/check-query-plans.py
+"""
+
+import asyncio
+import json
+import sys
+import uuid
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+
+
+# (name, sql, expected node types, expected index name)
+HOT_QUERIES = [
+    (
+        "monthly category aggregate",
+        """
+        SELECT category_id, sum(amount)
+        FROM transactions
+        WHERE user_id = :user_id AND date >= :start AND date < :end
+        GROUP BY category_id
+        """,
+        {"Index Only Scan"},
+        "idx_transaction_user_date",
+    ),
+    (
+        "transaction list page",
+        """
+        SELECT id, date, amount, vendor
+        FROM transactions
+        WHERE user_id = :user_id AND (
+            (date >= :start AND date < :end)
+            OR (date IS NULL AND status NOT IN ('CONFIRMED', 'CORRECTED')
+                AND created_at >= :start AND created_at < :end)
+        )
+        ORDER BY date DESC, created_at DESC
+        LIMIT 50
+        """,
+        {"Index Scan", "Index Scan Backward", "Bitmap Index Scan"},
+        "idx_transaction_user_date",
+    ),
+    (
+        "pending queue head",
+        """
+        SELECT id
+        FROM transactions
+        WHERE status IN ('PROCESSING', 'PARSED', 'CLASSIFIED')
+        ORDER BY created_at
+        LIMIT 10
+        """,
+        {"Index Scan"},
+        "idx_transaction_pending",
+    ),
+    (
+        "login by email",
+        "SELECT id, password_hash FROM users WHERE email = :email",
+        {"Index Scan"},
+        "users_email_key",
+    ),
+    (
+        "vendor mappings for user",
+        "SELECT vendor_name, category_id FROM vendor_mappings WHERE user_id = :user_id",
+        {"Index Scan", "Bitmap Index Scan"},
+        "unique_vendor_per_user",
+    ),
+]
+
+PARAMS = {
+    "user_id": uuid.uuid4(),
+    "start": date(2024, 1, 1),
+    "end": date(2024, 2, 1),
+    "email": "demo@example.com",
+}
+
+
+def iter_nodes(plan: dict):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
+
+
+def uses_index(plan: dict, node_types: set, index_name: str) -> bool:
+    """Check whether the plan reads through the expected index."""
+    return any(
+        node.get("Node Type") in node_types and node.get("Index Name") == index_name
+        for node in iter_nodes(plan)
+    )
+
+
+async def main() -> int:
+    """Explain every hot query and report mismatches."""
+    failures = 0
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SET enable_seqscan = off"))
+
+        for name, sql, node_types, index_name in HOT_QUERIES:
+            result = await db.execute(
+                text(f"EXPLAIN (FORMAT JSON) {sql}"),
+                {k: v for k, v in PARAMS.items() if f":{k}" in sql},
+            )
+            raw = result.scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+            if uses_index(plan, node_types, index_name):
+                print(f"ok    {name}: {index_name}")
+            else:
+                failures += 1
+                print(f"FAIL  {name}: expected {'/'.join(sorted(node_types))} on {index_name}")
+                print(json.dumps(plan, indent=2))
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Receipt parser accuracy check.
+
+Parses every labelled sample in the corpus (receipts from several locales
+and UPI screenshots) and compares each extracted field with its label.
+Prints the mismatches and per-field accuracy. Exits non-zero when any field
+falls below the required accuracy.
+
+Usage:
+    python scripts/check-receipt-parser.py
+    python scripts/check-receipt-parser.py --corpus my-receipts.jsonl --min-accuracy 1.0
+"""
+
+import argparse
+import json
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+from app.services.receipt_parser import parse_receipt
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "receipt-corpus.jsonl"
+FIELDS = ("amount", "date", "vendor", "currency", "kind")
+
+
+def load_corpus(path: Path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def matches(field: str, actual, expected) -> bool:
+    if field == "amount":
+        return actual is not None and Decimal(actual) == Decimal(expected)
+    if field == "vendor":
+        return (actual or "").casefold() == expected.casefold()
+    return actual == expected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--min-accuracy", type=float, default=0.9)
+    args = parser.parse_args()
+
+    samples = load_corpus(args.corpus)
+    correct = dict.fromkeys(FIELDS, 0)
+    for sample in samples:
+        parsed = parse_receipt(sample["text"]).to_json()
+        for field in FIELDS:
+            expected = sample["expected"][field]
+            if matches(field, parsed[field], expected):
+                correct[field] += 1
+            else:
+                print(f"FAIL  {sample['id']:<24} {field:<9} got {parsed[field]!r}, expected {expected!r}")
+
+    failures = 0
+    print(f"\nsamples: {len(samples)}")
+    for field in FIELDS:
+        accuracy = correct[field] / len(samples)
+        failures += accuracy < args.min_accuracy
+        print(f"{'ok  ' if accuracy >= args.min_accuracy else 'FAIL'}  {field:<9} {accuracy:7.1%}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
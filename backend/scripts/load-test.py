@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Load test for the API hot paths.
+
+Drives /auth/login, /transactions, /dashboard/summary and
+/transactions/upload as the users created by
+``seed-data.py --load-users``. For each scenario it reports throughput,
+p50/p95/p99 latency, errors and database statements per request.
+
+By default the app runs in this process and is called through httpx's
+ASGI transport, with no server or network in between. With --url the
+requests go to a running server instead. Start that server with
+DB_USAGE_HEADERS=true to get query counts. Either way, --workers processes
+each keep --concurrency requests in flight.
+
+--save-baseline stores the results in scripts/data/load-baseline.json,
+keyed by mode, workers and concurrency. --check compares a run with the
+stored baseline. It exits 1 if any scenario's p95 grew, or its throughput
+fell, by more than --tolerance. It also exits 1 if a scenario issues more
+queries per request than the baseline, or fails more than 1% of requests.
+
+Usage:
+    python scripts/seed-data.py --load-users 200 --transactions-per-user 5000
+    python scripts/load-test.py --duration 20 --save-baseline
+    python scripts/load-test.py --duration 20 --check
+    python scripts/load-test.py --url http://localhost:8000 --workers 4 --concurrency 32 --check
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+SEED_EMAIL = "load-{}@example.com"  # keep in step with seed-data.py
+SEED_PASSWORD = "loadtest123"
+BASELINE_PATH = Path(__file__).parent / "data" / "load-baseline.json"
+MAX_ERROR_RATE = 0.01
+
+API = "/api/v1"
+
+
+def _recent_months(count: int = 3) -> List[str]:
+    today = date.today()
+    months = []
+    for back in range(count):
+        year, month = divmod(today.year * 12 + today.month - 1 - back, 12)
+        months.append(f"{year}-{month + 1:02d}")
+    return months
+
+
+def _receipt_image() -> bytes:
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (600, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(["STARBUCKS", "Latte 1 x 250.00", "TOTAL 250.00"]):
+        draw.text((40, 40 + line * 40), text, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+class VirtualUser:
+    def __init__(self, email: str):
+        self.email = email
+        self.token: Optional[str] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def login(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    response = await client.post(
+        f"{API}/auth/login", data={"username": user.email, "password": SEED_PASSWORD}
+    )
+    if response.status_code == 200:
+        user.token = response.json()["access_token"]
+    return response
+
+
+async def list_transactions(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    month = random.choice(_recent_months())
+    return await client.get(
+        f"{API}/transactions/", params={"month": month, "limit": 50}, headers=user.headers
+    )
+
+
+async def dashboard_summary(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    month = random.choice(_recent_months())
+    return await client.get(
+        f"{API}/dashboard/summary", params={"month": month}, headers=user.headers
+    )
+
+
+_RECEIPT: Optional[bytes] = None
+
+
+async def upload_receipt(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    global _RECEIPT
+    if _RECEIPT is None:
+        _RECEIPT = _receipt_image()
+    return await client.post(
+        f"{API}/transactions/upload",
+        files={"file": ("receipt.jpg", _RECEIPT, "image/jpeg")},
+        headers=user.headers,
+    )
+
+
+Scenario = Callable[[httpx.AsyncClient, VirtualUser], Awaitable[httpx.Response]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": login,
+    "transactions": list_transactions,
+    "dashboard-summary": dashboard_summary,
+    "upload": upload_receipt,
+}
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+def _client(url: Optional[str]) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=30)
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test")
+
+
+async def _drive(
+    scenario: str, url: Optional[str], users: List[str], duration: float, concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    virtual_users = [VirtualUser(email) for email in users]
+
+    async def run(client: httpx.AsyncClient):
+        for user in virtual_users:
+            if (await login(client, user)).status_code != 200:
+                raise SystemExit(f"Login failed for {user.email}; seed with seed-data.py --load-users")
+
+        async def loop(offset: int):
+            nonlocal errors
+            deadline = time.perf_counter() + duration
+            n = offset
+            while time.perf_counter() < deadline:
+                user = virtual_users[n % len(virtual_users)]
+                n += concurrency
+                start = time.perf_counter()
+                try:
+                    response = await SCENARIOS[scenario](client, user)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+                if "X-DB-Queries" in response.headers:
+                    queries.append(int(response.headers["X-DB-Queries"]))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(i) for i in range(concurrency)))
+        return time.perf_counter() - started
+
+    if url:
+        async with _client(url) as client:
+            elapsed = await run(client)
+    else:
+        from app.core.config import settings
+        from app.main import app
+
+        settings.DB_USAGE_HEADERS = True
+        async with app.router.lifespan_context(app), _client(None) as client:
+            elapsed = await run(client)
+
+    return {"latencies": latencies, "queries": queries, "errors": errors, "elapsed": elapsed}
+
+
+def _worker(job: Tuple[str, Optional[str], List[str], float, int]) -> Dict[str, Any]:
+    return asyncio.run(_drive(*job))
+
+
+def run_scenario(scenario: str, args: argparse.Namespace) -> Dict[str, float]:
+    users = [SEED_EMAIL.format(n) for n in range(args.users)]
+    jobs = [
+        (scenario, args.url, users[worker::args.workers] or users, args.duration, args.concurrency)
+        for worker in range(args.workers)
+    ]
+    if args.workers == 1:
+        results = [_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(args.workers) as pool:
+            results = list(pool.map(_worker, jobs))
+
+    latencies = np.array([x for result in results for x in result["latencies"]]) * 1000
+    queries = [q for result in results for q in result["queries"]]
+    requests = len(latencies)
+    elapsed = max(result["elapsed"] for result in results)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if requests else (0.0, 0.0, 0.0)
+    return {
+        "requests": requests,
+        "throughput": requests / elapsed if elapsed else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "error_rate": sum(result["errors"] for result in results) / max(requests, 1),
+        "queries_per_request": sum(queries) / len(queries) if queries else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def regressions(
+    scenario: str, result: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    found = []
+    if result["p95_ms"] > baseline["p95_ms"] * (1 + tolerance):
+        found.append(f"p95 {result['p95_ms']:.1f} ms vs {baseline['p95_ms']:.1f} ms")
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        found.append(f"throughput {result['throughput']:.0f}/s vs {baseline['throughput']:.0f}/s")
+    if (
+        result["queries_per_request"] is not None
+        and baseline.get("queries_per_request") is not None
+        and result["queries_per_request"] > baseline["queries_per_request"] + 0.01
+    ):
+        found.append(
+            f"queries/request {result['queries_per_request']:.2f} "
+            f"vs {baseline['queries_per_request']:.2f}"
+        )
+    if result["error_rate"] > MAX_ERROR_RATE:
+        found.append(f"error rate {result['error_rate']:.1%}")
+    return [f"{scenario}: {message}" for message in found]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Running server; default: the app in-process")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated")
+    parser.add_argument("--users", type=int, default=50, help="Seeded load users to log in as")
+    parser.add_argument("--workers", type=int, default=1, help="Load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight per worker")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions vs the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    key = f"{'http' if args.url else 'asgi'}-w{args.workers}-c{args.concurrency}"
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    baseline = baselines.get(key, {})
+
+    results = {}
+    print(f"{'scenario':<20} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>8} {'queries':>8}")
+    for scenario in args.scenarios.split(","):
+        result = results[scenario] = run_scenario(scenario, args)
+        queries = result["queries_per_request"]
+        print(
+            f"{scenario:<20} {result['throughput']:9.1f} {result['p50_ms']:9.1f} "
+            f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f} {result['error_rate']:8.1%} "
+            f"{'-' if queries is None else f'{queries:.2f}':>8}"
+        )
+
+    failures = []
+    if args.check:
+        if not baseline:
+            print(f"No baseline for {key}; run with --save-baseline first")
+            return 1
+        for scenario, result in results.items():
+            if scenario in baseline:
+                failures += regressions(scenario, result, baseline[scenario], args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION  {failure}")
+        if not failures:
+            print(f"ok  no regressions against baseline {key}")
+
+    if args.save_baseline:
+        baselines[key] = {**baseline, **results}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline {key} saved to {BASELINE_PATH}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,17 +3,65 @@
 Seed data script for expense manager application.
 
 This script creates initial system categories and sample data for development.
+
+With --load-users it also creates synthetic users for load testing
+(scripts/load-test.py), each with a history of confirmed transactions.
+The rows are written with COPY, so millions of them take well under a
+minute. Running it again adds only the users that are still missing.
+
+Usage:
+    python scripts/seed-data.py
+    python scripts/seed-data.py --load-users 1000 --transactions-per-user 2000
 """
 
+import argparse
 import asyncio
+import time
 import uuid
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from typing import List
 
+import numpy as np
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import AsyncSessionLocal, init_db
+from app.core.security import get_password_hash
 from app.models.database import Category, User
+from app.services.categories import bump_catalog_version
+
+# Synthetic load-test users: load-<n>@example.com, all with this password
+LOAD_USER_EMAIL = "load-{}@example.com"
+LOAD_USER_PASSWORD = "loadtest123"
+
+# Vendors per system category for synthetic transactions
+LOAD_VENDORS = {
+    "Food & Dining": ["Swiggy", "Zomato", "Starbucks", "Dominos Pizza", "Cafe Coffee Day"],
+    "Groceries": ["BigBasket", "DMart", "Reliance Fresh", "Nature's Basket"],
+    "Transportation": ["Uber", "Ola", "Indian Oil", "Metro Card Recharge"],
+    "Utilities": ["Airtel", "Jio", "Tata Power", "BESCOM"],
+    "Housing": ["NoBroker Rent", "Urban Company", "Pepperfry"],
+    "Healthcare": ["Apollo Pharmacy", "Practo", "1mg"],
+    "Entertainment": ["Netflix", "BookMyShow", "Spotify", "PVR Cinemas"],
+    "Shopping": ["Amazon", "Flipkart", "Myntra", "Decathlon"],
+    "Education": ["Coursera", "Udemy", "Crossword Bookstore"],
+    "Other": ["Post Office", "Donation"],
+}
+
+LOAD_TRANSACTION_COLUMNS = [
+    "id", "user_id", "category_id", "amount", "date", "vendor", "status", "confidence_score",
+]
+COPY_BATCH_ROWS = 100_000
+
+# Same rollup as the 005 migration backfill, for the users just seeded
+MONTHLY_SPENDING_BACKFILL = text("""
+    INSERT INTO monthly_spending (user_id, month, category_id, spent, transaction_count)
+    SELECT user_id, to_char(date, 'YYYY-MM'), category_id, sum(amount), count(*)
+    FROM transactions
+    WHERE status IN ('CONFIRMED', 'CORRECTED') AND user_id = ANY(:user_ids)
+    GROUP BY user_id, to_char(date, 'YYYY-MM'), category_id
+""")
 
 
 # System categories as specified in planning document
@@ -110,6 +158,8 @@ async def create_system_categories():
             print(f"Created category: {cat_data['name']} {cat_data['icon']}")
 
         await db.commit()
+        # Running API processes reload their cached catalog
+        await bump_catalog_version()
         print("System categories created successfully!")
 
 
@@ -124,9 +174,6 @@ async def create_demo_user():
             print("Demo user already exists, skipping...")
             return existing
 
-        # In a real app, you'd hash the password
-        from app.core.security import get_password_hash
-
         user = User(
             email="demo@example.com",
             password_hash=get_password_hash("demo123"),
@@ -173,7 +220,90 @@ async def create_sample_transactions():
         print("Sample transactions creation will be implemented when Transaction model is complete")
 
 
-async def main():
+async def create_load_users(count: int) -> List[uuid.UUID]:
+    """Create load-test users up to ``count``; returns the new users' ids."""
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(
+            select(func.count()).select_from(User).where(User.email.like(LOAD_USER_EMAIL.format("%")))
+        )
+        if existing >= count:
+            print(f"{existing} load users already exist, skipping...")
+            return []
+
+        # One bcrypt hash shared by every load user
+        password_hash = get_password_hash(LOAD_USER_PASSWORD)
+        users = [
+            User(
+                id=uuid.uuid4(),
+                email=LOAD_USER_EMAIL.format(n),
+                password_hash=password_hash,
+                timezone="UTC",
+                is_active=True,
+                is_verified=True,
+            )
+            for n in range(existing, count)
+        ]
+        db.add_all(users)
+        await db.commit()
+
+        print(f"Created {len(users)} load users ({LOAD_USER_EMAIL.format('N')} / {LOAD_USER_PASSWORD})")
+        return [user.id for user in users]
+
+
+async def create_load_transactions(user_ids: List[uuid.UUID], per_user: int, months: int):
+    """COPY ``per_user`` confirmed transactions for each user over ``months``."""
+    async with AsyncSessionLocal() as db:
+        categories = {
+            category.name: category.id
+            for category in await db.scalars(select(Category).where(Category.is_global == True))
+        }
+        vendors = [
+            (vendor, categories[name])
+            for name, names in LOAD_VENDORS.items()
+            if name in categories
+            for vendor in names
+        ]
+        if not vendors:
+            print("System categories not found, skipping load transactions...")
+            return
+
+        connection = await (await db.connection()).get_raw_connection()
+        copy = connection.driver_connection.copy_records_to_table
+
+        rng = np.random.default_rng(42)
+        span = months * 30
+        first_day = date.today() - timedelta(days=span - 1)
+        started = time.perf_counter()
+        written = 0
+        batch = []
+        for user_id in user_ids:
+            picks = rng.integers(len(vendors), size=per_user).tolist()
+            # Amounts in cents, mostly tens to low thousands of rupees
+            amounts = (rng.lognormal(mean=8, sigma=1.2, size=per_user) + 100).astype(np.int64).tolist()
+            days = rng.integers(span, size=per_user).tolist()
+            for pick, amount, day in zip(picks, amounts, days):
+                vendor, category_id = vendors[pick]
+                batch.append((
+                    uuid.uuid4(), user_id, category_id, amount,
+                    first_day + timedelta(days=day), vendor, "CONFIRMED", 1.0,
+                ))
+            if len(batch) >= COPY_BATCH_ROWS:
+                await copy("transactions", records=batch, columns=LOAD_TRANSACTION_COLUMNS)
+                written += len(batch)
+                batch = []
+                print(f"  {written:,} transactions ({written / (time.perf_counter() - started):,.0f}/s)")
+        if batch:
+            await copy("transactions", records=batch, columns=LOAD_TRANSACTION_COLUMNS)
+            written += len(batch)
+
+        await db.execute(MONTHLY_SPENDING_BACKFILL, {"user_ids": user_ids})
+        await db.commit()
+        await db.execute(text("ANALYZE transactions"))
+        await db.commit()
+        print(f"Created {written:,} load transactions in {time.perf_counter() - started:.1f}s")
+
+
+async def main(args: argparse.Namespace):
     """Main seeding function."""
     print("🌱 Starting database seeding...")
 
@@ -189,6 +319,11 @@ async def main():
         await create_demo_user()
         await create_sample_transactions()
 
+        if args.load_users:
+            user_ids = await create_load_users(args.load_users)
+            if user_ids and args.transactions_per_user:
+                await create_load_transactions(user_ids, args.transactions_per_user, args.months)
+
         print("✅ Database seeding completed successfully!")
 
     except Exception as e:
@@ -197,7 +332,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    # Import here to avoid circular imports
-    from sqlalchemy import select
-
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the expense manager database")
+    parser.add_argument("--load-users", type=int, default=0, help="Synthetic users for load tests")
+    parser.add_argument("--transactions-per-user", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12, help="History per load user")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file